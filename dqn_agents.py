@@ -7,13 +7,14 @@ from __future__ import annotations
 import os
 import random as rnd
 from abc import ABC
-from typing import Union, List
+from typing import Optional, Union, List
 
 import tensorflow as tf
 
 from rl_agents import ReinforcementLearningAgent, ResourceWeightingRLAgent, TaskPricingRLAgent
 from env.server import Server
 from env.task import Task
+from env.validation import Validator
 from typing import Union
 
 
@@ -168,12 +169,13 @@ class ResourceWeightingDqnAgent(DqnAgent, ResourceWeightingRLAgent):
     Resource weighting DQN agent
     """
 
-    def __init__(self, agent_name: Union[int, str], network: tf.keras.Model, epsilon_steps=100000, **kwargs):
+    def __init__(self, agent_name: Union[int, str], network: tf.keras.Model, epsilon_steps=100000,
+                 validator: Optional[Validator] = None, **kwargs):
         assert network.input_shape[-1] == self.network_obs_width
 
         DqnAgent.__init__(self, network, epsilon_steps=epsilon_steps, **kwargs)
         name = f'Resource weighting Dqn agent {agent_name}' if type(agent_name) is int else agent_name
-        ResourceWeightingRLAgent.__init__(self, name, **kwargs)
+        ResourceWeightingRLAgent.__init__(self, name, validator=validator, **kwargs)
 
     def _get_actions(self, tasks: List[Task], server: Server, time_step: int,
                      training: bool = False) -> Dict[Task, float]:
@@ -230,9 +232,10 @@ class ResourceWeightingDdqnAgent(DdqnAgent, ResourceWeightingDqnAgent):
     Resource weighting double dqn agent
     """
 
-    def __init__(self, agent_num: int, network: tf.keras.Model, **kwargs):
+    def __init__(self, agent_num: int, network: tf.keras.Model, validator: Optional[Validator] = None, **kwargs):
         DdqnAgent.__init__(self, network, **kwargs)
-        ResourceWeightingDqnAgent.__init__(self, f'Resource weighting Double Dqn agent {agent_num}', network, **kwargs)
+        ResourceWeightingDqnAgent.__init__(self, f'Resource weighting Double Dqn agent {agent_num}', network,
+                                           validator=validator, **kwargs)
 
 
 class DuelingDQN(DdqnAgent, ABC):
@@ -274,9 +277,10 @@ class ResourceWeightingDuelingDqnAgent(DuelingDQN, ResourceWeightingDqnAgent):
     Resource Weighting Dueling DQN agent
     """
 
-    def __init__(self, agent_num: int, network: tf.keras.Model, **kwargs):
+    def __init__(self, agent_num: int, network: tf.keras.Model, validator: Optional[Validator] = None, **kwargs):
         DuelingDQN.__init__(self, network, **kwargs)
-        ResourceWeightingDqnAgent.__init__(self, f'Resource weighting Dueling Dqn agent {agent_num}', network, **kwargs)
+        ResourceWeightingDqnAgent.__init__(self, f'Resource weighting Dueling Dqn agent {agent_num}', network,
+                                           validator=validator, **kwargs)
 
 
 class CategoricalDqnAgent(DqnAgent, ABC):
@@ -371,10 +375,11 @@ class ResourceWeightingCategoricalDqnAgent(CategoricalDqnAgent, ResourceWeightin
     """
 
     def __init__(self, agent_num: int, network: tf.keras.Model, epsilon_steps=100000, min_value: float = -15.0,
-                 max_value: float = 12.0, **kwargs):
+                 max_value: float = 12.0, validator: Optional[Validator] = None, **kwargs):
         CategoricalDqnAgent.__init__(self, network, epsilon_steps=epsilon_steps, min_value=min_value,
                                      max_value=max_value, **kwargs)
-        ResourceWeightingRLAgent.__init__(self, f'Resource weighting C51 agent {agent_num}', **kwargs)
+        ResourceWeightingRLAgent.__init__(self, f'Resource weighting C51 agent {agent_num}', validator=validator,
+                                          **kwargs)
 
     def _get_actions(self, tasks: List[Task], server: Server, time_step: int,
                      training: bool = False) -> Dict[Task, float]:
@@ -0,0 +1,196 @@
+"""
+Arrival queue of the unallocated tasks ordered by auction time
+"""
+
+from __future__ import annotations
+
+import heapq
+import operator
+from collections.abc import Sized
+from itertools import chain, tee
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from env.task import Task
+    from typing import Iterable, Iterator, List, Optional, Tuple
+
+
+class ArrivalQueue:
+    """
+    Queue of the unallocated tasks ordered by auction time (tasks with the same auction time keep their insertion
+        order). The tasks known at the start of an episode are stored as a sorted tuple with a cursor, so getting the
+        next task is O(1), while tasks that are added during an episode are stored in a heap with O(log n) insertion.
+
+    The tasks can also be read from a task source (an iterator of tasks in arrival order) that follows the initial
+        tasks, the source tasks are only read as the tasks are popped (with a single task read ahead) so the memory
+        used doesn't depend on the number of tasks of the source. A task source with a length (such as the unallocated
+        tasks of a snapshot) is bounded so can be read to the end.
+    """
+
+    def __init__(self, tasks: Iterable[Task] = (), source: Optional[Iterable[Task]] = None):
+        """
+        Constructor of the arrival queue
+
+        Args:
+            tasks: The initial unallocated tasks
+            source: Optional task source of the tasks in arrival order, that arrive after the initial tasks
+        """
+        self._tasks: Tuple[Task, ...] = tuple(sorted(tasks, key=operator.attrgetter('auction_time')))
+        self._pos: int = 0
+
+        # The task source with the next task of the source (None if there is no source or the source is exhausted)
+        self._source: Optional[Iterator[Task]] = None
+        self._source_task: Optional[Task] = None
+        self._bounded_source: bool = isinstance(source, Sized)
+        if source is not None:
+            self._source = iter(source)
+            self._source_task = next(self._source, None)
+            if self._tasks and self._source_task is not None:
+                assert self._tasks[-1].auction_time <= self._source_task.auction_time
+
+        # Heap of (auction time, insertion number, task) for the tasks added during the episode
+        self._added_tasks: List[Tuple[int, int, Task]] = []
+        self._num_added: int = 0
+
+    def __len__(self) -> int:
+        if self.unread_source:
+            raise TypeError('The number of tasks of an unread task source is unknown')
+        return len(self._tasks) - self._pos + len(self._added_tasks)
+
+    def __bool__(self) -> bool:
+        return self._initial_task() is not None or bool(self._added_tasks)
+
+    def __iter__(self) -> Iterator[Task]:
+        # The initial (and source) tasks were added before any added task, so are first for equal auction times.
+        #   The source is teed so that iterating doesn't read the tasks from the queue, however iterating reads
+        #   the source to the end so the source tasks are then all held in memory
+        initial_tasks: Iterable[Task] = self._tasks[self._pos:]
+        if self._source_task is not None:
+            self._source, source = tee(self._source)
+            initial_tasks = chain(initial_tasks, (self._source_task,), source)
+        return iter(heapq.merge(initial_tasks, (task for _, _, task in sorted(self._added_tasks)),
+                                key=operator.attrgetter('auction_time')))
+
+    @property
+    def unread_source(self) -> bool:
+        """
+        Returns: If the task source has tasks that are not read yet (so the tasks of the queue are unknown)
+
+        """
+        return self._source_task is not None
+
+    @property
+    def bounded_source(self) -> bool:
+        """
+        Returns: If the task source has a known number of tasks, so the unread tasks can be read (when iterating)
+
+        """
+        return self._bounded_source
+
+    def buffered_tasks(self) -> List[Task]:
+        """
+        The tasks held by the queue, the initial tasks, the read ahead source task and the added tasks, the task
+            source is not read so this is safe for an unbounded source (unlike iterating the queue)
+
+        Returns: List of the buffered tasks in arrival order
+
+        """
+        initial_tasks = self._tasks[self._pos:] + (() if self._source_task is None else (self._source_task,))
+        return list(heapq.merge(initial_tasks, (task for _, _, task in sorted(self._added_tasks)),
+                                key=operator.attrgetter('auction_time')))
+
+    def _initial_task(self) -> Optional[Task]:
+        """
+        Returns: The next initial (or source) task (None if there are no more initial or source tasks)
+
+        """
+        return self._tasks[self._pos] if self._pos < len(self._tasks) else self._source_task
+
+    def _next_initial_task(self):
+        """
+        Moves to the next initial task, reading the next source task once the initial tasks are popped
+        """
+        if self._pos < len(self._tasks):
+            self._pos += 1
+        else:
+            task = next(self._source, None)
+            if task is not None:
+                assert self._source_task.auction_time <= task.auction_time, \
+                    f'Source task {task.name} auction time {task.auction_time} is before the previous source task ' \
+                    f'auction time {self._source_task.auction_time}'
+            self._source_task = task
+
+    def peek(self) -> Optional[Task]:
+        """
+        Returns: The next task to arrive (None if the queue is empty)
+
+        """
+        initial_task = self._initial_task()
+        if self._added_tasks and (initial_task is None or self._added_tasks[0][0] < initial_task.auction_time):
+            return self._added_tasks[0][2]
+        else:
+            return initial_task
+
+    def pop(self, time_step: int) -> Optional[Task]:
+        """
+        Pops the next task if the task auction time is the time step
+
+        Args:
+            time_step: The time step that the task auction time must be
+
+        Returns: The next task (None if no task arrives at the time step)
+
+        """
+        next_task = self.peek()
+        if next_task is None or next_task.auction_time != time_step:
+            return None
+        elif self._initial_task() is next_task:
+            self._next_initial_task()
+        else:
+            heapq.heappop(self._added_tasks)
+        return next_task
+
+    def pop_all(self, time_step: int) -> List[Task]:
+        """
+        Pops all of the tasks with the auction time of the time step
+
+        Args:
+            time_step: The time step that the tasks auction time must be
+
+        Returns: List of the tasks that arrive at the time step
+
+        """
+        tasks = []
+        task = self.pop(time_step)
+        while task is not None:
+            tasks.append(task)
+            task = self.pop(time_step)
+        return tasks
+
+    def copy(self) -> ArrivalQueue:
+        """
+        Copies the queue, the sorted tuple of tasks is shared while the cursor and the heap of added tasks are copied.
+            The task source is teed, so the source tasks read by only one of the queues are buffered till the other
+            queue reads them (or is garbage collected)
+
+        Returns: The independent copy of the queue
+
+        """
+        queue = ArrivalQueue()
+        queue._tasks, queue._pos = self._tasks, self._pos
+        if self._source_task is not None:
+            self._source, queue._source = tee(self._source)
+            queue._source_task = self._source_task
+            queue._bounded_source = self._bounded_source
+        queue._added_tasks, queue._num_added = list(self._added_tasks), self._num_added
+        return queue
+
+    def push(self, task: Task):
+        """
+        Adds a task to the queue
+
+        Args:
+            task: The unallocated task
+        """
+        heapq.heappush(self._added_tasks, (task.auction_time, self._num_added, task))
+        self._num_added += 1
@@ -0,0 +1,249 @@
+"""
+Vectorised resource allocation over many servers at once, the tasks of every server are stored as flat arrays with
+    a group id for the server that the task is allocated to
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from env.fixed_point import round_fixed
+from env.task_stage import TaskStage
+
+if TYPE_CHECKING:
+    from typing import Tuple, Union
+
+# The task stages as integer codes for the task stage arrays
+UNASSIGNED: int = TaskStage.UNASSIGNED.value
+LOADING: int = TaskStage.LOADING.value
+COMPUTING: int = TaskStage.COMPUTING.value
+SENDING: int = TaskStage.SENDING.value
+COMPLETED: int = TaskStage.COMPLETED.value
+FAILED: int = TaskStage.FAILED.value
+
+
+def round_array(values: np.ndarray) -> np.ndarray:
+    """
+    Rounds an array to four decimal places, the array equivalent of env.server.round_float
+
+    Args:
+        values: The array of values
+
+    Returns: Rounded array to four decimal places
+
+    """
+    return np.round(values, 4)
+
+
+def _segment_sum(group: np.ndarray, values: np.ndarray, num_groups: int) -> np.ndarray:
+    """
+    Sums the values of each group
+
+    Args:
+        group: The group id of each value
+        values: The values to sum
+        num_groups: The number of groups
+
+    Returns: Array of the sum of values for each group
+
+    """
+    return np.bincount(group, weights=values, minlength=num_groups)
+
+
+def _segment_rank(group: np.ndarray) -> np.ndarray:
+    """
+    The position of each element within its group, the order of elements within a group is the array order
+
+    Args:
+        group: The group id of each element
+
+    Returns: Array of the rank of each element within its group
+
+    """
+    order = np.argsort(group, kind='stable')
+    sorted_group = group[order]
+    starts = np.flatnonzero(np.r_[True, sorted_group[1:] != sorted_group[:-1]])
+    counts = np.diff(np.r_[starts, len(group)])
+    ranks = np.empty(len(group), dtype=np.int64)
+    ranks[order] = np.arange(len(group)) - np.repeat(starts, counts)
+    return ranks
+
+
+def _unit(available: np.ndarray, total_weights: np.ndarray) -> np.ndarray:
+    """
+    The resource unit of each group, zero for groups without any weights
+
+    Args:
+        available: The available resources of each group
+        total_weights: The total weights of each group
+
+    Returns: Array of the resource per unit of weight for each group
+
+    """
+    return np.divide(available, total_weights, out=np.zeros(len(available)), where=0 < total_weights)
+
+
+def allocate_resources(group: np.ndarray, weights: np.ndarray, stage: np.ndarray,
+                       loading_progress: np.ndarray, compute_progress: np.ndarray, sending_progress: np.ndarray,
+                       required_storage: np.ndarray, required_computation: np.ndarray,
+                       required_results_data: np.ndarray, deadline: np.ndarray,
+                       storage_cap: np.ndarray, computational_cap: np.ndarray, bandwidth_cap: np.ndarray,
+                       time_step: Union[int, np.ndarray],
+                       fixed_point: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Allocate resources to the tasks of every server at once, following the same rules as Server.allocate_resources
+
+    The passes that find the tasks able to finish their current stage are vectorised over every server,
+        only the loading of tasks (that depends on the storage used by the previous tasks of the server) loops
+        over the position of the task within its server
+
+    With fixed-point values (see env/fixed_point.py) the resources are scaled integers and are rounded to the nearest
+        integer rather than four decimal places, the returned progress arrays are then also scaled integers
+
+    Args:
+        group: The server (group) id of each task, the order of the tasks within a server is the array order
+        weights: The resource weighting of each task
+        stage: The task stage codes, all tasks must be loading, computing or sending
+        loading_progress: The task loading progress
+        compute_progress: The task compute progress
+        sending_progress: The task sending progress
+        required_storage: The task required storage
+        required_computation: The task required computation
+        required_results_data: The task required results data
+        deadline: The task deadline
+        storage_cap: The storage capacity of each server
+        computational_cap: The computational capacity of each server
+        bandwidth_cap: The bandwidth capacity of each server
+        time_step: The current time step, either for all tasks or for each task
+        fixed_point: If the progress, required resources and capacities are fixed-point values
+
+    Returns: The updated task stages, loading progress, compute progress and sending progress
+
+    """
+    num_groups = len(storage_cap)
+    round_values = round_fixed if fixed_point else round_array
+    positive = 0 < weights
+    assert np.all((stage == LOADING) | (stage == COMPUTING) | (stage == SENDING))
+    assert np.all(0 <= weights)
+    assert np.all(time_step <= deadline)
+
+    # Allocate computational resources to the tasks at computing stage
+    compute_resources = np.zeros(len(group))
+    compute_pending = (stage == COMPUTING) & positive
+    remaining_computation = required_computation - compute_progress
+    available_computation = computational_cap.astype(np.float64)
+    while compute_pending.any():
+        compute_unit = round_values(_unit(available_computation,
+                                         _segment_sum(group, np.where(compute_pending, weights, 0), num_groups)))
+        finishing = compute_pending & (remaining_computation <= weights * compute_unit[group])
+        if not finishing.any():
+            break
+
+        compute_resources[finishing] = round_values(remaining_computation[finishing])
+        available_computation = round_values(
+            available_computation - _segment_sum(group, np.where(finishing, compute_resources, 0), num_groups))
+        compute_pending &= ~finishing
+    # The tasks that can't finish their compute stage are allocated the leftover computational resources
+    compute_unit = round_values(_unit(available_computation,
+                                     _segment_sum(group, np.where(compute_pending, weights, 0), num_groups)))
+    compute_resources[compute_pending] = round_values(compute_unit[group[compute_pending]] * weights[compute_pending])
+
+    # Allocate bandwidth (and storage) resources to the tasks at loading and sending stage
+    loading_resources = np.zeros(len(group))
+    sending_resources = np.zeros(len(group))
+    loading_pending = (stage == LOADING) & positive
+    sending_pending = (stage == SENDING) & positive
+    remaining_storage = required_storage - loading_progress
+    remaining_results_data = required_results_data - sending_progress
+    available_storage = storage_cap - _segment_sum(group, loading_progress, num_groups)
+    available_bandwidth = bandwidth_cap.astype(np.float64)
+
+    # Stage 1 - Finds the tasks that can finish their loading or sending stage
+    while loading_pending.any() or sending_pending.any():
+        bandwidth_unit = round_values(_unit(available_bandwidth, _segment_sum(
+            group, np.where(loading_pending | sending_pending, weights, 0), num_groups)))
+
+        # Stage 1.1 - the sending tasks that can be finished
+        sending_finishing = sending_pending & (remaining_results_data <= weights * bandwidth_unit[group])
+        sending_resources[sending_finishing] = round_values(remaining_results_data[sending_finishing])
+        available_bandwidth = round_values(available_bandwidth - _segment_sum(
+            group, np.where(sending_finishing, sending_resources, 0), num_groups))
+        sending_pending &= ~sending_finishing
+
+        # Stage 1.2 - the loading tasks that can be finished, in the order of the tasks on the server
+        loading_finishing = np.zeros(len(group), dtype=bool)
+        candidates = np.flatnonzero(loading_pending & (remaining_storage <= weights * bandwidth_unit[group]))
+        if len(candidates):
+            candidate_ranks = _segment_rank(group[candidates])
+            for rank in range(candidate_ranks.max() + 1):
+                tasks = candidates[candidate_ranks == rank]
+                servers = group[tasks]
+                finishing = remaining_storage[tasks] <= np.minimum(available_storage[servers],
+                                                                   available_bandwidth[servers])
+                tasks, servers = tasks[finishing], servers[finishing]
+
+                loading_resources[tasks] = round_values(remaining_storage[tasks])
+                available_storage[servers] = round_values(available_storage[servers] - loading_resources[tasks])
+                available_bandwidth[servers] = round_values(available_bandwidth[servers] - loading_resources[tasks])
+                loading_finishing[tasks] = True
+        loading_pending &= ~loading_finishing
+
+        if not (sending_finishing.any() or loading_finishing.any()):
+            break
+
+    # Stage 2 - Allocate the loading tasks with the available storage and bandwidth resources
+    #   (the total weights are summed over the pending tasks each time, as subtracting the weights of the allocated
+    #   tasks leaves float residues rather than zero that the resource unit would be divided by)
+    loading_tasks = np.flatnonzero(loading_pending)
+    if len(loading_tasks):
+        loading_ranks = _segment_rank(group[loading_tasks])
+        for rank in range(loading_ranks.max() + 1):
+            tasks = loading_tasks[loading_ranks == rank]
+            servers = group[tasks]
+            bandwidth_total_weights = _segment_sum(group, np.where(loading_pending | sending_pending, weights, 0),
+                                                   num_groups)
+
+            loading_resources[tasks] = round_values(np.minimum(
+                available_bandwidth[servers] / bandwidth_total_weights[servers] * weights[tasks],
+                available_storage[servers]))
+            available_storage[servers] = round_values(available_storage[servers] - loading_resources[tasks])
+            available_bandwidth[servers] = round_values(available_bandwidth[servers] - loading_resources[tasks])
+            loading_pending[tasks] = False
+
+    # Stage 3 - Finds the sending tasks that can finish with the leftover bandwidth resources
+    while sending_pending.any():
+        bandwidth_unit = _unit(available_bandwidth, _segment_sum(group, np.where(sending_pending, weights, 0),
+                                                                 num_groups))
+        sending_finishing = sending_pending & (remaining_results_data <= weights * bandwidth_unit[group])
+        if not sending_finishing.any():
+            break
+
+        sending_resources[sending_finishing] = round_values(remaining_results_data[sending_finishing])
+        available_bandwidth = round_values(available_bandwidth - _segment_sum(
+            group, np.where(sending_finishing, sending_resources, 0), num_groups))
+        sending_pending &= ~sending_finishing
+
+    # Stage 4 - Allocate the remaining bandwidth resources to the sending tasks
+    bandwidth_unit = round_values(_unit(available_bandwidth, _segment_sum(
+        group, np.where(sending_pending, weights, 0), num_groups)))
+    sending_resources[sending_pending] = round_values(bandwidth_unit[group[sending_pending]] * weights[sending_pending])
+
+    # Update the task progress and stages with the allocated resources
+    loading = (stage == LOADING) & positive
+    computing = (stage == COMPUTING) & positive
+    sending = (stage == SENDING) & positive
+    updated_loading_progress = np.where(loading, round_values(loading_progress + loading_resources), loading_progress)
+    updated_compute_progress = np.where(computing, round_values(compute_progress + compute_resources),
+                                        compute_progress)
+    updated_sending_progress = np.where(sending, round_values(sending_progress + sending_resources), sending_progress)
+
+    updated_stage = stage.copy()
+    updated_stage[loading & (required_storage <= updated_loading_progress)] = COMPUTING
+    updated_stage[computing & (required_computation <= updated_compute_progress)] = SENDING
+    updated_stage[sending & (required_results_data <= updated_sending_progress)] = COMPLETED
+    # The tasks that are not completed by their deadline have failed
+    updated_stage[(deadline == time_step) & (updated_stage != COMPLETED)] = FAILED
+
+    return updated_stage, updated_loading_progress, updated_compute_progress, updated_sending_progress
@@ -0,0 +1,375 @@
+"""
+Batched environment that steps a number of independent online flexible resource allocation environments together,
+    the servers and tasks are stored as contiguous arrays rather than Server and Task objects
+"""
+
+from __future__ import annotations
+
+import random as rnd
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from env.batched_allocation import allocate_resources, UNASSIGNED, LOADING, COMPUTING, SENDING, COMPLETED, FAILED
+from env.env_state import EnvState
+from env.environment import OnlineFlexibleResourceAllocationEnv
+from env.server import Server
+from env.task import Task
+from env.task_stage import TaskStage
+
+if TYPE_CHECKING:
+    from typing import List, Optional, Sequence, Tuple, Union
+
+
+class BatchedEnvState(NamedTuple):
+    """
+    The state of every environment in the batch, the task arrays are indexed by environment and task slot
+    """
+    # The time step of each environment
+    time_step: np.ndarray
+    # The task slot being auctioned in each environment (-1 if no task is being auctioned)
+    auction_task: np.ndarray
+    # The server index that each task is allocated to (-1 if the task is unallocated)
+    task_server: np.ndarray
+    # The stage codes (TaskStage values) of the tasks
+    task_stage: np.ndarray
+    # The progress of the tasks
+    loading_progress: np.ndarray
+    compute_progress: np.ndarray
+    sending_progress: np.ndarray
+    # The price that the task was won at (-1 if not won)
+    price: np.ndarray
+
+
+class BatchedRewards(NamedTuple):
+    """
+    The rewards of a batched step
+    """
+    # The price that each server won the auction task at (zero for servers that didn't win)
+    auction: np.ndarray
+    # If each task finished (completed or failed) during the resource allocation
+    finished_tasks: np.ndarray
+
+
+class BatchedResourceAllocationEnv:
+    """
+    Steps a batch of independent environments in a single call, every environment is either at an auction step or a
+        resource allocation step, so both the auction prices and resource weights are passed to each step
+    """
+
+    def __init__(self, env_settings: Optional[Union[str, List[str]]], num_envs: int, seed: Optional[int] = None):
+        """
+        Constructor of the batched environment
+
+        Args:
+            env_settings: List of environment setting files, randomly chosen on each reset
+            num_envs: The number of environments in the batch
+            seed: The seed of the auction tie-breaking generator
+        """
+        assert 0 < num_envs
+
+        self.env_settings = [env_settings] if type(env_settings) is str else list(env_settings or [])
+        self.num_envs = num_envs
+        self._rng = np.random.default_rng(seed)
+
+        self.env_names: List[str] = []
+        self._server_names: List[List[str]] = []
+        self._task_names: List[List[str]] = []
+        # The ids of the servers and tasks so that the converted environment states keep the identity of each
+        self._server_uids: List[List[int]] = []
+        self._task_uids: List[List[int]] = []
+
+    def reset(self) -> BatchedEnvState:
+        """
+        Resets every environment using one of the environment settings that is randomly chosen for each environment
+
+        Returns: The new batched state
+
+        """
+        assert 0 < len(self.env_settings)
+
+        settings = [OnlineFlexibleResourceAllocationEnv._load_setting(rnd.choice(self.env_settings))
+                    for _ in range(self.num_envs)]
+        self._build([(env_name, {server: [] for server in servers}, None,
+                      sorted(tasks, key=lambda task: task.auction_time), 0, total_time_steps)
+                     for env_name, servers, tasks, total_time_steps in settings])
+        return self.state()
+
+    @staticmethod
+    def from_envs(envs: Sequence[OnlineFlexibleResourceAllocationEnv],
+                  seed: Optional[int] = None) -> BatchedResourceAllocationEnv:
+        """
+        Creates a batched environment from the current state of each environment, i.e. loaded evaluation environments
+
+        Args:
+            envs: List of environments
+            seed: The seed of the auction tie-breaking generator
+
+        Returns: The batched environment
+
+        """
+        batched_env = BatchedResourceAllocationEnv(None, len(envs), seed)
+        # noinspection PyProtectedMember
+        batched_env._build([(env.env_name, env._state.server_tasks, env._state.auction_task,
+                             list(env._unallocated_tasks), env._state.time_step, env._total_time_steps)
+                            for env in envs])
+        return batched_env
+
+    def _build(self, envs: List[Tuple[str, dict, Optional[Task], List[Task], int, int]]):
+        """
+        Builds the environment arrays from the servers and tasks of each environment
+
+        Args:
+            envs: List of environment name, server tasks, auction task, sorted unallocated tasks, time step and
+                total time steps
+        """
+        num_servers = max(len(server_tasks) for _, server_tasks, _, _, _, _ in envs)
+        num_tasks = max(sum(len(tasks) for tasks in server_tasks.values()) + (auction_task is not None) +
+                        len(unallocated_tasks) for _, server_tasks, auction_task, unallocated_tasks, _, _ in envs)
+        shape = (self.num_envs, num_tasks)
+
+        # The server arrays, the padded servers have no capacity and never bid
+        self.server_mask = np.zeros((self.num_envs, num_servers), dtype=bool)
+        self.storage_cap = np.zeros((self.num_envs, num_servers))
+        self.computational_cap = np.zeros((self.num_envs, num_servers))
+        self.bandwidth_cap = np.zeros((self.num_envs, num_servers))
+
+        # The task arrays, the padded tasks are never auctioned
+        self.task_mask = np.zeros(shape, dtype=bool)
+        self.required_storage = np.ones(shape)
+        self.required_computation = np.ones(shape)
+        self.required_results_data = np.ones(shape)
+        self.auction_time = np.full(shape, np.iinfo(np.int64).max, dtype=np.int64)
+        self.deadline = np.full(shape, np.iinfo(np.int64).max, dtype=np.int64)
+        self._task_server = np.full(shape, -1, dtype=np.int64)
+        self._task_stage = np.full(shape, UNASSIGNED, dtype=np.int64)
+        self._loading_progress = np.zeros(shape)
+        self._compute_progress = np.zeros(shape)
+        self._sending_progress = np.zeros(shape)
+        self._price = np.full(shape, -1.0)
+
+        # The environment arrays
+        self._time_step = np.zeros(self.num_envs, dtype=np.int64)
+        self.total_time_steps = np.zeros(self.num_envs, dtype=np.int64)
+        self._auction_task = np.full(self.num_envs, -1, dtype=np.int64)
+        self._next_task = np.zeros(self.num_envs, dtype=np.int64)
+
+        self.env_names, self._server_names, self._task_names = [], [], []
+        self._server_uids, self._task_uids = [], []
+        for env_num, (env_name, server_tasks, auction_task, unallocated_tasks, time_step, total_time_steps) \
+                in enumerate(envs):
+            self.env_names.append(env_name)
+            self._server_names.append([server.name for server in server_tasks.keys()])
+            self._server_uids.append([server.uid for server in server_tasks.keys()])
+            self._time_step[env_num] = time_step
+            self.total_time_steps[env_num] = total_time_steps
+
+            servers = list(server_tasks.keys())
+            self.server_mask[env_num, :len(servers)] = True
+            self.storage_cap[env_num, :len(servers)] = [server.storage_cap for server in servers]
+            self.computational_cap[env_num, :len(servers)] = [server.computational_cap for server in servers]
+            self.bandwidth_cap[env_num, :len(servers)] = [server.bandwidth_cap for server in servers]
+
+            # The allocated tasks are stored first (in the order of each server) followed by the tasks to auction
+            allocated_tasks = [(server_num, task) for server_num, tasks in enumerate(server_tasks.values())
+                               for task in tasks]
+            auction_tasks = ([] if auction_task is None else [auction_task]) + list(unallocated_tasks)
+            tasks = [task for _, task in allocated_tasks] + auction_tasks
+            self._task_names.append([task.name for task in tasks])
+            self._task_uids.append([task.uid for task in tasks])
+
+            self.task_mask[env_num, :len(tasks)] = True
+            self.required_storage[env_num, :len(tasks)] = [task.required_storage for task in tasks]
+            self.required_computation[env_num, :len(tasks)] = [task.required_computation for task in tasks]
+            self.required_results_data[env_num, :len(tasks)] = [task.required_results_data for task in tasks]
+            self.auction_time[env_num, :len(tasks)] = [task.auction_time for task in tasks]
+            self.deadline[env_num, :len(tasks)] = [task.deadline for task in tasks]
+            self._task_server[env_num, :len(allocated_tasks)] = [server_num for server_num, _ in allocated_tasks]
+            self._task_stage[env_num, :len(tasks)] = [task.stage.value for task in tasks]
+            self._loading_progress[env_num, :len(tasks)] = [task.loading_progress for task in tasks]
+            self._compute_progress[env_num, :len(tasks)] = [task.compute_progress for task in tasks]
+            self._sending_progress[env_num, :len(tasks)] = [task.sending_progress for task in tasks]
+            self._price[env_num, :len(tasks)] = [task.price for task in tasks]
+
+            self._next_task[env_num] = len(allocated_tasks)
+        self._next_auction_tasks(np.ones(self.num_envs, dtype=bool))
+
+    def state(self) -> BatchedEnvState:
+        """
+        Returns: A copy of the current batched state
+
+        """
+        return BatchedEnvState(self._time_step.copy(), self._auction_task.copy(), self._task_server.copy(),
+                               self._task_stage.copy(), self._loading_progress.copy(), self._compute_progress.copy(),
+                               self._sending_progress.copy(), self._price.copy())
+
+    @property
+    def dones(self) -> np.ndarray:
+        """
+        Returns: If each environment is done (the time step is greater than the total time steps)
+
+        """
+        return self.total_time_steps < self._time_step
+
+    def step(self, auction_prices: np.ndarray,
+             resource_weights: np.ndarray) -> Tuple[BatchedEnvState, BatchedRewards, np.ndarray]:
+        """
+        A batched environment step, environments with an auction task use the auction prices while the other
+            environments use the resource weights. Environments that are done are not stepped.
+
+        Args:
+            auction_prices: The price of each server for the auction task, shape (envs, servers)
+            resource_weights: The weighting of each task for its server, shape (envs, tasks)
+
+        Returns: A tuple of the batched state, rewards and if each environment is done
+
+        """
+        assert auction_prices.shape == self.server_mask.shape
+        assert resource_weights.shape == self.task_mask.shape
+        assert np.all(0 <= auction_prices) and np.all(0 <= resource_weights)
+
+        running = ~self.dones
+        auction_envs = running & (0 <= self._auction_task)
+        allocation_envs = running & (self._auction_task < 0)
+
+        auction_rewards = self._auction(auction_envs, auction_prices)
+        finished_tasks = self._resource_allocation(allocation_envs, resource_weights)
+
+        return self.state(), BatchedRewards(auction_rewards, finished_tasks), self.dones
+
+    def _auction(self, auction_envs: np.ndarray, auction_prices: np.ndarray) -> np.ndarray:
+        """
+        Vickrey auction of the auction task of each environment, the server with the minimum price wins but pays the
+            second minimum price, if multiple servers price the same minimum price then they pay the minimum price
+
+        Args:
+            auction_envs: The environments with an auction task
+            auction_prices: The server prices, zero prices are ignored
+
+        Returns: The auction rewards of each server
+
+        """
+        auction_rewards = np.zeros(self.server_mask.shape)
+        if not auction_envs.any():
+            return auction_rewards
+
+        # The minimum and second minimum prices (ties mean that the second minimum price is the minimum price)
+        valid = auction_envs[:, None] & self.server_mask & (0 < auction_prices)
+        prices = np.where(valid, auction_prices, np.inf)
+        if prices.shape[1] == 1:
+            prices = np.concatenate((prices, np.full_like(prices, np.inf)), axis=1)
+        sorted_prices = np.partition(prices, 1, axis=1)
+        min_price, second_min_price = sorted_prices[:, 0], sorted_prices[:, 1]
+
+        # Randomly select the winning server out of the servers with the minimum price
+        min_servers = valid & (auction_prices == min_price[:, None])
+        winning_server = np.argmax(np.where(min_servers, self._rng.random(min_servers.shape), -1), axis=1)
+        won = auction_envs & min_servers.any(axis=1)
+
+        # Update the won tasks with the winning server and price
+        won_envs = np.flatnonzero(won)
+        won_tasks = self._auction_task[won_envs]
+        won_prices = np.where(second_min_price < np.inf, second_min_price, min_price)[won_envs]
+        self._task_server[won_envs, won_tasks] = winning_server[won_envs]
+        self._task_stage[won_envs, won_tasks] = LOADING
+        self._price[won_envs, won_tasks] = won_prices
+        auction_rewards[won_envs, winning_server[won_envs]] = won_prices
+
+        # The next auction task is found at the same time step
+        self._next_task[auction_envs] += 1
+        self._next_auction_tasks(auction_envs)
+        return auction_rewards
+
+    def _resource_allocation(self, allocation_envs: np.ndarray, resource_weights: np.ndarray) -> np.ndarray:
+        """
+        Allocates the resources of every server in the resource allocation environments
+
+        Args:
+            allocation_envs: The environments at a resource allocation step
+            resource_weights: The weighting of each task
+
+        Returns: If each task finished during the resource allocation
+
+        """
+        stage = self._task_stage
+        active = allocation_envs[:, None] & ((stage == LOADING) | (stage == COMPUTING) | (stage == SENDING))
+        finished_tasks = np.zeros(self.task_mask.shape, dtype=bool)
+
+        env_nums, task_nums = np.nonzero(active)
+        if len(env_nums):
+            num_servers = self.server_mask.shape[1]
+            updated_stage, loading_progress, compute_progress, sending_progress = allocate_resources(
+                env_nums * num_servers + self._task_server[env_nums, task_nums],
+                resource_weights[env_nums, task_nums], stage[env_nums, task_nums],
+                self._loading_progress[env_nums, task_nums], self._compute_progress[env_nums, task_nums],
+                self._sending_progress[env_nums, task_nums], self.required_storage[env_nums, task_nums],
+                self.required_computation[env_nums, task_nums], self.required_results_data[env_nums, task_nums],
+                self.deadline[env_nums, task_nums], self.storage_cap.ravel(), self.computational_cap.ravel(),
+                self.bandwidth_cap.ravel(), self._time_step[env_nums])
+
+            self._task_stage[env_nums, task_nums] = updated_stage
+            self._loading_progress[env_nums, task_nums] = loading_progress
+            self._compute_progress[env_nums, task_nums] = compute_progress
+            self._sending_progress[env_nums, task_nums] = sending_progress
+            finished_tasks[env_nums, task_nums] = (updated_stage == COMPLETED) | (updated_stage == FAILED)
+
+        self._time_step[allocation_envs] += 1
+        self._next_auction_tasks(allocation_envs)
+        return finished_tasks
+
+    def _next_auction_tasks(self, envs: np.ndarray):
+        """
+        Updates the auction task of the environments, if the next unallocated task auction time is the time step
+
+        Args:
+            envs: The environments to update the auction task of
+        """
+        if self.task_mask.shape[1] == 0:
+            # No environment has any tasks so there is never an auction task
+            self._auction_task[envs] = -1
+            return
+
+        next_task = np.minimum(self._next_task, self.task_mask.shape[1] - 1)
+        next_auction_time = np.where(self._next_task < self.task_mask.shape[1],
+                                     self.auction_time[np.arange(self.num_envs), next_task],
+                                     np.iinfo(np.int64).max)
+        assert np.all(self._time_step[envs] <= next_auction_time[envs])
+        self._auction_task[envs] = np.where(next_auction_time == self._time_step, self._next_task, -1)[envs]
+
+    def env_state(self, env_num: int) -> EnvState:
+        """
+        Converts a single environment of the batch to an environment state of servers and tasks
+
+        Args:
+            env_num: The environment number
+
+        Returns: The environment state
+
+        """
+        def task(task_num: int) -> Task:
+            return Task(name=self._task_names[env_num][task_num],
+                        required_storage=float(self.required_storage[env_num, task_num]),
+                        required_computation=float(self.required_computation[env_num, task_num]),
+                        required_results_data=float(self.required_results_data[env_num, task_num]),
+                        auction_time=int(self.auction_time[env_num, task_num]),
+                        deadline=int(self.deadline[env_num, task_num]),
+                        stage=TaskStage(int(self._task_stage[env_num, task_num])),
+                        loading_progress=float(self._loading_progress[env_num, task_num]),
+                        compute_progress=float(self._compute_progress[env_num, task_num]),
+                        sending_progress=float(self._sending_progress[env_num, task_num]),
+                        price=float(self._price[env_num, task_num]),
+                        uid=self._task_uids[env_num][task_num])
+
+        stage = self._task_stage[env_num]
+        active = (stage == LOADING) | (stage == COMPUTING) | (stage == SENDING)
+        server_tasks = {
+            Server(name=server_name, storage_cap=float(self.storage_cap[env_num, server_num]),
+                   computational_cap=float(self.computational_cap[env_num, server_num]),
+                   bandwidth_cap=float(self.bandwidth_cap[env_num, server_num]),
+                   uid=self._server_uids[env_num][server_num]): [
+                task(task_num) for task_num in np.flatnonzero(active & (self._task_server[env_num] == server_num))
+            ]
+            for server_num, server_name in enumerate(self._server_names[env_num])
+        }
+        auction_task = task(self._auction_task[env_num]) if 0 <= self._auction_task[env_num] else None
+        return EnvState(server_tasks, auction_task, int(self._time_step[env_num]))
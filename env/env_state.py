@@ -7,13 +7,17 @@ from typing import TYPE_CHECKING, NamedTuple
 if TYPE_CHECKING:
     from env.task import Task
     from env.server import Server
-    from typing import Dict, List, Optional
+    from typing import Dict, List, Optional, Tuple
 
 
 class EnvState(NamedTuple):
     """
     The environment state that contains a dictionary of server to list of tasks, the task being auctioned
-        and the time step
+        and the time step. With batched auctions, all of the tasks being auctioned at the time step are the auction
+        tasks (the auction task is then the first auction task)
+
+    The server task lists are shared between consecutive states (copy-on-write), a step that changes the tasks of a
+        server replaces the server's list rather than mutating it, so the lists must never be modified in place
     """
     # 服务器及其任务列表
     server_tasks: Dict[Server, List[Task]]
@@ -21,6 +25,8 @@ class EnvState(NamedTuple):
     auction_task: Optional[Task]
     # 当前时间步
     time_step: int
+    # The tasks being auctioned together with batched auctions
+    auction_tasks: Tuple[Task, ...] = ()
 
     # 将Env对象转换为字符串表示
     def __str__(self) -> str:
@@ -5,24 +5,38 @@ Environment for online flexible resource allocation
 from __future__ import annotations
 
 import json
-import operator
 import random as rnd
-from copy import deepcopy
+from copy import copy
+from functools import lru_cache
 from math import inf
 from typing import TYPE_CHECKING, Optional, Sequence
 
 import gym
+import numpy as np
 
+from env.arrival_queue import ArrivalQueue
+from env.batched_allocation import allocate_resources as batched_allocate_resources
+from env.fixed_point import from_fixed, to_fixed
+from env.observation import action_space, array_actions, array_observation, array_rewards, observation_space
 from env.env_state import EnvState
 from env.server import Server
+from env.sharded_allocation import ShardPool
+from env.snapshot import Snapshot, is_snapshot, save_snapshot
+from env.state_delta import state_deltas
+from env.step_info import StepInfo
 from env.task import Task
 from env.task_stage import TaskStage
+from env.task_table import TaskTable, TaskView
+from env.validation import ValidationLevel, Validator
+from env.workload_trace import WorkloadTrace
 
 if TYPE_CHECKING:
-    from typing import List, Dict, Union, Tuple
+    from env.scenario_bank import ScenarioBank
+    from env.scenario_generator import ScenarioGenerator
+    from typing import Any, List, Dict, Iterable, Iterator, Union, Tuple
 
-    ACTION_TYPE = Dict[Server, Union[float, Dict[Task, float]]]
-    REWARD_TYPE = Dict[Server, Union[float, List[Task]]]
+    ACTION_TYPE = Union[Dict[Server, Union[float, Dict[Task, float]]], np.ndarray]
+    REWARD_TYPE = Dict[Server, Union[float, List[Task], Dict[Task, float]]]
 
 
 class OnlineFlexibleResourceAllocationEnv(gym.Env):
@@ -34,7 +48,14 @@ class OnlineFlexibleResourceAllocationEnv(gym.Env):
 
     def __init__(self, env_settings: Optional[Union[str, List[str]]], env_name: str = '',
                  server_tasks: Optional[Dict[Server, List[Task]]] = None, tasks: Sequence[Task] = (),
-                 time_step: int = -1, total_time_steps: int = -1):
+                 time_step: int = -1, total_time_steps: int = -1,
+                 validation_level: ValidationLevel = ValidationLevel.FULL, validation_frequency: int = 100,
+                 scenario_bank: Optional[ScenarioBank] = None, skip_idle: bool = False,
+                 scenario_generator: Optional[ScenarioGenerator] = None, batched_allocation: bool = False,
+                 task_table: bool = False, fixed_point: bool = False, batch_auctions: bool = False,
+                 task_source: Optional[Iterable[Task]] = None, stream_tasks: bool = False,
+                 delta_updates: bool = False, array_observations: bool = False, max_servers: int = 0,
+                 max_tasks: int = 0, num_shards: int = 0):
         """
         这是一个环境的构造函数，可以使用环境设置文件来创建环境，也可以创建一个无法重置的新环境。
         Args:
@@ -44,34 +65,84 @@ class OnlineFlexibleResourceAllocationEnv(gym.Env):
             tasks: 任务的可选列表
             time_step: 可选的环境时间步
             total_time_steps: 可选的环境总时间步
+            validation_level: The level of invariant checking of each step (off, sampled or full)
+            validation_frequency: The number of steps between each check for the sampled validation level
+            scenario_bank: Optional bank of pre-generated scenarios that reset takes the next scenario from
+            skip_idle: If to jump to the next auction time (or the end of the environment) when no server has any
+                tasks and no task is being auctioned, rather than stepping through the idle time steps
+            scenario_generator: Optional vectorised generator of the servers and tasks on reset
+            batched_allocation: If to allocate the resources of every server at once with numpy arrays
+                (see env/batched_allocation.py) rather than with each server's allocate_resources
+            task_table: If to store the allocated tasks in a mutable task table (see env/task_table.py) that is
+                updated in place by the resource allocation, the server tasks of the states are then task views
+                whose values change as the environment is stepped
+            fixed_point: If the batched allocation and the task table use fixed-point integer resource values
+                (see env/fixed_point.py) rather than floats rounded to four decimal places
+            batch_auctions: If to auction every task arriving at a time step in a single step (the state auction
+                tasks) rather than a step for each task
+            task_source: Optional task source (an iterator of tasks in arrival order) of the tasks arriving after the
+                tasks, the tasks are only read from the source as the time step reaches them
+            stream_tasks: If reset generates the tasks of the env settings as a task source rather than a task list
+                (not used with the scenario bank or scenario generator)
+            delta_updates: If the step information includes the tasks added, progressed and finished of each server
+                (see env/state_delta.py) so the agents can update rather than rebuild their observations
+            array_observations: If reset and step use fixed-shape arrays (see env/observation.py) for the
+                observations, actions and rewards rather than the environment states and dictionaries, with the
+                observation and action spaces of the arrays
+            max_servers: The maximum number of servers of the array observations
+            max_tasks: The maximum number of tasks of a server of the array observations
+            num_shards: If positive, the servers are split into shards that allocate resources in parallel worker
+                processes (see env/sharded_allocation.py), the environment must be closed to stop the workers
+                (only one of the task table, batched allocation and sharded allocation can be used)
         """
-        if env_settings:
-            self.env_settings = [env_settings] if type(env_settings) is str else env_settings
-
-            self.env_name, self._total_time_steps, self._unallocated_tasks, self._state = '', -1, [], None
+        self.validator = Validator(validation_level, validation_frequency)
+        self.scenario_bank = scenario_bank
+        self.skip_idle = skip_idle
+        self.scenario_generator = scenario_generator
+        self.batched_allocation = batched_allocation
+        self.task_table = task_table
+        self.fixed_point = fixed_point
+        assert not fixed_point or batched_allocation or task_table, \
+            'Fixed-point values are only used by the batched allocation and the task table'
+        assert task_table + batched_allocation + (0 < num_shards) <= 1, \
+            'Only one of the task table, batched allocation and sharded allocation can be used'
+        self.batch_auctions = batch_auctions
+        self.stream_tasks = stream_tasks
+        self.delta_updates = delta_updates
+        self.array_observations = array_observations
+        self.max_servers = max_servers
+        self.max_tasks = max_tasks
+        if array_observations:
+            assert 0 < max_servers and 0 < max_tasks
+            assert not batch_auctions, 'The array observations only have a single auction task'
+            self.observation_space = observation_space(max_servers, max_tasks)
+            self.action_space = action_space(max_servers, max_tasks)
+        self._shard_pool: Optional[ShardPool] = ShardPool(num_shards) if 0 < num_shards else None
+        self._task_table: Optional[TaskTable] = None
+
+        if env_settings or scenario_bank is not None:
+            self.env_settings = [env_settings] if type(env_settings) is str else list(env_settings or [])
+
+            self.env_name, self._total_time_steps, self._state = '', -1, None
+            self._unallocated_tasks = ArrivalQueue()
         else:
             self.env_settings = []
 
             self.env_name = env_name
             self._total_time_steps = total_time_steps
-            self._unallocated_tasks: List[tasks] = list(tasks)
             assert all(tasks[pos].auction_time <= tasks[pos + 1].auction_time for pos in range(len(tasks) - 1))
+            self._unallocated_tasks = ArrivalQueue(tasks, task_source)
             if self._unallocated_tasks:
-                assert time_step <= self._unallocated_tasks[0].auction_time
-
-                if self._unallocated_tasks[0].auction_time == time_step:
-                    auction_task = self._unallocated_tasks.pop(0)
-                else:
-                    auction_task = None
-            else:
-                auction_task = None
-            self._state = EnvState(server_tasks, auction_task, time_step)
+                assert time_step <= self._unallocated_tasks.peek().auction_time
+            self._state = self._skip_idle_steps(self._auction_state(self._new_task_table(server_tasks), time_step))
 
     def __str__(self) -> str:
         if self._total_time_steps == -1:
             return 'Environment hasn\'t been generated'
         else:
-            unallocated_task_str = '\n\t'.join([str(task) for task in self._unallocated_tasks])
+            # Only the buffered tasks are shown as the task source may be unbounded
+            unallocated_task_str = '\n\t'.join([str(task) for task in self._unallocated_tasks.buffered_tasks()] +
+                                                (['<task source>'] if self._unallocated_tasks.unread_source else []))
             server_tasks_str = ', '.join([f'{server.name}: [{", ".join([task.name for task in tasks])}]'
                                           for server, tasks in self._state.server_tasks.items()])
             auction_task_str = str(self._state.auction_task) if self._state.auction_task else 'None'
@@ -84,6 +155,15 @@ class OnlineFlexibleResourceAllocationEnv(gym.Env):
     def _repr_pretty_(self, p, cycle):
         p.text(self.__str__())
 
+    def close(self):
+        """
+        Closes the environment, stopping the shard worker processes if using sharded resource allocation (once this
+            environment and its forks sharing the worker processes are all closed)
+        """
+        if self._shard_pool is not None:
+            self._shard_pool.close()
+            self._shard_pool = None
+
     def render(self, mode='human'):
         """
         Renders the environment to a graph
@@ -96,44 +176,92 @@ class OnlineFlexibleResourceAllocationEnv(gym.Env):
     def reset(self) -> EnvState:
         """
         Resets the environment using one of the environment env_settings that is randomly chosen
+            (or the next scenario of the scenario bank)
 
         Returns: The new environment state
 
         """
-        assert 0 < len(self.env_settings)
-
-        # Select the env settings and load the environment env_settings
-        env_setting: str = rnd.choice(self.env_settings)
-        env_name, new_servers, new_tasks, new_total_time_steps = self._load_setting(env_setting)
+        if self.scenario_bank is not None:
+            env_name, new_servers, new_tasks, new_total_time_steps = self.scenario_bank.next()
+        else:
+            assert 0 < len(self.env_settings)
+
+            # Select the env settings and load the environment env_settings
+            env_setting: str = rnd.choice(self.env_settings)
+            if self.scenario_generator is not None:
+                env_name, new_servers, new_tasks, new_total_time_steps = self.scenario_generator.generate(
+                    self._read_setting(env_setting))
+            elif self.stream_tasks:
+                env_name, new_servers, new_tasks, new_total_time_steps = self._generate_setting(
+                    self._read_setting(env_setting), stream_tasks=True)
+            else:
+                env_name, new_servers, new_tasks, new_total_time_steps = self._load_setting(env_setting)
 
         # Update the environment variables
         self.env_name = env_name
         self._total_time_steps = new_total_time_steps
-        self._unallocated_tasks: List[Task] = sorted(new_tasks, key=operator.attrgetter('auction_time'))
-        auction_task = self._unallocated_tasks.pop(0) if self._unallocated_tasks[0].auction_time == 0 else None
-        self._state = EnvState({server: [] for server in new_servers}, auction_task, 0)
+        if self.stream_tasks and self.scenario_bank is None and self.scenario_generator is None:
+            self._unallocated_tasks = ArrivalQueue(source=new_tasks)
+        else:
+            self._unallocated_tasks = ArrivalQueue(new_tasks)
+        self._state = self._skip_idle_steps(self._auction_state(
+            self._new_task_table({server: [] for server in new_servers}), 0))
+
+        return self.observation() if self.array_observations else self._state
 
-        return self._state
+    def observation(self) -> Dict[str, np.ndarray]:
+        """
+        Returns: The array observation of the current state (see env/observation.py)
+
+        """
+        return array_observation(self._state, self.max_servers, self.max_tasks)
 
-    def step(self, actions: ACTION_TYPE) -> Tuple[EnvState, REWARD_TYPE, bool, Dict[str, str]]:
+    def step(self, actions: Union[ACTION_TYPE, Dict[str, np.ndarray]]) \
+            -> Tuple[Union[EnvState, Dict[str, np.ndarray]], Union[REWARD_TYPE, Dict[str, np.ndarray]], bool,
+                     StepInfo]:
+        """
+        An environment step that is either an auction step or a resource allocation step, if using array
+            observations then the actions, next state and rewards are arrays (see env/observation.py)
+
+        Args:
+            actions: The actions can be for auction or resource allocation meaning the data structure changes
+
+        Returns:A tuple of environment state, rewards, if done and information (the information values are only
+            formatted when read, see env/step_info.py)
+
+        """
+        if not self.array_observations:
+            return self._step(actions)
+
+        state = self._state
+        _, rewards, done, info = self._step(array_actions(state, actions, self.max_tasks))
+        return self.observation(), array_rewards(state, rewards, self.max_servers, self.max_tasks), done, info
+
+    def _step(self, actions: ACTION_TYPE) -> Tuple[EnvState, REWARD_TYPE, bool, StepInfo]:
         """
         An environment step that is either an auction step or a resource allocation step
 
         Args:
             actions: The actions can be for auction or resource allocation meaning the data structure changes
 
-        Returns:A tuple of environment state, rewards, if done and information
+        Returns:A tuple of environment state, rewards, if done and information (the information values are only
+            formatted when read, see env/step_info.py)
 
         """
-        info: Dict[str, str] = {}
+        validate = self.validator.check()
+        allocation_step = not self._state.auction_tasks and self._state.auction_task is None
+
+        # If there are batched auction tasks then the actions must be the prices of each auction task
+        if self._state.auction_tasks:  # Batched auction action = Dict[Server, Dict[Task, float]] or price matrix
+            next_state, rewards, info = self._batched_auction(actions, validate)
 
         # If there is an auction task then the actions must be auction
-        if self._state.auction_task is not None:  # Auction action = Dict[Server, float])
-            info['step type'] = 'auction'
-            assert all(server in actions for server in self._state.server_tasks.keys())
-            assert all(type(action) is float for action in actions.values()), \
-                ', '.join(str(type(action)) for action in actions.values())
-            assert all(0 <= action for action in actions.values())
+        elif self._state.auction_task is not None:  # Auction action = Dict[Server, float])
+            if validate:
+                assert all(server in actions for server in self._state.server_tasks.keys())
+                assert all(type(action) is float for action in actions.values()), \
+                    ', '.join(str(type(action)) for action in actions.values())
+                assert all(0 <= action for action in actions.values())
 
             # Vickrey auction, the server wins with the minimum price but only pays the second minimum price
             #  If multiple servers all price the same price then the server pays the minimum price (not second minimum price)
@@ -148,78 +276,334 @@ class OnlineFlexibleResourceAllocationEnv(gym.Env):
                     elif price < second_min_price:
                         second_min_price = price
 
-            # Creates the next environment state by copying the server task info, get the next auction task and the time step doesnt change
-            next_state: EnvState = EnvState(deepcopy(self._state.server_tasks),
-                                            self._next_auction_task(self._state.time_step),
-                                            self._state.time_step)
+            # Creates the next environment state by sharing the server task lists (only the winning server's list is
+            #   replaced), get the next auction task and the time step doesnt change
+            next_state: EnvState = self._auction_state(dict(self._state.server_tasks), self._state.time_step)
             # The reward dictionary of server to price (this is only for the server that won)
             rewards: Dict[Server, float] = {}
 
             # Select the winning server and update the next state with the auction task
             if min_servers:
                 winning_server: Server = rnd.choice(min_servers)
-                info['min price servers'] = f"[{', '.join(server.name for server in min_servers)}]"
-                info['min price'] = str(min_price)
-                info['second min price'] = str(second_min_price)
-                info['winning server'] = winning_server.name
+                info = StepInfo('auction', self._state.server_tasks.keys(), min_servers, min_price, second_min_price,
+                                winning_server)
 
                 # Update the next state servers with the auction task
                 if min_servers:
                     price = second_min_price if second_min_price < inf else min_price
                     rewards[winning_server] = price
                     updated_task = self._state.auction_task.assign_server(price, self._state.time_step)
-                    next_state.server_tasks[winning_server].append(updated_task)
+                    if self._task_table is not None:
+                        updated_task = self._task_table.add(updated_task)
+                    next_state.server_tasks[winning_server] = next_state.server_tasks[winning_server] + [updated_task]
             else:
-                info['min servers'] = 'failed, no server won'
+                info = StepInfo('auction')
 
         else:
             # Resource allocation (Action = Dict[Server, Dict[Task, float]])
             # Convert weights to resources
-            info['step type'] = 'resource allocation'
-            assert all(server in actions for server in self._state.server_tasks.keys())
-            assert all(task in actions[server] for server, tasks in self._state.server_tasks.items() for task in tasks), \
-                ', '.join([f'{server.name}: {task.name}' for server, tasks in self._state.server_tasks.items()
-                           for task in tasks if task not in actions[server]])
-            assert all(type(actions[server][task]) is float and 0 <= actions[server][task]
-                       for server, tasks in self._state.server_tasks.items() for task in tasks)
+            info = StepInfo('resource allocation')
+            if validate:
+                assert all(server in actions for server in self._state.server_tasks.keys())
+                assert all(task in actions[server]
+                           for server, tasks in self._state.server_tasks.items() for task in tasks), \
+                    ', '.join([f'{server.name}: {task.name}' for server, tasks in self._state.server_tasks.items()
+                               for task in tasks if task not in actions[server]])
+                assert all(type(actions[server][task]) is float and 0 <= actions[server][task]
+                           for server, tasks in self._state.server_tasks.items() for task in tasks)
 
             # The updated server tasks and the resulting rewards
             next_server_tasks: Dict[Server, List[Task]] = {}
             rewards: Dict[Server, List[Task]] = {}
 
-            # For each server, if the server has tasks then allocate resources using the task weights
-            for server, task_resource_weights in actions.items():
-                if self._state.server_tasks[server]:
-                    # Allocate resources returns two lists, one of unfinished tasks and the other of finished tasks
-                    next_server_tasks[server], rewards[server] = server.allocate_resources(task_resource_weights,
-                                                                                           self._state.time_step)
+            if self._task_table is not None:
+                next_server_tasks, rewards = self._table_resource_allocation(actions)
+            elif self.batched_allocation:
+                next_server_tasks, rewards = self._batched_resource_allocation(actions)
+            elif self._shard_pool is not None:
+                next_server_tasks, rewards = self._shard_pool.allocate_resources(
+                    self._state.server_tasks, actions, self._state.time_step, validate)
+            else:
+                # For each server, if the server has tasks then allocate resources using the task weights
+                for server, task_resource_weights in actions.items():
+                    if self._state.server_tasks[server]:
+                        # Allocate resources returns two lists, one of unfinished tasks and the other of finished tasks
+                        next_server_tasks[server], rewards[server] = server.allocate_resources(
+                            task_resource_weights, self._state.time_step, validate=validate)
+                    else:
+                        next_server_tasks[server], rewards[server] = [], []
+
+            # The updated state
+            next_state = self._auction_state(next_server_tasks, self._state.time_step + 1)
+
+            if validate:
+                assert sum(len(tasks) for tasks in self._state.server_tasks.values()) == sum(
+                    len(tasks) for tasks in next_server_tasks.values()) + sum(len(tasks) for tasks in rewards.values())
+                # Painful to execute O(n^2) but just checks that all tasks that are modified
+                assert all(
+                    id(task) != id(_task)
+                    for tasks in self._state.server_tasks.values() for task in tasks
+                    for _tasks in next_state.server_tasks.values() for _task in _tasks)
+
+        if self.delta_updates:
+            info.deltas = state_deltas(self._state.server_tasks, next_state.server_tasks,
+                                       rewards if allocation_step else None)
+
+        if validate:
+            self._assert_valid_state(next_state)
+
+        self._state = self._skip_idle_steps(next_state)
+        return self._state, rewards, self._total_time_steps < self._state.time_step, info
+
+    def _batched_resource_allocation(self, actions: Dict[Server, Dict[Task, float]]) \
+            -> Tuple[Dict[Server, List[Task]], Dict[Server, List[Task]]]:
+        """
+        Allocates the resources of every server at once, the tasks of all of the servers are flattened to arrays
+            with the server number of each task
+
+        Args:
+            actions: The resource weights of each server's tasks
+
+        Returns: Tuple of the dictionary of server to unfinished tasks and the dictionary of server to finished
+            (completed or failed) tasks, in the order of the server's tasks (the same as Server.allocate_resources)
+
+        """
+        server_tasks = self._state.server_tasks
+        tasks = [task for tasks in server_tasks.values() for task in tasks]
+        if not tasks:
+            return {server: [] for server in server_tasks.keys()}, {server: [] for server in server_tasks.keys()}
+
+        group = np.repeat(np.arange(len(server_tasks)), [len(tasks) for tasks in server_tasks.values()])
+        weights = np.array([actions[server][task] for server, tasks in server_tasks.items() for task in tasks],
+                           dtype=np.float64)
+        (stage, loading_progress, compute_progress, sending_progress, required_storage, required_computation,
+         required_results_data, deadline) = np.array(
+            [(task.stage.value, task.loading_progress, task.compute_progress, task.sending_progress,
+              task.required_storage, task.required_computation, task.required_results_data, task.deadline)
+             for task in tasks], dtype=np.float64).T
+        storage_cap, computational_cap, bandwidth_cap = np.array(
+            [(server.storage_cap, server.computational_cap, server.bandwidth_cap) for server in server_tasks.keys()],
+            dtype=np.float64).T
+        resources = (loading_progress, compute_progress, sending_progress, required_storage, required_computation,
+                     required_results_data, storage_cap, computational_cap, bandwidth_cap)
+        if self.fixed_point:
+            resources = tuple(to_fixed(resource) for resource in resources)
+        (loading_progress, compute_progress, sending_progress, required_storage, required_computation,
+         required_results_data, storage_cap, computational_cap, bandwidth_cap) = resources
+
+        stage, loading_progress, compute_progress, sending_progress = batched_allocate_resources(
+            group, weights, stage.astype(np.int64), loading_progress, compute_progress, sending_progress,
+            required_storage, required_computation, required_results_data, deadline.astype(np.int64),
+            storage_cap, computational_cap, bandwidth_cap, self._state.time_step, self.fixed_point)
+        if self.fixed_point:
+            loading_progress, compute_progress, sending_progress = \
+                from_fixed(loading_progress), from_fixed(compute_progress), from_fixed(sending_progress)
+
+        # Update the tasks with the new stage and progress then split the tasks of each server into those still
+        #   ongoing and those completed or failed
+        stages = {task_stage.value: task_stage for task_stage in TaskStage}
+        updated_tasks = iter([
+            task._replace(stage=stages[task_stage], loading_progress=loading, compute_progress=compute,
+                          sending_progress=sending)
+            for task, task_stage, loading, compute, sending in zip(
+                tasks, stage.tolist(), loading_progress.tolist(), compute_progress.tolist(),
+                sending_progress.tolist())
+        ])
+        next_server_tasks: Dict[Server, List[Task]] = {}
+        finished_tasks: Dict[Server, List[Task]] = {}
+        for server, tasks in server_tasks.items():
+            server_updated_tasks = [next(updated_tasks) for _ in tasks]
+            next_server_tasks[server] = [task for task in server_updated_tasks
+                                         if not (task.stage is TaskStage.COMPLETED or task.stage is TaskStage.FAILED)]
+            finished_tasks[server] = [task for task in server_updated_tasks
+                                      if task.stage is TaskStage.COMPLETED or task.stage is TaskStage.FAILED]
+        return next_server_tasks, finished_tasks
+
+    def _table_resource_allocation(self, actions: Dict[Server, Dict[Task, float]]) \
+            -> Tuple[Dict[Server, List[Task]], Dict[Server, List[Task]]]:
+        """
+        Allocates the resources of every server at once by updating the task table rows in place, the task views of
+            the current state are frozen first (see TaskTable.next_generation) so the previous states keep their values
+
+        Args:
+            actions: The resource weights of each server's tasks
+
+        Returns: Tuple of the dictionary of server to unfinished task views and the dictionary of server to finished
+            (completed or failed) tasks, in the order of the server's tasks (the same as Server.allocate_resources)
+
+        """
+        table, server_tasks = self._task_table, self._state.server_tasks
+        task_views = [task for tasks in server_tasks.values() for task in tasks]
+        if not task_views:
+            return {server: [] for server in server_tasks.keys()}, {server: [] for server in server_tasks.keys()}
+
+        rows = np.array([task.row for task in task_views], dtype=np.int64)
+        generation = table.next_generation(rows)
+        group = np.repeat(np.arange(len(server_tasks)), [len(tasks) for tasks in server_tasks.values()])
+        weights = np.array([actions[server][task] for server, tasks in server_tasks.items() for task in tasks],
+                           dtype=np.float64)
+        storage_cap, computational_cap, bandwidth_cap = np.array(
+            [(server.storage_cap, server.computational_cap, server.bandwidth_cap) for server in server_tasks.keys()],
+            dtype=np.float64).T
+        if table.fixed_point:
+            storage_cap, computational_cap, bandwidth_cap = \
+                to_fixed(storage_cap), to_fixed(computational_cap), to_fixed(bandwidth_cap)
+
+        stage, table.loading_progress[rows], table.compute_progress[rows], table.sending_progress[rows] = \
+            batched_allocate_resources(group, weights, table.stage[rows], table.loading_progress[rows],
+                                       table.compute_progress[rows], table.sending_progress[rows],
+                                       table.required_storage[rows], table.required_computation[rows],
+                                       table.required_results_data[rows], table.deadline[rows],
+                                       storage_cap, computational_cap, bandwidth_cap, self._state.time_step,
+                                       table.fixed_point)
+        table.stage[rows] = stage
+
+        # Split the tasks of each server into the views of the ongoing tasks and the completed or failed tasks, the
+        #   finished tasks are removed from the table so their rows are reused
+        finished = iter(((stage == TaskStage.COMPLETED.value) | (stage == TaskStage.FAILED.value)).tolist())
+        next_rows = iter(zip(rows.tolist(), (task.uid for task in task_views)))
+        next_server_tasks: Dict[Server, List[Task]] = {server: [] for server in server_tasks.keys()}
+        finished_tasks: Dict[Server, List[Task]] = {server: [] for server in server_tasks.keys()}
+        finished_rows: List[int] = []
+        for server, tasks in server_tasks.items():
+            for _ in tasks:
+                row, uid = next(next_rows)
+                if next(finished):
+                    finished_tasks[server].append(table.task(row))
+                    finished_rows.append(row)
                 else:
-                    next_server_tasks[server], rewards[server] = [], []
+                    next_server_tasks[server].append(TaskView(generation, row, uid))
+        table.remove(finished_rows)
+        return next_server_tasks, finished_tasks
 
-            assert sum(len(tasks) for tasks in self._state.server_tasks.values()) == sum(
-                len(tasks) for tasks in next_server_tasks.values()) + sum(len(tasks) for tasks in rewards.values())
+    def _new_task_table(self, server_tasks: Optional[Dict[Server, List[Task]]]) -> Optional[Dict[Server, List[Task]]]:
+        """
+        If using a task table, creates a new task table with the allocated tasks of the servers
 
-            # The updated state
-            next_state = EnvState(next_server_tasks,
-                                  self._next_auction_task(self._state.time_step + 1),
-                                  self._state.time_step + 1)
+        Args:
+            server_tasks: Dictionary of server to allocated tasks
 
+        Returns: The server tasks, with task views of the new task table if using a task table
+
+        """
+        if not self.task_table or server_tasks is None:
+            return server_tasks
+
+        self._task_table = TaskTable(fixed_point=self.fixed_point)
+        return {server: [self._task_table.add(task) for task in tasks] for server, tasks in server_tasks.items()}
+
+    def _skip_idle_steps(self, state: EnvState) -> EnvState:
+        """
+        If skipping idle time steps, when no server has any tasks and no task is being auctioned then nothing can
+            happen till the next task arrives so the state jumps to the next auction time or the end of the environment
+
+        Args:
+            state: The environment state
+
+        Returns: The state after the idle time steps
+
+        """
+        if not self.skip_idle or state.auction_task is not None or self._total_time_steps < state.time_step or \
+                any(state.server_tasks.values()):
+            return state
+
+        next_task = self._unallocated_tasks.peek()
+        if next_task is not None and next_task.auction_time <= self._total_time_steps:
+            time_step = next_task.auction_time
+        else:
+            time_step = self._total_time_steps + 1
+        return self._auction_state(state.server_tasks, time_step)
+
+    @staticmethod
+    def _assert_valid_state(state: EnvState):
+        """
+        Asserts that all of the active tasks of the state are valid
+
+        Args:
+            state: The environment state
+        """
         # Check that all active task are within the valid time step
-        assert all(task.auction_time <= next_state.time_step <= task.deadline
-                   for server, tasks in next_state.server_tasks.items() for task in tasks), next_state
-        # Painful to execute O(n^2) but just checks that all tasks that are modified
-        assert all(id(task) != id(_task)
-                   for tasks in self._state.server_tasks.values() for task in tasks
-                   for _tasks in next_state.server_tasks.values() for _task in _tasks)
+        assert all(task.auction_time <= state.time_step <= task.deadline
+                   for server, tasks in state.server_tasks.items() for task in tasks), state
         assert all(
             task.stage is TaskStage.LOADING or task.stage is TaskStage.COMPUTING or task.stage is TaskStage.SENDING
-            for server, tasks in next_state.server_tasks.items() for task in tasks)
-        for server, tasks in next_state.server_tasks.items():
+            for server, tasks in state.server_tasks.items() for task in tasks)
+        for server, tasks in state.server_tasks.items():
             for task in tasks:
                 task.assert_valid()
 
-        self._state = next_state
-        return self._state, rewards, self._total_time_steps < self._state.time_step, info
+    def _auction_state(self, server_tasks: Dict[Server, List[Task]], time_step: int) -> EnvState:
+        """
+        The environment state at a time step with the next auction task, or with batched auctions, every task
+            arriving at the time step
+
+        Args:
+            server_tasks: Dictionary of server to allocated tasks
+            time_step: The time step of the state
+
+        Returns: The environment state
+
+        """
+        auction_task = self._next_auction_task(time_step)
+        if self.batch_auctions and auction_task is not None:
+            return EnvState(server_tasks, auction_task, time_step,
+                            (auction_task, *self._unallocated_tasks.pop_all(time_step)))
+        else:
+            return EnvState(server_tasks, auction_task, time_step)
+
+    def _batched_auction(self, actions: Union[Dict[Server, Dict[Task, float]], np.ndarray],
+                         validate: bool) -> Tuple[EnvState, Dict[Server, Dict[Task, float]], StepInfo]:
+        """
+        Sealed-bid Vickrey auctions of all of the auction tasks at once, each task is auctioned with the servers'
+            prices for the task (a server can win several tasks)
+
+        Args:
+            actions: Either a dictionary of server to the price of each auction task or a price matrix of servers by
+                auction tasks (in the order of the state servers and auction tasks)
+            validate: If to check that the prices are valid
+
+        Returns: Tuple of the next state, the dictionary of server to the price of each task won and the step info
+
+        """
+        servers = list(self._state.server_tasks.keys())
+        auction_tasks = self._state.auction_tasks
+        if isinstance(actions, np.ndarray):
+            prices = actions.astype(np.float64)
+        else:
+            if validate:
+                assert all(server in actions and all(task in actions[server] for task in auction_tasks)
+                           for server in servers)
+            prices = np.array([[actions[server][task] for task in auction_tasks] for server in servers],
+                              dtype=np.float64).reshape(len(servers), len(auction_tasks))
+        if validate:
+            assert prices.shape == (len(servers), len(auction_tasks)), prices.shape
+            assert np.all(0 <= prices)
+
+        # Zero prices are ignored, the minimum and second minimum prices of each task are the first two sorted prices
+        #   so if multiple servers price the minimum price then the second minimum price is the minimum price
+        bids = np.where(0 < prices, prices, inf)
+        sorted_bids = np.sort(bids, axis=0)
+        min_prices = sorted_bids[0]
+        second_min_prices = sorted_bids[1] if 1 < len(servers) else np.full(len(auction_tasks), inf)
+        win_prices = np.where(second_min_prices < inf, second_min_prices, min_prices)
+
+        # The tasks won by each server, the winning server is randomly selected from the minimum price servers
+        won_tasks: Dict[Server, List[Task]] = {}
+        rewards: Dict[Server, Dict[Task, float]] = {}
+        for task_num in np.flatnonzero(min_prices < inf).tolist():
+            winning_server = servers[rnd.choice(np.flatnonzero(bids[:, task_num] == min_prices[task_num]).tolist())]
+            price = float(win_prices[task_num])
+            rewards.setdefault(winning_server, {})[auction_tasks[task_num]] = price
+
+            updated_task = auction_tasks[task_num].assign_server(price, self._state.time_step)
+            if self._task_table is not None:
+                updated_task = self._task_table.add(updated_task)
+            won_tasks.setdefault(winning_server, []).append(updated_task)
+
+        next_server_tasks = dict(self._state.server_tasks)
+        for server, tasks in won_tasks.items():
+            next_server_tasks[server] = next_server_tasks[server] + tasks
+        return self._auction_state(next_server_tasks, self._state.time_step), rewards, StepInfo('batched auction')
 
     def _next_auction_task(self, time_step: int) -> Optional[Task]:
         """
@@ -233,18 +617,67 @@ class OnlineFlexibleResourceAllocationEnv(gym.Env):
         """
         assert time_step >= 0
         if self._unallocated_tasks:
-            assert self._unallocated_tasks[0].auction_time >= time_step, \
-                f'Top unallocated task auction time {self._unallocated_tasks[0].auction_time} at time step: {time_step}'
-            return self._unallocated_tasks.pop(0) if self._unallocated_tasks[0].auction_time == time_step else None
+            assert self._unallocated_tasks.peek().auction_time >= time_step, \
+                f'Top unallocated task auction time {self._unallocated_tasks.peek().auction_time} ' \
+                f'at time step: {time_step}'
+        return self._unallocated_tasks.pop(time_step)
+
+    def fork(self) -> OnlineFlexibleResourceAllocationEnv:
+        """
+        Creates an independent environment at the current state of this environment for lookahead rollouts, the
+            immutable state, servers and tasks are shared with this environment rather than copied (only the
+            unallocated task queue cursor and added tasks, and the task table if using one, are copied). The shard
+            worker processes of sharded resource allocation are shared so forks must not be stepped concurrently,
+            and are only stopped once this environment and every fork are closed.
+
+        Returns: The forked environment
+
+        """
+        env = copy(self)
+        if self._shard_pool is not None:
+            env._shard_pool = self._shard_pool.share()
+        env.validator = copy(self.validator)
+        env._unallocated_tasks = self._unallocated_tasks.copy()
+        if self._task_table is not None:
+            # The task views of the state are replaced with the views of the copied table
+            env._task_table = self._task_table.copy()
+            env._state = self._state._replace(server_tasks={
+                server: [TaskView(env._task_table.generation, task.row, task.uid) for task in tasks]
+                for server, tasks in self._state.server_tasks.items()
+            })
+        return env
+
+    def add_task(self, task: Task):
+        """
+        Adds a new unallocated task to the environment during an episode
+
+        Args:
+            task: The new unallocated task, the task auction time must be after the current time step
+                (or the current time step if a task is currently being auctioned)
+        """
+        task.assert_valid()
+        assert task.stage is TaskStage.UNASSIGNED
+        assert self._state.time_step < task.auction_time or \
+            (self._state.time_step == task.auction_time and self._state.auction_task is not None), \
+            f'Task auction time {task.auction_time} at time step: {self._state.time_step}'
+
+        self._unallocated_tasks.push(task)
 
-    def save_env(self, filename: str):
+    def save_env(self, filename: str, binary: bool = False):
         """
-        Saves this environment to a file with the template in settings/format.env
+        Saves this environment to a file with the template in settings/format.env or as a binary snapshot, the
+            environment can't be saved while its task source has unread tasks unless the source is bounded (see
+            ArrivalQueue.bounded_source)
 
         Args:
             filename: The filename to save the environment to
+            binary: If to save the environment as a binary snapshot (see env/snapshot.py)
 
         """
+        # The unread tasks of a task source (that may be unbounded) can't be saved unless the source is bounded
+        assert not self._unallocated_tasks.unread_source or self._unallocated_tasks.bounded_source, \
+            'An environment with an unread task source can\'t be saved'
+
         # Check that the environment is valid
         for server, tasks in self._state.server_tasks.items():
             server.assert_valid()
@@ -253,8 +686,16 @@ class OnlineFlexibleResourceAllocationEnv(gym.Env):
         for task in self._unallocated_tasks:
             task.assert_valid()
 
-        # Add the auction task to the beginning of the unallocated task list
-        tasks = ([] if self._state.auction_task is None else [self._state.auction_task]) + self._unallocated_tasks
+        # Add the auction task (or batched auction tasks) to the beginning of the unallocated task list
+        if self._state.auction_tasks:
+            tasks = list(self._state.auction_tasks) + list(self._unallocated_tasks)
+        else:
+            tasks = ([] if self._state.auction_task is None else [self._state.auction_task]) + \
+                list(self._unallocated_tasks)
+
+        if binary:
+            save_snapshot(filename, self.env_name, self._state, tasks, self._total_time_steps)
+            return
 
         # Generate the environment JSON data
         env_json_data = {
@@ -294,19 +735,30 @@ class OnlineFlexibleResourceAllocationEnv(gym.Env):
             json.dump(env_json_data, file)
 
     @staticmethod
-    def load_env(filename: str):
+    def load_env(filename: str, mmap: bool = False, options: Optional[Dict[str, Any]] = None):
         """
-        Loads an environment from a file from template file at settings/format.env
+        Loads an environment from a file from template file at settings/format.env or a binary snapshot file
+            (see env/snapshot.py), the unallocated tasks of a binary snapshot are built as they arrive
 
         Args:
             filename: The filename to load the environment from
+            mmap: If to memory map the arrays of a binary snapshot file
+            options: Optional keyword arguments of the environment constructor (such as validation_level, skip_idle
+                or batched_allocation)
 
         Returns: The loaded environment
 
         """
-
-        with open(filename) as file:
-            json_data = json.load(file)
+        task_source: Optional[Iterable[Task]] = None
+        if is_snapshot(filename):
+            # The unallocated tasks of the snapshot are a bounded task source so are only built as they arrive
+            snapshot = Snapshot(filename, mmap)
+            name, time_step, total_time_steps = snapshot.env_name, snapshot.time_step, snapshot.total_time_steps
+            server_tasks, unallocated_tasks = snapshot.server_tasks(), []
+            task_source = snapshot.unallocated_tasks()
+        else:
+            with open(filename) as file:
+                json_data = json.load(file)
 
             name: str = json_data['env name']
             time_step: int = json_data['time step']
@@ -317,23 +769,18 @@ class OnlineFlexibleResourceAllocationEnv(gym.Env):
                 Server(name=server_data['name'], storage_cap=server_data['storage capacity'],
                        computational_cap=server_data['computational capacity'],
                        bandwidth_cap=server_data['bandwidth capacity']): [
-                    Task(name=task_data['name'], auction_time=task_data['auction time'], deadline=task_data['deadline'],
-                         required_storage=task_data['required storage'],
+                    Task(name=task_data['name'], auction_time=task_data['auction time'],
+                         deadline=task_data['deadline'], required_storage=task_data['required storage'],
                          required_computation=task_data['required computational'],
                          required_results_data=task_data['required results data'],
                          stage=TaskStage[task_data['stage']], loading_progress=task_data['loading progress'],
-                         compute_progress=task_data['compute progress'], sending_progress=task_data['sending progress'],
-                         price=task_data['price'])
+                         compute_progress=task_data['compute progress'],
+                         sending_progress=task_data['sending progress'], price=task_data['price'])
                     for task_data in server_data['tasks']
                 ]
                 for server_data in json_data['servers']
             }
 
-            for server, tasks in server_tasks.items():
-                server.assert_valid()
-                for task in tasks:
-                    task.assert_valid()
-
             # Load the unallocated task list
             unallocated_tasks: List[Task] = [
                 Task(name=task_data['name'], auction_time=task_data['auction time'], deadline=task_data['deadline'],
@@ -343,11 +790,39 @@ class OnlineFlexibleResourceAllocationEnv(gym.Env):
                 for task_data in json_data['unallocated tasks']
             ]
 
+        for server, tasks in server_tasks.items():
+            server.assert_valid()
+            for task in tasks:
+                task.assert_valid()
+
         env = OnlineFlexibleResourceAllocationEnv(None, env_name=name, server_tasks=server_tasks,
                                                   tasks=unallocated_tasks, time_step=time_step,
-                                                  total_time_steps=total_time_steps)
+                                                  total_time_steps=total_time_steps, task_source=task_source,
+                                                  **(options or {}))
         return env, env._state
 
+    @staticmethod
+    def load_workload_trace(filename: str, servers: List[Server], total_time_steps: Optional[int] = None,
+                            chunk_size: int = 4096, options: Optional[Dict[str, Any]] = None):
+        """
+        Loads an environment with the tasks of a workload trace file (see env/workload_trace.py), the trace is memory
+            mapped and the tasks read in chunks as the environment time step reaches them
+
+        Args:
+            filename: The workload trace filename
+            servers: The servers of the environment
+            total_time_steps: The total time steps of the environment (the last task deadline of the trace if None)
+            chunk_size: The number of tasks read from the trace at a time
+            options: Optional keyword arguments of the environment constructor (see custom_env)
+
+        Returns: A tuple of new environment and its state
+
+        """
+        trace = WorkloadTrace(filename)
+        return OnlineFlexibleResourceAllocationEnv.custom_env(
+            filename, trace.total_time_steps() if total_time_steps is None else total_time_steps,
+            {server: [] for server in servers}, [], task_source=trace.tasks(chunk_size=chunk_size), options=options)
+
     @staticmethod
     def _load_setting(filename: str) -> Tuple[str, List[Server], List[Task], int]:
         """
@@ -359,54 +834,141 @@ class OnlineFlexibleResourceAllocationEnv(gym.Env):
         Returns: Returns the primary features of an environment to be set
 
         """
+        return OnlineFlexibleResourceAllocationEnv._generate_setting(
+            OnlineFlexibleResourceAllocationEnv._read_setting(filename))
 
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def _read_setting(filename: str) -> dict:
+        """
+        Reads an environment setting file, the file is only parsed once as the settings don't change
+
+        Args:
+            filename: The filename of the environment setting
+
+        Returns: The environment setting json data (that must not be modified)
+
+        """
         with open(filename) as file:
-            env_setting_json = json.load(file)
-
-            env_name = env_setting_json['name']
-            assert env_name != ''
-            total_time_steps = rnd.randint(env_setting_json['min total time steps'],
-                                           env_setting_json['max total time steps'])
-            assert 0 < total_time_steps
-
-            servers: List[Server] = []
-            for server_num in range(rnd.randint(env_setting_json['min total servers'],
-                                                env_setting_json['max total servers'])):
-                server_json_data = rnd.choice(env_setting_json['server settings'])
-                server = Server(
-                    name='{} {}'.format(server_json_data['name'], server_num),
-                    storage_cap=float(rnd.randint(server_json_data['min storage capacity'],
-                                                  server_json_data['max storage capacity'])),
-                    computational_cap=float(rnd.randint(server_json_data['min computational capacity'],
-                                                        server_json_data['max computational capacity'])),
-                    bandwidth_cap=float(rnd.randint(server_json_data['min bandwidth capacity'],
-                                                    server_json_data['max bandwidth capacity'])))
-                server.assert_valid()
-                servers.append(server)
-
-            tasks: List[Task] = []
-            for task_num in range(rnd.randint(env_setting_json['min total tasks'],
-                                              env_setting_json['max total tasks'])):
-                task_json_data = rnd.choice(env_setting_json['task settings'])
-                auction_time = rnd.randint(0, total_time_steps)
-                task = Task(
-                    name='{} {}'.format(task_json_data['name'], task_num),
-                    auction_time=auction_time,
-                    deadline=auction_time + rnd.randint(task_json_data['min deadline'], task_json_data['max deadline']),
-                    required_storage=float(rnd.randint(task_json_data['min required storage'],
-                                                       task_json_data['max required storage'])),
-                    required_computation=float(rnd.randint(task_json_data['min required computation'],
-                                                           task_json_data['max required computation'])),
-                    required_results_data=float(rnd.randint(task_json_data['min required results data'],
-                                                            task_json_data['max required results data'])))
-                task.assert_valid()
-                tasks.append(task)
+            return json.load(file)
+
+    @staticmethod
+    def _generate_setting(env_setting_json: dict, rng=rnd, stream_tasks: bool = False) \
+            -> Tuple[str, List[Server], Union[List[Task], Iterator[Task]], int]:
+        """
+        Generates the servers and tasks of an environment from the environment setting json data
+
+        Args:
+            env_setting_json: The environment setting json data
+            rng: The random number generator (the random module or a random.Random)
+            stream_tasks: If to generate the tasks lazily in arrival order (see _stream_setting_tasks)
+                rather than as a list
+
+        Returns: Returns the primary features of an environment to be set
+
+        """
+        env_name = env_setting_json['name']
+        assert env_name != ''
+        total_time_steps = rng.randint(env_setting_json['min total time steps'],
+                                       env_setting_json['max total time steps'])
+        assert 0 < total_time_steps
+
+        servers: List[Server] = []
+        for server_num in range(rng.randint(env_setting_json['min total servers'],
+                                            env_setting_json['max total servers'])):
+            server_json_data = rng.choice(env_setting_json['server settings'])
+            server = Server(
+                name='{} {}'.format(server_json_data['name'], server_num),
+                storage_cap=float(rng.randint(server_json_data['min storage capacity'],
+                                              server_json_data['max storage capacity'])),
+                computational_cap=float(rng.randint(server_json_data['min computational capacity'],
+                                                    server_json_data['max computational capacity'])),
+                bandwidth_cap=float(rng.randint(server_json_data['min bandwidth capacity'],
+                                                server_json_data['max bandwidth capacity'])))
+            server.assert_valid()
+            servers.append(server)
+
+        num_tasks = rng.randint(env_setting_json['min total tasks'], env_setting_json['max total tasks'])
+        if stream_tasks:
+            return env_name, servers, OnlineFlexibleResourceAllocationEnv._stream_setting_tasks(
+                env_setting_json, num_tasks, total_time_steps, rng), total_time_steps
+
+        tasks: List[Task] = []
+        for task_num in range(num_tasks):
+            task_json_data = rng.choice(env_setting_json['task settings'])
+            auction_time = rng.randint(0, total_time_steps)
+            task = Task(
+                name='{} {}'.format(task_json_data['name'], task_num),
+                auction_time=auction_time,
+                deadline=auction_time + rng.randint(task_json_data['min deadline'], task_json_data['max deadline']),
+                required_storage=float(rng.randint(task_json_data['min required storage'],
+                                                   task_json_data['max required storage'])),
+                required_computation=float(rng.randint(task_json_data['min required computation'],
+                                                       task_json_data['max required computation'])),
+                required_results_data=float(rng.randint(task_json_data['min required results data'],
+                                                        task_json_data['max required results data'])))
+            task.assert_valid()
+            tasks.append(task)
 
         return env_name, servers, tasks, total_time_steps
 
+    @staticmethod
+    def _stream_setting_tasks(env_setting_json: dict, num_tasks: int, total_time_steps: int,
+                              rng=rnd) -> Iterator[Task]:
+        """
+        Generates the tasks of an environment setting in arrival order, one task at a time. The auction times have
+            the same distribution as _generate_setting (uniform over the time steps) as the auction time of each
+            task is the floor of the minimum of the remaining tasks' continuous uniform arrival times.
+
+        Args:
+            env_setting_json: The environment setting json data
+            num_tasks: The number of tasks
+            total_time_steps: The total time steps of the environment
+            rng: The random number generator (the random module or a random.Random)
+
+        Returns: Iterator of the tasks in arrival order
+
+        """
+        arrival = 0.0
+        for task_num in range(num_tasks):
+            # The minimum of the remaining (num_tasks - task_num) uniform arrival times in [arrival, total + 1)
+            arrival += (total_time_steps + 1 - arrival) * (1 - rng.random() ** (1 / (num_tasks - task_num)))
+            auction_time = min(int(arrival), total_time_steps)
+
+            task_json_data = rng.choice(env_setting_json['task settings'])
+            task = Task(
+                name='{} {}'.format(task_json_data['name'], task_num),
+                auction_time=auction_time,
+                deadline=auction_time + rng.randint(task_json_data['min deadline'], task_json_data['max deadline']),
+                required_storage=float(rng.randint(task_json_data['min required storage'],
+                                                   task_json_data['max required storage'])),
+                required_computation=float(rng.randint(task_json_data['min required computation'],
+                                                       task_json_data['max required computation'])),
+                required_results_data=float(rng.randint(task_json_data['min required results data'],
+                                                        task_json_data['max required results data'])))
+            task.assert_valid()
+            yield task
+
+    @staticmethod
+    def _valid_source_tasks(task_source: Iterable[Task]) -> Iterator[Task]:
+        """
+        Checks that each task of a task source is a valid unallocated task as the task is read
+
+        Args:
+            task_source: The task source
+
+        Returns: Iterator of the task source tasks
+
+        """
+        for task in task_source:
+            assert task.stage is TaskStage.UNASSIGNED
+            task.assert_valid()
+            yield task
+
     @staticmethod
     def custom_env(env_name: str, total_time_steps: int, new_servers_tasks: Dict[Server, List[Task]],
-                   new_unallocated_tasks: List[Task]):
+                   new_unallocated_tasks: List[Task], task_source: Optional[Iterable[Task]] = None,
+                   options: Optional[Dict[str, Any]] = None):
         """
         Setup a custom environment
 
@@ -415,6 +977,10 @@ class OnlineFlexibleResourceAllocationEnv(gym.Env):
             total_time_steps: The total time steps of the environment
             new_servers_tasks: A dictionary of server to list of tasks
             new_unallocated_tasks: A list of unallocated tasks
+            task_source: Optional task source (an iterator of tasks in arrival order) of the unallocated tasks
+                arriving after the list of unallocated tasks, the tasks are only read (and checked) as they arrive
+            options: Optional keyword arguments of the environment constructor (such as validation_level, skip_idle
+                or batched_allocation)
 
         Returns: A tuple of new environment and its state
 
@@ -434,6 +1000,10 @@ class OnlineFlexibleResourceAllocationEnv(gym.Env):
                 task.assert_valid()
 
         env = OnlineFlexibleResourceAllocationEnv(None, env_name=env_name, total_time_steps=total_time_steps,
-                                                  server_tasks=new_servers_tasks, tasks=new_unallocated_tasks)
+                                                  server_tasks=new_servers_tasks, tasks=new_unallocated_tasks,
+                                                  time_step=0,
+                                                  task_source=None if task_source is None else
+                                                  OnlineFlexibleResourceAllocationEnv._valid_source_tasks(task_source),
+                                                  **(options or {}))
 
         return env, env._state
@@ -0,0 +1,315 @@
+"""
+Append-only binary trace of the environment episodes, recording the states, actions and rewards of every step so
+    that the agent trajectories can be rebuilt without running the environment or the agents again
+
+The file is the magic bytes followed by records, each record is a header, the task rows of the record, the record
+    values and the names of the rows (the offsets of each name then the utf-8 bytes of the names). The records of an
+    episode are an episode record with the servers, a record for each step with the state before the step and an end
+    record with the final state.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from env.env_state import EnvState
+from env.server import Server
+from env.task import Task
+from env.task_stage import TaskStage
+
+if TYPE_CHECKING:
+    from typing import BinaryIO, Dict, Iterable, Iterator, List, Tuple, Union
+
+# The bytes at the start of every trace file
+TRACE_MAGIC: bytes = b'OFRA-TRC'
+# The record header of the record type, time step, number of task rows, number of values, the winning server and the
+#   number of names
+_RECORD_HEADER = struct.Struct('<BqIIiI')
+# The dtype of the name offsets, a record has an offset for each name plus one
+_NAME_OFFSETS_DTYPE = np.dtype('<u4')
+
+# The record types
+EPISODE_RECORD: int = 0
+AUCTION_RECORD: int = 1
+ALLOCATION_RECORD: int = 2
+END_RECORD: int = 3
+
+# The role of each task row, the allocated tasks of the state, the auction task or a finished task of the step
+_ALLOCATED, _AUCTION, _FINISHED = 0, 1, 2
+
+# The task rows, the fields are the Task fields (except the name) with the server index and role of the task
+_TASK_DTYPE = np.dtype([('uid', '<i8'), ('server', '<i4'), ('role', '<i1'), ('required_storage', '<f8'),
+                        ('required_computation', '<f8'), ('required_results_data', '<f8'), ('auction_time', '<i8'),
+                        ('deadline', '<i8'), ('stage', '<i1'), ('loading_progress', '<f8'),
+                        ('compute_progress', '<f8'), ('sending_progress', '<f8'), ('price', '<f8')])
+
+
+class TraceStep(NamedTuple):
+    """
+    A step of a traced episode, the same as the arguments and results of the environment step
+    """
+    state: EnvState
+    actions: Union[Dict[Server, float], Dict[Server, Dict[Task, float]]]
+    rewards: Union[Dict[Server, float], Dict[Server, List[Task]]]
+    next_state: EnvState
+
+
+def split_batched_auction(state: EnvState, actions: Dict[Server, Dict[Task, float]],
+                          rewards: Dict[Server, Dict[Task, float]]) \
+        -> List[Tuple[EnvState, Dict[Server, float], Dict[Server, float]]]:
+    """
+    Splits a batched auction step into an auction step for each auction task, so that batched auctions are recorded
+        (and observed by the agents) the same as the auctions of the tasks one after another
+
+    Args:
+        state: The state of the batched auction
+        actions: The price of each auction task for each server
+        rewards: The price paid for each task won by each server
+
+    Returns: List of the state (with the task as the auction task), the auction prices and the rewards of each task
+
+    """
+    return [(EnvState(state.server_tasks, auction_task, state.time_step),
+             {server: prices[auction_task] for server, prices in actions.items()},
+             {server: won_prices[auction_task] for server, won_prices in rewards.items() if auction_task in won_prices})
+            for auction_task in state.auction_tasks]
+
+
+class EpisodeTraceRecorder:
+    """
+    Records the episode steps to an append-only trace file
+    """
+
+    def __init__(self, filename: str):
+        """
+        Constructor of the recorder that opens the trace file for appending
+
+        Args:
+            filename: The trace filename
+        """
+        self.filename = filename
+        self._file: BinaryIO = open(filename, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(TRACE_MAGIC)
+        self._servers: Dict[Server, int] = {}
+
+    def __enter__(self) -> EpisodeTraceRecorder:
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def _write(self, record_type: int, time_step: int, rows: List[Tuple[Task, int, int]], names: List[str],
+               values: Iterable[float] = (), winner: int = -1):
+        """
+        Writes a record to the trace file
+
+        Args:
+            record_type: The record type
+            time_step: The time step of the record
+            rows: List of the tasks of the record with the server index and role of each task
+            names: The names of the rows (the server names for episode records)
+            values: The record values
+            winner: The index of the server that won the auction
+        """
+        task_array = np.array([(task.uid, server_num, role, task.required_storage, task.required_computation,
+                                task.required_results_data, task.auction_time, task.deadline, task.stage.value,
+                                task.loading_progress, task.compute_progress, task.sending_progress, task.price)
+                               for task, server_num, role in rows], dtype=_TASK_DTYPE)
+        value_array = np.array(list(values), dtype='<f8')
+        encoded_names = [name.encode() for name in names]
+        name_offsets = np.concatenate(([0], np.cumsum([len(name) for name in encoded_names], dtype=np.int64)))
+
+        self._file.write(_RECORD_HEADER.pack(record_type, time_step, len(task_array), len(value_array), winner,
+                                             len(encoded_names)))
+        self._file.write(task_array.tobytes())
+        self._file.write(value_array.tobytes())
+        self._file.write(name_offsets.astype(_NAME_OFFSETS_DTYPE).tobytes())
+        self._file.write(b''.join(encoded_names))
+
+    def _state_rows(self, state: EnvState) -> List[Tuple[Task, int, int]]:
+        """
+        The task rows of the environment state
+
+        Args:
+            state: The environment state
+
+        Returns: List of the allocated tasks and auction task with the server index and role of each task
+
+        """
+        rows = [(task, self._servers[server], _ALLOCATED)
+                for server, tasks in state.server_tasks.items() for task in tasks]
+        if state.auction_task is not None:
+            rows.append((state.auction_task, -1, _AUCTION))
+        return rows
+
+    def start_episode(self, servers: Iterable[Server]):
+        """
+        Records the start of an episode
+
+        Args:
+            servers: The servers of the episode
+        """
+        self._servers = {server: server_num for server_num, server in enumerate(servers)}
+        self._write(EPISODE_RECORD, 0, [], [server.name for server in self._servers.keys()],
+                    [value for server in self._servers.keys()
+                     for value in (server.storage_cap, server.computational_cap, server.bandwidth_cap, server.uid)])
+
+    def auction(self, state: EnvState, actions: Dict[Server, float], rewards: Dict[Server, float]):
+        """
+        Records an auction step
+
+        Args:
+            state: The state before the step
+            actions: The auction price of each server
+            rewards: The price paid by the winning server
+        """
+        rows = self._state_rows(state)
+        winner, price = next(iter(rewards.items()), (None, -1))
+        self._write(AUCTION_RECORD, state.time_step, rows, [task.name for task, _, _ in rows],
+                    [actions[server] for server in self._servers.keys()] + [price],
+                    -1 if winner is None else self._servers[winner])
+
+    def batched_auction(self, state: EnvState, actions: Dict[Server, Dict[Task, float]],
+                        rewards: Dict[Server, Dict[Task, float]]):
+        """
+        Records a batched auction step as an auction step for each auction task (see split_batched_auction)
+
+        Args:
+            state: The state before the step
+            actions: The price of each auction task for each server
+            rewards: The price paid for each task won by each server
+        """
+        for auction_state, auction_prices, auction_rewards in split_batched_auction(state, actions, rewards):
+            self.auction(auction_state, auction_prices, auction_rewards)
+
+    def resource_allocation(self, state: EnvState, actions: Dict[Server, Dict[Task, float]],
+                            rewards: Dict[Server, List[Task]]):
+        """
+        Records a resource allocation step
+
+        Args:
+            state: The state before the step
+            actions: The resource weighting of each server's tasks
+            rewards: The finished tasks of each server
+        """
+        rows = self._state_rows(state) + [(task, self._servers[server], _FINISHED)
+                                          for server, tasks in rewards.items() for task in tasks]
+        self._write(ALLOCATION_RECORD, state.time_step, rows, [task.name for task, _, _ in rows],
+                    [actions[server][task] for server, tasks in state.server_tasks.items() for task in tasks])
+
+    def end_episode(self, state: EnvState):
+        """
+        Records the end of an episode
+
+        Args:
+            state: The final state of the episode
+        """
+        rows = self._state_rows(state)
+        self._write(END_RECORD, state.time_step, rows, [task.name for task, _, _ in rows])
+        self._file.flush()
+
+    def close(self):
+        """
+        Closes the trace file
+        """
+        self._file.close()
+
+
+def _read_records(filename: str) -> Iterator[Tuple[int, int, np.ndarray, np.ndarray, List[str], int]]:
+    """
+    Reads the records of a trace file, the file is memory mapped so only the pages of the records being read are
+        loaded into memory. An incomplete record at the end of the file (a record still being written) is not read.
+
+    Args:
+        filename: The trace filename
+
+    Returns: Iterator of the record type, time step, task rows, values, names and winner of each record
+
+    """
+    with open(filename, 'rb') as file:
+        magic = file.read(len(TRACE_MAGIC))
+    assert TRACE_MAGIC.startswith(magic), f'{filename} is not an episode trace'
+    file_size = os.path.getsize(filename)
+    if file_size <= len(TRACE_MAGIC):
+        return
+    data = np.memmap(filename, dtype=np.uint8, mode='r', shape=(file_size,))
+
+    pos = len(TRACE_MAGIC)
+    while pos + _RECORD_HEADER.size <= file_size:
+        record_type, time_step, num_tasks, num_values, winner, num_names = \
+            _RECORD_HEADER.unpack(data[pos:pos + _RECORD_HEADER.size].tobytes())
+        tasks_pos = pos + _RECORD_HEADER.size
+        values_pos = tasks_pos + _TASK_DTYPE.itemsize * num_tasks
+        name_offsets_pos = values_pos + 8 * num_values
+        names_pos = name_offsets_pos + _NAME_OFFSETS_DTYPE.itemsize * (num_names + 1)
+        if file_size < names_pos:
+            return
+        name_offsets = data[name_offsets_pos:names_pos].view(_NAME_OFFSETS_DTYPE).tolist()
+        if file_size < names_pos + name_offsets[-1]:
+            return
+
+        task_array = data[tasks_pos:values_pos].view(_TASK_DTYPE)
+        value_array = data[values_pos:name_offsets_pos].view('<f8')
+        name_data = data[names_pos:names_pos + name_offsets[-1]].tobytes()
+        names = [name_data[start:end].decode() for start, end in zip(name_offsets, name_offsets[1:])]
+        pos = names_pos + name_offsets[-1]
+        yield record_type, time_step, task_array, value_array, names, winner
+
+
+def read_trace(filename: str) -> Iterator[Tuple[List[Server], List[TraceStep]]]:
+    """
+    Reads the episodes of a trace file
+
+    Args:
+        filename: The trace filename
+
+    Returns: Iterator of the servers and steps of each episode
+
+    """
+    stages = {stage.value: stage for stage in TaskStage}
+    servers: List[Server] = []
+    # The records of the episode with the tasks of each record
+    episode_records: List[Tuple[int, EnvState, List[Tuple[Task, int, int]], np.ndarray, int]] = []
+
+    for record_type, time_step, task_array, value_array, names, winner in _read_records(filename):
+        if record_type == EPISODE_RECORD:
+            servers = [Server(name, storage_cap, computational_cap, bandwidth_cap, int(uid))
+                       for name, (storage_cap, computational_cap, bandwidth_cap, uid)
+                       in zip(names, value_array.reshape(-1, 4).tolist())]
+            episode_records = []
+            continue
+
+        rows = [(Task(name, *task_data[3:8], stages[task_data[8]], *task_data[9:13], task_data[0]), task_data[1],
+                 task_data[2]) for name, task_data in zip(names, task_array.tolist())]
+        server_tasks: Dict[Server, List[Task]] = {server: [] for server in servers}
+        auction_task = None
+        for task, server_num, role in rows:
+            if role == _ALLOCATED:
+                server_tasks[servers[server_num]].append(task)
+            elif role == _AUCTION:
+                auction_task = task
+        episode_records.append((record_type, EnvState(server_tasks, auction_task, time_step), rows, value_array,
+                                winner))
+
+        if record_type == END_RECORD:
+            steps = []
+            for (step_type, state, rows, values, winner), (_, next_state, _, _, _) in zip(episode_records,
+                                                                                          episode_records[1:]):
+                if step_type == AUCTION_RECORD:
+                    actions = {server: price for server, price in zip(servers, values[:-1].tolist())}
+                    rewards = {} if winner == -1 else {servers[winner]: float(values[-1])}
+                else:
+                    weights = iter(values.tolist())
+                    actions = {server: {task: next(weights) for task in tasks}
+                               for server, tasks in state.server_tasks.items()}
+                    rewards = {server: [] for server in servers}
+                    for task, server_num, role in rows:
+                        if role == _FINISHED:
+                            rewards[servers[server_num]].append(task)
+                steps.append(TraceStep(state, actions, rewards, next_state))
+            yield servers, steps
@@ -0,0 +1,56 @@
+"""
+Pool of evaluation environments that are loaded once and then handed out as fresh environments
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from env.environment import OnlineFlexibleResourceAllocationEnv
+
+if TYPE_CHECKING:
+    from env.env_state import EnvState
+    from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+class EvalEnvPool:
+    """
+    Loads each evaluation environment file once, each environment handed out is a fork of the loaded environment
+        that is independent of the other environments (as the environment state is never modified in place)
+    """
+
+    def __init__(self, env_filenames: List[str], mmap: bool = False, options: Optional[Dict[str, Any]] = None):
+        """
+        Constructor of the evaluation environment pool that loads each of the environment files
+
+        Args:
+            env_filenames: The evaluation environment filenames
+            mmap: If to memory map binary snapshot files
+            options: Optional keyword arguments of the environment constructor of the evaluation environments (such
+                as validation_level, skip_idle or batched_allocation)
+        """
+        self.env_filenames = list(env_filenames)
+        self._envs: List[OnlineFlexibleResourceAllocationEnv] = [
+            OnlineFlexibleResourceAllocationEnv.load_env(env_filename, mmap, options)[0]
+            for env_filename in self.env_filenames
+        ]
+
+    def __len__(self) -> int:
+        return len(self._envs)
+
+    def __iter__(self) -> Iterator[Tuple[OnlineFlexibleResourceAllocationEnv, EnvState]]:
+        return (self.env(index) for index in range(len(self._envs)))
+
+    def env(self, index: int) -> Tuple[OnlineFlexibleResourceAllocationEnv, EnvState]:
+        """
+        Creates a new environment of an evaluation scenario, this doesn't read or validate the file again
+
+        Args:
+            index: The evaluation scenario index
+
+        Returns: The new environment and its state
+
+        """
+        env = self._envs[index].fork()
+        # noinspection PyProtectedMember
+        return env, env._state
@@ -0,0 +1,55 @@
+"""
+Fixed-point resource values, the resources are integers scaled by the four decimal places of env.server.round_float
+    so that the resource arithmetic is exact and rounding is to the nearest integer
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from typing import Union
+
+# The scale of the fixed-point resource values, four decimal places
+SCALE: int = 10_000
+
+
+def to_fixed(values: Union[float, np.ndarray]) -> np.ndarray:
+    """
+    Converts resource values to fixed-point values
+
+    Args:
+        values: The resource values
+
+    Returns: The scaled integer values
+
+    """
+    return np.rint(np.asarray(values, dtype=np.float64) * SCALE).astype(np.int64)
+
+
+def from_fixed(values: Union[int, np.ndarray]) -> np.ndarray:
+    """
+    Converts fixed-point values to resource values
+
+    Args:
+        values: The scaled integer values
+
+    Returns: The resource values (rounded to four decimal places)
+
+    """
+    return np.asarray(values) / SCALE
+
+
+def round_fixed(values: np.ndarray) -> np.ndarray:
+    """
+    Rounds fixed-point values to the nearest integer, the fixed-point equivalent of env.server.round_float
+
+    Args:
+        values: The (possibly fractional) fixed-point values
+
+    Returns: The scaled integer values
+
+    """
+    return np.rint(values).astype(np.int64)
@@ -0,0 +1,229 @@
+"""
+Array observation features of the environment state, the features of a task are normalised relative to the server
+    the same as ReinforcementLearningAgent._normalise_task
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from gym import spaces
+
+if TYPE_CHECKING:
+    from env.env_state import EnvState
+    from env.server import Server
+    from env.task import Task
+    from typing import Dict, Iterable, List, Union
+
+# The number of features of each task
+TASK_FEATURES: int = 8
+
+
+def _task_attributes(task: Task) -> tuple:
+    """
+    The raw attributes of a task used for the task features
+
+    Args:
+        task: The task
+
+    Returns: Tuple of the task attributes
+
+    """
+    return (task.required_storage, task.required_computation, task.required_results_data, task.deadline,
+            task.loading_progress, task.compute_progress, task.sending_progress)
+
+
+def _server_capacities(servers: Iterable[Server]) -> np.ndarray:
+    """
+    The resource capacities of the servers
+
+    Args:
+        servers: The servers
+
+    Returns: Array of the storage, computational and bandwidth capacity of each server
+
+    """
+    return np.array([(server.storage_cap, server.computational_cap, server.bandwidth_cap) for server in servers],
+                    dtype=np.float64).reshape(-1, 3)
+
+
+def normalise_tasks(task_attributes: np.ndarray, server_capacities: np.ndarray, time_step: int) -> np.ndarray:
+    """
+    Normalises the tasks relative to the servers that the tasks are running on
+
+    Args:
+        task_attributes: Array of the task attributes (see _task_attributes)
+        server_capacities: Array of the storage, computational and bandwidth capacity of each task's server
+        time_step: The current environment time step
+
+    Returns: Array of the task features
+
+    """
+    storage, computation, results_data, deadline = (task_attributes[:, pos] for pos in range(4))
+    storage_cap, computational_cap, bandwidth_cap = (server_capacities[:, pos] for pos in range(3))
+    return np.column_stack((
+        storage / storage_cap,
+        storage / bandwidth_cap,
+        computation / computational_cap,
+        results_data / bandwidth_cap,
+        deadline - time_step,
+        task_attributes[:, 4:7]
+    ))
+
+
+def write_observation(state: EnvState, task_obs: np.ndarray, task_mask: np.ndarray,
+                      auction_obs: np.ndarray, server_mask: np.ndarray):
+    """
+    Writes the observation of the state to the (possibly shared memory) observation arrays, the servers are in the
+        order of the state server tasks and the tasks are in the order of each server's task list
+
+    Args:
+        state: The environment state
+        task_obs: The task features of each server, shape (servers, tasks, features)
+        task_mask: If the task slot of the server contains a task, shape (servers, tasks)
+        auction_obs: The auction task features for each server (zero without an auction task), shape (servers, features)
+        server_mask: If the server slot contains a server, shape (servers,)
+    """
+    max_servers, max_tasks, _ = task_obs.shape
+    assert len(state.server_tasks) <= max_servers
+    assert all(len(tasks) <= max_tasks for tasks in state.server_tasks.values())
+
+    server_capacities = _server_capacities(state.server_tasks.keys())
+    task_obs.fill(0)
+    task_mask.fill(False)
+    auction_obs.fill(0)
+    server_mask.fill(False)
+    server_mask[:len(server_capacities)] = True
+
+    # The tasks of every server are normalised together and then scattered into the server task slots
+    task_positions = [(server_num, task_num) for server_num, tasks in enumerate(state.server_tasks.values())
+                      for task_num in range(len(tasks))]
+    if task_positions:
+        server_nums, task_nums = np.array(task_positions).T
+        task_attributes = np.array([_task_attributes(task) for tasks in state.server_tasks.values() for task in tasks],
+                                   dtype=np.float64)
+        task_obs[server_nums, task_nums] = normalise_tasks(task_attributes, server_capacities[server_nums],
+                                                           state.time_step)
+        task_mask[server_nums, task_nums] = True
+
+    if state.auction_task is not None:
+        auction_attributes = np.array([_task_attributes(state.auction_task)], dtype=np.float64)
+        auction_obs[:len(server_capacities)] = normalise_tasks(
+            np.repeat(auction_attributes, len(server_capacities), axis=0), server_capacities, state.time_step)
+
+
+def observation_space(max_servers: int, max_tasks: int) -> spaces.Dict:
+    """
+    The gym space of the array observations (see array_observation)
+
+    Args:
+        max_servers: The maximum number of servers
+        max_tasks: The maximum number of tasks on a server
+
+    Returns: The observation space
+
+    """
+    return spaces.Dict({
+        'task_obs': spaces.Box(-np.inf, np.inf, (max_servers, max_tasks, TASK_FEATURES), np.float32),
+        'task_mask': spaces.MultiBinary([max_servers, max_tasks]),
+        'auction_obs': spaces.Box(-np.inf, np.inf, (max_servers, TASK_FEATURES), np.float32),
+        'server_mask': spaces.MultiBinary(max_servers),
+        'auction': spaces.Discrete(2)
+    })
+
+
+def action_space(max_servers: int, max_tasks: int) -> spaces.Dict:
+    """
+    The gym space of the array actions, the auction price of each server and the resource weight of each server's
+        task slots (only the actions of the step type are used, see array_actions)
+
+    Args:
+        max_servers: The maximum number of servers
+        max_tasks: The maximum number of tasks on a server
+
+    Returns: The action space
+
+    """
+    return spaces.Dict({
+        'auction_prices': spaces.Box(0, np.inf, (max_servers,), np.float32),
+        'resource_weights': spaces.Box(0, np.inf, (max_servers, max_tasks), np.float32)
+    })
+
+
+def array_observation(state: EnvState, max_servers: int, max_tasks: int) -> Dict[str, np.ndarray]:
+    """
+    The array observation of the state, with the same arrays as write_observation and if the state is an auction
+
+    Args:
+        state: The environment state
+        max_servers: The maximum number of servers
+        max_tasks: The maximum number of tasks on a server
+
+    Returns: Dictionary of the observation arrays (see observation_space)
+
+    """
+    observation = {
+        'task_obs': np.zeros((max_servers, max_tasks, TASK_FEATURES), dtype=np.float32),
+        'task_mask': np.zeros((max_servers, max_tasks), dtype=np.bool_),
+        'auction_obs': np.zeros((max_servers, TASK_FEATURES), dtype=np.float32),
+        'server_mask': np.zeros(max_servers, dtype=np.bool_),
+        'auction': int(state.auction_task is not None)
+    }
+    write_observation(state, observation['task_obs'], observation['task_mask'], observation['auction_obs'],
+                      observation['server_mask'])
+    return observation
+
+
+def array_actions(state: EnvState, actions: Dict[str, np.ndarray], max_tasks: int) \
+        -> Union[Dict[Server, float], Dict[Server, Dict[Task, float]]]:
+    """
+    Converts the array actions to the environment actions of the state, the auction prices for an auction step
+        otherwise the resource weights. The auction price of a server with max tasks tasks is zero (the bid is
+        ignored) so that no server can have more tasks than the task slots of the observation.
+
+    Args:
+        state: The environment state
+        actions: Dictionary of the action arrays (see action_space)
+        max_tasks: The maximum number of tasks on a server
+
+    Returns: The auction price of each server or the resource weights of each server's tasks
+
+    """
+    if state.auction_task is not None:
+        return {server: float(price) if len(tasks) < max_tasks else 0.0 for (server, tasks), price
+                in zip(state.server_tasks.items(), np.asarray(actions['auction_prices']).tolist())}
+    else:
+        return {server: {task: float(weight) for task, weight in zip(tasks, weights)}
+                for (server, tasks), weights
+                in zip(state.server_tasks.items(), np.asarray(actions['resource_weights']).tolist())}
+
+
+def array_rewards(state: EnvState, rewards: Union[Dict[Server, float], Dict[Server, List[Task]]],
+                  max_servers: int, max_tasks: int) -> Dict[str, np.ndarray]:
+    """
+    Converts the environment rewards of a step from the state to arrays
+
+    Args:
+        state: The environment state before the step
+        rewards: The auction price paid by the winning server or the finished tasks of each server
+        max_servers: The maximum number of servers
+        max_tasks: The maximum number of tasks on a server
+
+    Returns: Dictionary of the price that each server won the auction task at ('auction') and the stage
+        (TaskStage value) of the tasks that finished in the task slots of the state, zero for tasks that haven't
+        finished ('finished_tasks')
+
+    """
+    auction_rewards = np.zeros(max_servers, dtype=np.float64)
+    finished_tasks = np.zeros((max_servers, max_tasks), dtype=np.int8)
+    if state.auction_task is not None:
+        for server_num, server in enumerate(state.server_tasks.keys()):
+            if server in rewards:
+                auction_rewards[server_num] = rewards[server]
+    else:
+        for server_num, (server, tasks) in enumerate(state.server_tasks.items()):
+            finished_stages = {task.uid: task.stage.value for task in rewards[server]}
+            for task_num, task in enumerate(tasks):
+                finished_tasks[server_num, task_num] = finished_stages.get(task.uid, 0)
+    return {'auction': auction_rewards, 'finished_tasks': finished_tasks}
@@ -0,0 +1,183 @@
+"""
+Bank of pre-generated environment scenarios so that resetting an environment doesn't need to generate the scenario,
+    the scenarios are generated by a producer process so that the generation runs in parallel with the environment
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import operator
+import queue
+import random as rnd
+from typing import TYPE_CHECKING, NamedTuple
+
+from env.environment import OnlineFlexibleResourceAllocationEnv
+from env.server import Server
+from env.task import Task
+
+if TYPE_CHECKING:
+    from env.scenario_generator import ScenarioGenerator
+    from multiprocessing.synchronize import Event
+    from typing import List, Optional, Tuple, Union
+
+
+class Scenario(NamedTuple):
+    """
+    A generated environment scenario, the tasks are sorted by auction time
+    """
+    env_name: str
+    servers: Tuple[Server, ...]
+    tasks: Tuple[Task, ...]
+    total_time_steps: int
+
+
+def _generate_scenario(setting_data: List[dict], rng: rnd.Random,
+                       scenario_generator: Optional[ScenarioGenerator]) -> Scenario:
+    """
+    Generates a new scenario from a randomly chosen environment setting
+
+    Args:
+        setting_data: The json data of the environment settings
+        rng: The random number generator of the settings (and the scenario without a scenario generator)
+        scenario_generator: Optional vectorised generator of the scenario servers and tasks
+
+    Returns: The new scenario
+
+    """
+    env_setting_json = rng.choice(setting_data)
+    if scenario_generator is not None:
+        env_name, servers, tasks, total_time_steps = scenario_generator.generate(env_setting_json)
+    else:
+        # noinspection PyProtectedMember
+        env_name, servers, tasks, total_time_steps = OnlineFlexibleResourceAllocationEnv._generate_setting(
+            env_setting_json, rng)
+    return Scenario(env_name, tuple(servers), tuple(sorted(tasks, key=operator.attrgetter('auction_time'))),
+                    total_time_steps)
+
+
+def _produce(setting_data: List[dict], seed: Optional[int], scenario_generator: Optional[ScenarioGenerator],
+             pool: mp.Queue, stopped: Event):
+    """
+    The producer process that keeps the pool of scenarios full till the bank is closed
+
+    Args:
+        setting_data: The json data of the environment settings
+        seed: The seed of the scenario random number generator
+        scenario_generator: Optional vectorised generator of the scenario servers and tasks
+        pool: The pool of scenarios
+        stopped: The event set when the bank is closed
+    """
+    # The scenarios in the pool when the bank is closed are discarded rather than the process waiting for them to be
+    #   taken from the pool
+    pool.cancel_join_thread()
+    rng = rnd.Random(seed)
+    while not stopped.is_set():
+        scenario = _generate_scenario(setting_data, rng, scenario_generator)
+        while not stopped.is_set():
+            try:
+                pool.put(scenario, timeout=0.1)
+                break
+            except queue.Full:
+                pass
+
+
+class ScenarioBank:
+    """
+    Pool of scenarios generated from the environment settings, the scenarios are either generated by a background
+        producer process that keeps the pool full or generated when the pool is empty (so without a producer process
+        the scenarios are only generated in advance by fill, the pool isn't refilled concurrently)
+    """
+
+    def __init__(self, env_settings: Union[str, List[str]], pool_size: int = 32, background: bool = True,
+                 seed: Optional[int] = None, scenario_generator: Optional[ScenarioGenerator] = None):
+        """
+        Constructor of the scenario bank
+
+        Args:
+            env_settings: The environment setting files, each scenario uses a randomly chosen setting
+            pool_size: The number of scenarios kept in the pool
+            background: If to generate the scenarios with a background producer process (that has its own copy of
+                the random number generator and scenario generator)
+            seed: The seed of the scenario random number generator
+            scenario_generator: Optional vectorised generator of the scenario servers and tasks
+        """
+        assert 0 < pool_size
+
+        self.env_settings = [env_settings] if type(env_settings) is str else list(env_settings)
+        assert 0 < len(self.env_settings)
+        # noinspection PyProtectedMember
+        self._setting_data = [OnlineFlexibleResourceAllocationEnv._read_setting(env_setting)
+                              for env_setting in self.env_settings]
+        self._rng = rnd.Random(seed)
+        self.scenario_generator = scenario_generator
+
+        self._producer: Optional[mp.Process] = None
+        if background:
+            context = mp.get_context()
+            self._pool: Union[queue.Queue, mp.Queue] = context.Queue(maxsize=pool_size)
+            self._stopped = context.Event()
+            self._producer = context.Process(target=_produce, name='scenario bank producer', daemon=True,
+                                             args=(self._setting_data, seed, scenario_generator, self._pool,
+                                                   self._stopped))
+            self._producer.start()
+        else:
+            self._pool = queue.Queue(maxsize=pool_size)
+
+    def generate(self) -> Scenario:
+        """
+        Generates a new scenario from a randomly chosen environment setting
+
+        Returns: The new scenario
+
+        """
+        return _generate_scenario(self._setting_data, self._rng, self.scenario_generator)
+
+    @staticmethod
+    def _new_ids(scenario: Scenario) -> Scenario:
+        """
+        Recreates the servers and tasks of a scenario from the producer process so that the server and task ids are
+            of this process (the ids of each process are counted separately so could be the same as the ids here)
+
+        Args:
+            scenario: The scenario generated by the producer process
+
+        Returns: The scenario with new servers and tasks
+
+        """
+        return scenario._replace(servers=tuple(Server(*server[:-1]) for server in scenario.servers),
+                                 tasks=tuple(Task(*task[:-1]) for task in scenario.tasks))
+
+    def next(self) -> Scenario:
+        """
+        Takes the next scenario from the pool, without a producer process then the scenario is generated if the pool
+            is empty
+
+        Returns: The next scenario
+
+        """
+        if self._producer is None:
+            try:
+                return self._pool.get_nowait()
+            except queue.Empty:
+                return self.generate()
+        else:
+            return self._new_ids(self._pool.get())
+
+    def fill(self):
+        """
+        Fills the pool with scenarios, without a producer process this pre-generates the scenarios in advance
+        """
+        while not self._pool.full():
+            try:
+                self._pool.put_nowait(self.generate())
+            except queue.Full:
+                break
+
+    def close(self):
+        """
+        Stops the background producer process
+        """
+        if self._producer is not None:
+            self._stopped.set()
+            self._producer.join()
+            self._producer = None
@@ -0,0 +1,136 @@
+"""
+Vectorised scenario generator that draws all of the server and task attributes of an environment setting in bulk
+    with a seeded numpy Generator
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from env.server import Server
+from env.task import Task
+
+if TYPE_CHECKING:
+    from typing import List, Optional, Tuple, Union
+
+
+class ScenarioGenerator:
+    """
+    Generates the servers and tasks of an environment setting (the same json data as
+        OnlineFlexibleResourceAllocationEnv._generate_setting) with numpy arrays rather than one object at a time
+
+    The task auction times are uniformly distributed over the environment time steps unless the setting has an
+        'arrival distribution' of 'poisson', then the number of tasks arriving at each time step is poisson
+        distributed with the setting's 'arrival rate' (or the average number of tasks per time step)
+    """
+
+    def __init__(self, seed: Optional[Union[int, np.random.Generator]] = None):
+        """
+        Constructor of the scenario generator
+
+        Args:
+            seed: The seed of the random number generator (or the generator itself)
+        """
+        self.rng = np.random.default_rng(seed)
+
+    def _uniform(self, settings: List[dict], setting_nums: np.ndarray, attribute: str) -> np.ndarray:
+        """
+        Draws a uniform integer between the setting's min and max attribute (inclusive) for each setting number
+
+        Args:
+            settings: The list of server or task settings
+            setting_nums: The setting of each server or task
+            attribute: The attribute name (without the min or max)
+
+        Returns: Array of random integers
+
+        """
+        min_values = np.array([setting[f'min {attribute}'] for setting in settings])[setting_nums]
+        max_values = np.array([setting[f'max {attribute}'] for setting in settings])[setting_nums]
+        return self.rng.integers(min_values, max_values, endpoint=True)
+
+    def _auction_times(self, env_setting_json: dict, total_time_steps: int) -> np.ndarray:
+        """
+        Draws the sorted task auction times
+
+        Args:
+            env_setting_json: The environment setting json data
+            total_time_steps: The total time steps of the environment
+
+        Returns: Sorted array of the task auction times
+
+        """
+        arrival_distribution = env_setting_json.get('arrival distribution', 'uniform')
+        if arrival_distribution == 'uniform':
+            num_tasks = self.rng.integers(env_setting_json['min total tasks'], env_setting_json['max total tasks'],
+                                          endpoint=True)
+            return np.sort(self.rng.integers(0, total_time_steps, num_tasks, endpoint=True))
+        elif arrival_distribution == 'poisson':
+            if 'arrival rate' in env_setting_json:
+                arrival_rate = env_setting_json['arrival rate']
+            else:
+                arrival_rate = (env_setting_json['min total tasks'] + env_setting_json['max total tasks']) / \
+                               (2 * (total_time_steps + 1))
+            arrivals = self.rng.poisson(arrival_rate, total_time_steps + 1)
+            return np.repeat(np.arange(total_time_steps + 1), arrivals)
+        else:
+            raise Exception(f'Unknown arrival distribution: {arrival_distribution}')
+
+    def generate(self, env_setting_json: dict) -> Tuple[str, List[Server], List[Task], int]:
+        """
+        Generates the servers and tasks of an environment setting
+
+        Args:
+            env_setting_json: The environment setting json data
+
+        Returns: Returns the primary features of an environment to be set, the tasks are sorted by auction time
+
+        """
+        env_name = env_setting_json['name']
+        assert env_name != ''
+        total_time_steps = int(self.rng.integers(env_setting_json['min total time steps'],
+                                                 env_setting_json['max total time steps'], endpoint=True))
+        assert 0 < total_time_steps
+
+        # Servers
+        server_settings = env_setting_json['server settings']
+        num_servers = self.rng.integers(env_setting_json['min total servers'], env_setting_json['max total servers'],
+                                        endpoint=True)
+        server_setting_nums = self.rng.integers(0, len(server_settings), num_servers)
+        storage_caps = self._uniform(server_settings, server_setting_nums, 'storage capacity')
+        computational_caps = self._uniform(server_settings, server_setting_nums, 'computational capacity')
+        bandwidth_caps = self._uniform(server_settings, server_setting_nums, 'bandwidth capacity')
+        assert np.all(0 < storage_caps) and np.all(0 < computational_caps) and np.all(0 < bandwidth_caps)
+
+        servers = [
+            Server(f'{server_settings[setting_num]["name"]} {server_num}', storage_cap, computational_cap,
+                   bandwidth_cap)
+            for server_num, (setting_num, storage_cap, computational_cap, bandwidth_cap) in enumerate(zip(
+                server_setting_nums.tolist(), storage_caps.astype(float).tolist(),
+                computational_caps.astype(float).tolist(), bandwidth_caps.astype(float).tolist()))
+        ]
+
+        # Tasks
+        task_settings = env_setting_json['task settings']
+        auction_times = self._auction_times(env_setting_json, total_time_steps)
+        task_setting_nums = self.rng.integers(0, len(task_settings), len(auction_times))
+        deadlines = auction_times + self._uniform(task_settings, task_setting_nums, 'deadline')
+        required_storage = self._uniform(task_settings, task_setting_nums, 'required storage')
+        required_computation = self._uniform(task_settings, task_setting_nums, 'required computation')
+        required_results_data = self._uniform(task_settings, task_setting_nums, 'required results data')
+        assert np.all(0 < required_storage) and np.all(0 < required_computation) and \
+            np.all(0 < required_results_data)
+        assert np.all(auction_times < deadlines)
+
+        tasks = [
+            Task(f'{task_settings[setting_num]["name"]} {task_num}', storage, computation, results_data,
+                 auction_time, deadline)
+            for task_num, (setting_num, storage, computation, results_data, auction_time, deadline) in enumerate(zip(
+                task_setting_nums.tolist(), required_storage.astype(float).tolist(),
+                required_computation.astype(float).tolist(), required_results_data.astype(float).tolist(),
+                auction_times.tolist(), deadlines.tolist()))
+        ]
+
+        return env_name, servers, tasks, total_time_steps
@@ -4,6 +4,7 @@ Immutable server class that has storage, computational and storage capacity
 
 from __future__ import annotations
 
+from itertools import count
 from typing import NamedTuple, TYPE_CHECKING
 
 from env.task_stage import TaskStage
@@ -26,8 +27,12 @@ def round_float(value: float) -> float:
     return round(value, 4)
 
 
-class Server(NamedTuple):
-    """Server class that takes a name and resource capacity for storage, computation and bandwidth"""
+# The integer ids of the servers, assigned when the server is created
+_server_ids = count()
+
+
+class _ServerAttributes(NamedTuple):
+    """The server attributes, the server id is the last attribute so that servers can be created without an id"""
 
     name: str  # The name of the server
 
@@ -35,13 +40,36 @@ class Server(NamedTuple):
     computational_cap: float  # The server computational capacity
     bandwidth_cap: float  # The server bandwidth capacity
 
+    uid: int = -1  # The server id
+
+
+class Server(_ServerAttributes):
+    """
+    Server class that takes a name and resource capacity for storage, computation and bandwidth
+
+    Each server is assigned an integer id when created, servers are hashed and compared by the id
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, *args, **kwargs):
+        if len(args) < len(cls._fields) and 'uid' not in kwargs:
+            kwargs['uid'] = next(_server_ids)
+        return super().__new__(cls, *args, **kwargs)
+
     def __str__(self) -> str:
         return f'{self.name} Server - Storage cap: {self.storage_cap}, Comp cap: {self.computational_cap}, ' \
                f'Bandwidth cap: {self.bandwidth_cap}'
 
     def __eq__(self, o: object) -> bool:
         # noinspection PyUnresolvedReferences
-        return type(o) is Server and o.name == self.name
+        return type(o) is Server and o.uid == self.uid
+
+    def __ne__(self, o: object) -> bool:
+        return not self.__eq__(o)
+
+    def __hash__(self) -> int:
+        return self.uid
 
     def assert_valid(self):
         """
@@ -50,7 +78,8 @@ class Server(NamedTuple):
         assert 0 < self.storage_cap and 0 < self.computational_cap and 0 < self.bandwidth_cap
 
     def allocate_resources(self, resource_weights: Dict[Task, float],
-                           time_step: int, error_term: float = 0.1) -> Tuple[List[Task], List[Task]]:
+                           time_step: int, error_term: float = 0.1,
+                           validate: bool = True) -> Tuple[List[Task], List[Task]]:
         """
         Allocate resources to tasks by converting a weighting (importance) to an actual resource
 
@@ -58,18 +87,20 @@ class Server(NamedTuple):
             resource_weights: A dictionary of task to weighting
             time_step: The current time step
             error_term: The error term to account for rounding effectively
+            validate: If to check that the tasks and the resources used are valid
 
         Returns: Two list, the first being the list of completed or failed task,
-                    the second being tasks that are still ongoing
+                    the second being tasks that are still ongoing, both lists keep the order of the resource weights
 
         """
         # Assert that the server tasks are valid
         assert 0 < len(resource_weights)
-        assert all(task.stage is TaskStage.LOADING or task.stage is TaskStage.COMPUTING or
-                   task.stage is TaskStage.SENDING for task in resource_weights.keys())
-        assert all(0 <= weight for weight in resource_weights.values())
-        for task in resource_weights.keys():
-            task.assert_valid()
+        if validate:
+            assert all(task.stage is TaskStage.LOADING or task.stage is TaskStage.COMPUTING or
+                       task.stage is TaskStage.SENDING for task in resource_weights.keys())
+            assert all(0 <= weight for weight in resource_weights.values())
+            for task in resource_weights.keys():
+                task.assert_valid()
 
         # Group the tasks by stage
         loading_weights: Dict[Task, float] = {task: weight for task, weight in resource_weights.items()
@@ -85,11 +116,12 @@ class Server(NamedTuple):
         available_bandwidth: float = self.bandwidth_cap
 
         # Allocate computational resources to the tasks at computing stage
-        compute_task_resource_usage = self.allocate_compute_resources(compute_weights, available_computation, time_step)
-        # Allocate bandwidth resources (and storage) to the tasks at loading and sending stage
+        compute_task_resource_usage = self.allocate_compute_resources(compute_weights, available_computation, time_step,
+                                                                      validate)
+        # Allocate bandwidth (and storage) resources to the tasks at loading and sending stage
         bandwidth_task_resource_usage = self.allocate_bandwidth_resources(loading_weights, sending_weights,
                                                                           available_storage, available_bandwidth,
-                                                                          time_step)
+                                                                          time_step, validate)
         # If task has weights of zero then allocate resource of only loadings
         no_weights = {
             task._replace(stage=task.has_failed(task.stage, time_step)): (task.loading_progress, 0, 0)
@@ -99,30 +131,34 @@ class Server(NamedTuple):
         # Join the compute and bandwidth resource allocation
         task_resource_usage = {**compute_task_resource_usage, **bandwidth_task_resource_usage, **no_weights}
 
-        # Assert that the updated task are still valid
-        for task in task_resource_usage.keys():
-            task.assert_valid()
-            assert task in list(task_resource_usage.keys())
-
-        # Assert that the resources used are less than available resources
-        assert sum(
-            storage_usage for (storage_usage, _, _) in task_resource_usage.values()) <= self.storage_cap + error_term
-        assert sum(compute_usage for (_, compute_usage, _) in
-                   task_resource_usage.values()) <= self.computational_cap + error_term
-        assert sum(bandwidth_usage for (_, _, bandwidth_usage) in
-                   task_resource_usage.values()) <= self.bandwidth_cap + error_term
-
-        # Group the updated tasks in those completed or failed and those still ongoing
-        unfinished_tasks = [task for task in task_resource_usage.keys()
+        if validate:
+            # Assert that the updated task are still valid
+            for task in task_resource_usage.keys():
+                task.assert_valid()
+                assert task in list(task_resource_usage.keys())
+
+            # Assert that the resources used are less than available resources
+            assert sum(storage_usage for (storage_usage, _, _) in
+                       task_resource_usage.values()) <= self.storage_cap + error_term
+            assert sum(compute_usage for (_, compute_usage, _) in
+                       task_resource_usage.values()) <= self.computational_cap + error_term
+            assert sum(bandwidth_usage for (_, _, bandwidth_usage) in
+                       task_resource_usage.values()) <= self.bandwidth_cap + error_term
+
+        # Group the updated tasks in those completed or failed and those still ongoing, the updated tasks are in the
+        #   order of the resource weights (not the allocation order) so that every allocation gives the same order
+        updated_tasks = {task.uid: task for task in task_resource_usage.keys()}
+        updated_tasks = [updated_tasks[task.uid] for task in resource_weights.keys()]
+        unfinished_tasks = [task for task in updated_tasks
                             if not (task.stage is TaskStage.COMPLETED or task.stage is TaskStage.FAILED)]
-        completed_tasks = [task for task in task_resource_usage.keys()
+        completed_tasks = [task for task in updated_tasks
                            if task.stage is TaskStage.COMPLETED or task.stage is TaskStage.FAILED]
 
         return unfinished_tasks, completed_tasks
 
     @staticmethod
     def allocate_compute_resources(compute_weights: Dict[Task, float], available_computation: float,
-                                   time_step: int) -> Dict[Task, Tuple[float, float, float]]:
+                                   time_step: int, validate: bool = True) -> Dict[Task, Tuple[float, float, float]]:
         """
         Allocate computational resources to tasks
 
@@ -130,6 +166,7 @@ class Server(NamedTuple):
             compute_weights: A dictionary of tasks (at computing stage) to weightings
             available_computation: The total available computation (= server.computational_cap)
             time_step: The current time step
+            validate: If to check that the compute weights are valid
 
         Returns: A dictionary of tasks to their resource usage (storage, compute, bandwidth)
 
@@ -137,47 +174,56 @@ class Server(NamedTuple):
 
         task_resource_usage: Dict[Task, Tuple[float, float, float]] = {}
 
-        assert all(task.stage is TaskStage.COMPUTING for task in compute_weights.keys())
-        assert all(0 < weight for weight in compute_weights.values())
+        if validate:
+            assert all(task.stage is TaskStage.COMPUTING for task in compute_weights.keys())
+            assert all(0 < weight for weight in compute_weights.values())
 
         # It is possible that the percentage of computational resources that could be allocated to a task is greater
         #   than the amount of required computational resource that the task needs to the allocated.
-        # So this while loop, checks if the relative maximum computational resources that could be allocated to a
-        #   task is less than the required computational resources
-        # But in doing this, the relative maximum computational resources that are then available to other tasks has changed,
-        #   so this process is looped over till no task will be completed with the relative maximum computational resources.
-        task_been_updated: bool = True
-        while task_been_updated and compute_weights:
+        # So the tasks that can finish with the relative maximum computational resources are allocated only the
+        #   required resources, but in doing this, the relative maximum computational resources that are then
+        #   available to other tasks has changed, so this process is repeated till no task will be completed.
+        # As the tasks are sorted by the required resources per weight, the tasks able to finish are always the next
+        #   tasks in the sorted order (water-filling) so each task is only checked once after sorting.
+        tasks: List[Task] = list(compute_weights.keys())
+        weights: List[float] = list(compute_weights.values())
+        remaining: List[float] = [task.required_computation - task.compute_progress for task in tasks]
+        order = _water_filling_order(remaining, weights)
+
+        pos, total_weights = 0, sum(weights)
+        while pos < len(order):
             # Base unit of computational resources relative to the sum of weights for the compute resources
-            compute_unit = round_float(available_computation / sum(compute_weights.values()))
-            task_been_updated = False
-
-            for task, weight in compute_weights.items():
-                # If the weight compute resources are less than the needed computational resources,
+            compute_unit = round_float(available_computation / total_weights)
+            end = _finishing_end(order, pos, remaining, weights, compute_unit)
+            if end == pos:
+                break
+
+            # The tasks are updated in their original order so that the resource usage has the same task order
+            for task_num in sorted(order[pos:end]):
+                # The weight compute resources are more than the needed computational resources,
                 #   allocate only the required resources
-                if task.required_computation - task.compute_progress <= weight * compute_unit:
-                    compute_resources = round_float(task.required_computation - task.compute_progress)
-
-                    # Set the updated task with the new resources and the resource used by the task
-                    updated_task = task.allocate_compute_resources(compute_resources, time_step)
-                    assert updated_task.stage is TaskStage.SENDING or updated_task.stage is TaskStage.FAILED
-                    task_resource_usage[updated_task] = (task.required_storage, compute_resources, 0)
-                    available_computation = round_float(available_computation - compute_resources)
-                    task_been_updated = True
+                task = tasks[task_num]
+                compute_resources = round_float(remaining[task_num])
 
-            # Update the compute weight based on the task that have had resources allocated
-            #   (must be done here as dictionaries cant be used during the loop)
-            compute_weights = {task: weight for task, weight in compute_weights.items()
-                               if task not in list(task_resource_usage.keys())}
+                # Set the updated task with the new resources and the resource used by the task
+                updated_task = task.allocate_compute_resources(compute_resources, time_step)
+                assert updated_task.stage is TaskStage.SENDING or updated_task.stage is TaskStage.FAILED
+                task_resource_usage[updated_task] = (task.required_storage, compute_resources, 0)
+                available_computation = round_float(available_computation - compute_resources)
+                total_weights -= weights[task_num]
+            pos = end
 
         # If there are any tasks that their compute stage isn't completed using the compute unit
-        if compute_weights:
+        if pos < len(order):
+            unfinished_tasks = sorted(order[pos:])
             # The compute unit with the available computational resources leftover
-            compute_unit = round_float(available_computation / sum(compute_weights.values()))
+            compute_unit = round_float(available_computation / sum(weights[task_num]
+                                                                   for task_num in unfinished_tasks))
 
-            for task, weight in compute_weights.items():
+            for task_num in unfinished_tasks:
                 # Updated the task with the compute resources
-                compute_resources = round_float(compute_unit * weight)
+                task = tasks[task_num]
+                compute_resources = round_float(compute_unit * weights[task_num])
                 updated_task = task.allocate_compute_resources(compute_resources, time_step)
                 task_resource_usage[updated_task] = (task.required_storage, compute_resources, 0)
 
@@ -186,7 +232,7 @@ class Server(NamedTuple):
     @staticmethod
     def allocate_bandwidth_resources(loading_weights: Dict[Task, float], sending_weights: Dict[Task, float],
                                      available_storage: float, available_bandwidth: float,
-                                     time_step: int) -> Dict[Task, Tuple[float, float, float]]:
+                                     time_step: int, validate: bool = True) -> Dict[Task, Tuple[float, float, float]]:
         """
         Allocate bandwidth (and storage) resources to task at Loading or Sending stages
 
@@ -196,6 +242,7 @@ class Server(NamedTuple):
             available_storage: The available storage of the server
             available_bandwidth: The available bandwidth of the server
             time_step: The current time step
+            validate: If to check that the loading and sending weights are valid
 
         Returns: A dictionary of tasks to resources used
 
@@ -204,49 +251,66 @@ class Server(NamedTuple):
         task_resource_usage: Dict[Task, Tuple[float, float, float]] = {}
 
         # Checks that the arguments are valid
-        assert all(task.stage is TaskStage.LOADING for task in loading_weights.keys())
-        assert all(0 < weight for weight in loading_weights.values())
-        assert all(task.stage is TaskStage.SENDING for task in sending_weights.keys())
-        assert all(0 < weight for weight in sending_weights.values())
+        if validate:
+            assert all(task.stage is TaskStage.LOADING for task in loading_weights.keys())
+            assert all(0 < weight for weight in loading_weights.values())
+            assert all(task.stage is TaskStage.SENDING for task in sending_weights.keys())
+            assert all(0 < weight for weight in sending_weights.values())
+
+        # The loading and sending tasks sorted by the required resources per weight (see allocate_compute_resources)
+        loading_tasks: List[Task] = list(loading_weights.keys())
+        loading_task_weights: List[float] = list(loading_weights.values())
+        loading_remaining: List[float] = [task.required_storage - task.loading_progress for task in loading_tasks]
+        loading_order = _water_filling_order(loading_remaining, loading_task_weights)
+        sending_tasks: List[Task] = list(sending_weights.keys())
+        sending_task_weights: List[float] = list(sending_weights.values())
+        sending_remaining: List[float] = [task.required_results_data - task.sending_progress
+                                          for task in sending_tasks]
+        sending_order = _water_filling_order(sending_remaining, sending_task_weights)
 
         # Using a similar idea to the compute weight allocation however has four stages to it
         # Stage 1. Tries finding tasks that can finish their current task stage
-        tasks_been_updated: List[Task] = [None]
-        while tasks_been_updated and (loading_weights or sending_weights):
+        loading_pos, sending_pos = 0, 0
+        # Loading tasks that could finish with the bandwidth unit but not with the available storage or bandwidth,
+        #   as the available storage and bandwidth only decrease, these tasks can't finish in stage 1
+        stuck_loading_tasks: List[int] = []
+        total_weights = sum(loading_task_weights) + sum(sending_task_weights)
+        tasks_been_updated: bool = True
+        while tasks_been_updated and (loading_pos < len(loading_order) or sending_pos < len(sending_order)):
             # The weighting bandwidth units
-            bandwidth_unit = round_float(
-                available_bandwidth / (sum(loading_weights.values()) + sum(sending_weights.values())))
+            bandwidth_unit = round_float(available_bandwidth / total_weights)
+            tasks_been_updated = False
 
-            # Reset the list of tasks that have been updated
-            tasks_been_updated = []
             # Stage 1.1 - check if sending tasks can be finished
-            for task, weight in sending_weights.items():
-                if task.required_results_data - task.sending_progress <= weight * bandwidth_unit:
-                    # Calculate the sending resources, update the task and resource usage, and bandwidth availability
-                    sending_resources = round_float(task.required_results_data - task.sending_progress)
-
-                    # Update the task and check that the stage is either completed or failed
-                    updated_task = task.allocate_sending_resources(sending_resources, time_step)
-                    assert updated_task.stage is TaskStage.COMPLETED or updated_task.stage is TaskStage.FAILED
-
-                    # Add resource usage and that the task has been updated
-                    task_resource_usage[updated_task] = (task.required_storage, 0, sending_resources)
-                    tasks_been_updated.append(updated_task)
-
-                    # Update available bandwidth due to the sending resources
-                    available_bandwidth = round_float(available_bandwidth - sending_resources)
-
-            # Update the sending weights by removing tasks that have been updated
-            sending_weights = {task: weight for task, weight in sending_weights.items() if
-                               task not in tasks_been_updated}
+            sending_end = _finishing_end(sending_order, sending_pos, sending_remaining, sending_task_weights,
+                                         bandwidth_unit)
+            for task_num in sorted(sending_order[sending_pos:sending_end]):
+                # Calculate the sending resources, update the task and resource usage, and bandwidth availability
+                task = sending_tasks[task_num]
+                sending_resources = round_float(sending_remaining[task_num])
+
+                # Update the task and check that the stage is either completed or failed
+                updated_task = task.allocate_sending_resources(sending_resources, time_step)
+                assert updated_task.stage is TaskStage.COMPLETED or updated_task.stage is TaskStage.FAILED
+
+                # Add resource usage and that the task has been updated
+                task_resource_usage[updated_task] = (task.required_storage, 0, sending_resources)
+                tasks_been_updated = True
+                total_weights -= sending_task_weights[task_num]
+
+                # Update available bandwidth due to the sending resources
+                available_bandwidth = round_float(available_bandwidth - sending_resources)
+            sending_pos = sending_end
 
             # Stage 1.2 - Check if loading tasks can be finished
-            for task, weight in loading_weights.items():
+            loading_end = _finishing_end(loading_order, loading_pos, loading_remaining, loading_task_weights,
+                                         bandwidth_unit)
+            for task_num in sorted(loading_order[loading_pos:loading_end]):
                 # Check that the resources required to complete the loading stage is less than min available resources
-                if task.required_storage - task.loading_progress <= min(weight * bandwidth_unit, available_storage,
-                                                                        available_bandwidth):
+                if loading_remaining[task_num] <= min(available_storage, available_bandwidth):
                     # Calculate the loading resources, update the task and resource usage, and bandwidth/storage availability
-                    loading_resources = round_float(task.required_storage - task.loading_progress)
+                    task = loading_tasks[task_num]
+                    loading_resources = round_float(loading_remaining[task_num])
 
                     # Update the task and check that stage is either computing or failed
                     updated_task = task.allocate_loading_resources(loading_resources, time_step)
@@ -254,29 +318,35 @@ class Server(NamedTuple):
 
                     # Add resource usage and that the task has been updated
                     task_resource_usage[updated_task] = (task.required_storage, 0, loading_resources)
-                    tasks_been_updated.append(updated_task)
+                    tasks_been_updated = True
+                    total_weights -= loading_task_weights[task_num]
 
                     # Update available storage and bandwidth due to loading resources
                     available_storage = round_float(available_storage - loading_resources)
                     available_bandwidth = round_float(available_bandwidth - loading_resources)
+                else:
+                    stuck_loading_tasks.append(task_num)
+            loading_pos = loading_end
 
-            # Update the loading weights by removing tasks that have been updated
-            loading_weights = {task: weight for task, weight in loading_weights.items() if
-                               task not in tasks_been_updated}
+        # The tasks that haven't finished their stage, in the original order of the tasks
+        unfinished_loading_tasks = sorted(stuck_loading_tasks + loading_order[loading_pos:])
+        unfinished_sending_tasks = sorted(sending_order[sending_pos:])
 
         # Stage 2 - Try to allocate loading tasks with the maximum available storage/bandwidth resources
-        if loading_weights or sending_weights:
+        if unfinished_loading_tasks or unfinished_sending_tasks:
             # Total sum of bandwidth weights
-            bandwidth_total_weights = sum(loading_weights.values()) + sum(sending_weights.values())
+            bandwidth_total_weights = sum(loading_task_weights[task_num] for task_num in unfinished_loading_tasks) + \
+                sum(sending_task_weights[task_num] for task_num in unfinished_sending_tasks)
 
             # Try to allocate resources for loading resources
-            for task, weight in loading_weights.items():
+            for task_num in unfinished_loading_tasks:
                 # Calculate the loading resources available to the task
+                weight = loading_task_weights[task_num]
                 loading_resources = round_float(
                     min(available_bandwidth / bandwidth_total_weights * weight, available_storage))
 
                 # Update the tasks with the loading resources
-                updated_task = task.allocate_loading_resources(loading_resources, time_step)
+                updated_task = loading_tasks[task_num].allocate_loading_resources(loading_resources, time_step)
                 # TODO this may not be true because of the available storage
                 # assert updated_task.stage is TaskStage.LOADING or updated_task.stage is TaskStage.FAILED
 
@@ -288,41 +358,40 @@ class Server(NamedTuple):
                 available_bandwidth = round_float(available_bandwidth - loading_resources)
                 bandwidth_total_weights -= weight
 
-            # Reset the variables to allow the while for the first iteration
-            tasks_been_updated = [None]
-            while tasks_been_updated and sending_weights:
+            # Stage 3 - Find the sending tasks that can finish with the remaining bandwidth, the sending tasks left
+            #   after stage 1 are still in sorted order
+            while sending_pos < len(sending_order):
                 bandwidth_unit = available_bandwidth / bandwidth_total_weights
-                tasks_been_updated = []
-
-                for task, weight in sending_weights.items():
-                    if task.required_results_data - task.sending_progress <= weight * bandwidth_unit:
-                        # Calculate the sending resources, update the task and resource usage, and bandwidth availability
-                        sending_resources = round_float(task.required_results_data - task.sending_progress)
+                sending_end = _finishing_end(sending_order, sending_pos, sending_remaining, sending_task_weights,
+                                             bandwidth_unit)
+                if sending_end == sending_pos:
+                    break
 
-                        # Update the tasks with the sending resources
-                        updated_task = task.allocate_sending_resources(sending_resources, time_step)
-                        assert updated_task.stage is TaskStage.COMPLETED or updated_task.stage is TaskStage.FAILED
+                for task_num in sorted(sending_order[sending_pos:sending_end]):
+                    # Calculate the sending resources, update the task and resource usage, and bandwidth availability
+                    task = sending_tasks[task_num]
+                    sending_resources = round_float(sending_remaining[task_num])
 
-                        # Add resource usage and that the task has been updated
-                        task_resource_usage[updated_task] = (task.required_storage, 0, sending_resources)
-                        tasks_been_updated.append(updated_task)
+                    # Update the tasks with the sending resources
+                    updated_task = task.allocate_sending_resources(sending_resources, time_step)
+                    assert updated_task.stage is TaskStage.COMPLETED or updated_task.stage is TaskStage.FAILED
 
-                        # Update available bandwidth due to sending resources and update bandwidth weights
-                        available_bandwidth = round_float(available_bandwidth - sending_resources)
-                        bandwidth_total_weights -= weight
+                    # Add resource usage
+                    task_resource_usage[updated_task] = (task.required_storage, 0, sending_resources)
 
-                    # Update the sending weights for tasks that haven't had resources allocated
-                    #   (this cant happen during the loop with dictionaries)
-                sending_weights = {task: weight for task, weight in sending_weights.items()
-                                   if task not in tasks_been_updated}
+                    # Update available bandwidth due to sending resources and update bandwidth weights
+                    available_bandwidth = round_float(available_bandwidth - sending_resources)
+                    bandwidth_total_weights -= sending_task_weights[task_num]
+                sending_pos = sending_end
 
-            # Allocate the remaining resources to the sending tasks
-            if sending_weights:
+            # Stage 4 - Allocate the remaining resources to the sending tasks
+            if sending_pos < len(sending_order):
                 # Bandwidth units
                 bandwidth_unit = round_float(available_bandwidth / bandwidth_total_weights)
-                for task, weight in sending_weights.items():
+                for task_num in sorted(sending_order[sending_pos:]):
                     # Sending resources
-                    sending_resources = round_float(bandwidth_unit * weight)
+                    task = sending_tasks[task_num]
+                    sending_resources = round_float(bandwidth_unit * sending_task_weights[task_num])
 
                     # Update the task
                     updated_task = task.allocate_sending_resources(sending_resources, time_step)
@@ -334,3 +403,39 @@ class Server(NamedTuple):
 
         # Return the task resource usage
         return task_resource_usage
+
+
+def _water_filling_order(remaining: List[float], weights: List[float]) -> List[int]:
+    """
+    Sorts the tasks by the remaining resources per weight, the order that the tasks are able to finish their stage
+        as the resource unit increases
+
+    Args:
+        remaining: The remaining resources of each task for the task stage
+        weights: The weight of each task
+
+    Returns: List of the task indexes in sorted order
+
+    """
+    return sorted(range(len(weights)), key=lambda task_num: remaining[task_num] / weights[task_num])
+
+
+def _finishing_end(order: List[int], pos: int, remaining: List[float], weights: List[float],
+                   resource_unit: float) -> int:
+    """
+    Finds the tasks (from a position in the sorted order) that can finish their stage with the resource unit
+
+    Args:
+        order: The sorted order of the task indexes
+        pos: The position in the order of the first task not already finished
+        remaining: The remaining resources of each task for the task stage
+        weights: The weight of each task
+        resource_unit: The resources per unit of weight
+
+    Returns: The position in the order after the last task that can finish
+
+    """
+    end = pos
+    while end < len(order) and remaining[order[end]] <= weights[order[end]] * resource_unit:
+        end += 1
+    return end
@@ -0,0 +1,205 @@
+"""
+Sharded resource allocation of a single environment, the servers are split into shards that each allocate the
+    resources of their servers in a worker process while the environment (the coordinator) runs the auctions
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import traceback
+from typing import TYPE_CHECKING
+
+from env.task_stage import TaskStage
+
+if TYPE_CHECKING:
+    from env.server import Server
+    from env.task import Task
+    from multiprocessing.connection import Connection
+    from typing import Dict, List, Optional, Tuple
+
+
+def _shard_worker(connection: Connection):
+    """
+    The worker process of a shard that allocates the resources of the shard's servers for each step, the worker keeps
+        the tasks of its servers so each step only receives the tasks added since the last step and the task weights
+        and only sends the stage and progress of the tasks
+
+    Args:
+        connection: The connection to the shard pool
+    """
+    # The server and tasks of each of the shard's servers (by server id)
+    server_tasks: Dict[int, Tuple[Server, List[Task]]] = {}
+    while True:
+        command = connection.recv()
+        if command is None:
+            break
+
+        # Any error (the resource allocation asserts) is sent to the shard pool with the traceback to be raised
+        #   rather than stopping the worker, so every worker always replies. The tasks of the servers are then
+        #   cleared as the shard pool resends every server after an error
+        updates, time_step, validate = command
+        try:
+            next_server_tasks: Dict[int, Tuple[Server, List[Task]]] = {}
+            task_progress: List[List[Tuple[int, float, float, float]]] = []
+            for server_id, server, new_tasks, weights in updates:
+                if server is None:
+                    server, tasks = server_tasks[server_id]
+                    tasks = tasks + new_tasks
+                else:
+                    tasks = new_tasks
+
+                unfinished, finished = server.allocate_resources(dict(zip(tasks, weights)), time_step,
+                                                                 validate=validate)
+                updated_tasks = {task.uid: task for task in unfinished + finished}
+                updated_tasks = [updated_tasks[task.uid] for task in tasks]
+                task_progress.append([(task.stage.value, task.loading_progress, task.compute_progress,
+                                       task.sending_progress) for task in updated_tasks])
+                next_server_tasks[server_id] = server, unfinished
+            server_tasks = next_server_tasks
+            connection.send((task_progress, None))
+        except Exception:
+            server_tasks = {}
+            connection.send(([], traceback.format_exc()))
+
+
+class ShardPool:
+    """
+    Pool of worker processes that each allocate the resources of a shard of the servers. The servers are assigned to
+        the shards by their position in the server order and only the servers with tasks are sent to the shards.
+
+    The workers keep the tasks of their servers from the last step (see _shard_worker), the pool keeps the task lists
+        that the workers have so when a server's tasks are the worker's tasks with added tasks (the auctioned tasks)
+        only the added tasks are sent, otherwise (a reset or a fork) every task of the server is sent.
+    """
+
+    def __init__(self, num_shards: int, start_method: Optional[str] = None):
+        """
+        Constructor of the shard pool that starts the worker processes
+
+        Args:
+            num_shards: The number of shards (and worker processes)
+            start_method: The multiprocessing start method
+        """
+        assert 0 < num_shards
+
+        self.num_shards = num_shards
+        context = mp.get_context(start_method)
+        self._connections: List[Connection] = []
+        self._processes: List[mp.Process] = []
+        for _ in range(num_shards):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=_shard_worker, args=(worker_connection,), daemon=True)
+            process.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+        # The server and unfinished tasks that each worker has of its servers (by server id)
+        self._worker_tasks: List[Dict[int, Tuple[Server, List[Task]]]] = [{} for _ in range(num_shards)]
+        # The number of environments (an environment and its forks) using the pool, see share and close
+        self._users = 1
+        self.closed = False
+
+    def allocate_resources(self, server_tasks: Dict[Server, List[Task]], actions: Dict[Server, Dict[Task, float]],
+                           time_step: int, validate: bool = True) \
+            -> Tuple[Dict[Server, List[Task]], Dict[Server, List[Task]]]:
+        """
+        Allocates the resources of every server, each shard allocates its servers in parallel
+
+        Args:
+            server_tasks: Dictionary of server to allocated tasks
+            actions: The resource weights of each server's tasks
+            time_step: The current time step
+            validate: If to check that the tasks and the resources used are valid
+
+        Returns: Tuple of the dictionary of server to unfinished tasks and the dictionary of server to finished
+            (completed or failed) tasks, in the order of the server's tasks
+
+        """
+        assert not self.closed
+        shards: List[List[Server]] = [[] for _ in range(self.num_shards)]
+        for server_num, (server, tasks) in enumerate(server_tasks.items()):
+            if tasks:
+                shards[server_num % self.num_shards].append(server)
+
+        for connection, worker_tasks, servers in zip(self._connections, self._worker_tasks, shards):
+            if servers:
+                connection.send(([self._server_update(server, server_tasks[server], actions[server], worker_tasks)
+                                  for server in servers], time_step, validate))
+
+        # Every shard replies (with the traceback of the error if the allocation failed) before any error is raised
+        replies = [connection.recv() if servers else ([], None)
+                   for connection, servers in zip(self._connections, shards)]
+        for shard_num, (_, error) in enumerate(replies):
+            if error is not None:
+                self._worker_tasks = [{} for _ in range(self.num_shards)]
+                raise Exception(f'Shard worker {shard_num} failed to allocate resources:\n{error}')
+
+        # Update the tasks of each server with the stage and progress of the workers
+        stages = {task_stage.value: task_stage for task_stage in TaskStage}
+        next_server_tasks: Dict[Server, List[Task]] = {server: [] for server in server_tasks.keys()}
+        finished_tasks: Dict[Server, List[Task]] = {server: [] for server in server_tasks.keys()}
+        for shard_num, (servers, (task_progress, _)) in enumerate(zip(shards, replies)):
+            if servers:
+                self._worker_tasks[shard_num] = {}
+            for server, progress in zip(servers, task_progress):
+                for task, (stage, loading, compute, sending) in zip(server_tasks[server], progress):
+                    updated_task = task._replace(stage=stages[stage], loading_progress=loading,
+                                                 compute_progress=compute, sending_progress=sending)
+                    if updated_task.stage is TaskStage.COMPLETED or updated_task.stage is TaskStage.FAILED:
+                        finished_tasks[server].append(updated_task)
+                    else:
+                        next_server_tasks[server].append(updated_task)
+                self._worker_tasks[shard_num][server.uid] = server, next_server_tasks[server]
+        return next_server_tasks, finished_tasks
+
+    @staticmethod
+    def _server_update(server: Server, tasks: List[Task], task_resource_weights: Dict[Task, float],
+                       worker_tasks: Dict[int, Tuple[Server, List[Task]]]) \
+            -> Tuple[int, Optional[Server], List[Task], List[float]]:
+        """
+        The update of a server sent to its worker
+
+        Args:
+            server: The server
+            tasks: The server's tasks
+            task_resource_weights: The resource weights of the server's tasks
+            worker_tasks: The server and tasks that the worker has of its servers
+
+        Returns: Tuple of the server id, the server (None if the worker has the server's tasks), the server's tasks
+            (only the tasks added after the worker's tasks if the worker has the server's tasks) and the task weights
+
+        """
+        worker_server, previous_tasks = worker_tasks.get(server.uid, (None, None))
+        weights = [task_resource_weights[task] for task in tasks]
+        if worker_server is server and len(previous_tasks) <= len(tasks) and \
+                all(previous_task is task for previous_task, task in zip(previous_tasks, tasks)):
+            return server.uid, None, tasks[len(previous_tasks):], weights
+        return server.uid, server, tasks, weights
+
+    def share(self) -> ShardPool:
+        """
+        Shares the pool with another environment (a fork), the workers are only stopped once every environment
+            sharing the pool has closed it
+
+        Returns: The shard pool
+
+        """
+        assert not self.closed
+        self._users += 1
+        return self
+
+    def close(self):
+        """
+        Closes the pool for an environment, the worker processes are stopped when the last environment using the pool
+            closes it
+        """
+        if self.closed:
+            return
+        self._users -= 1
+        if 0 < self._users:
+            return
+        for connection in self._connections:
+            connection.send(None)
+        for process in self._processes:
+            process.join()
+        self.closed = True
@@ -0,0 +1,282 @@
+"""
+Compact binary snapshot format of an environment using numpy structured arrays, an alternative to the json format of
+    OnlineFlexibleResourceAllocationEnv.save_env that can be memory mapped and is read lazily
+
+The file is the magic bytes, the length of the json header, the json header then the aligned server and task arrays
+    with the allocated tasks before the unallocated tasks. The server and task names are stored as an array of utf-8
+    bytes with an array of the offsets of each name (the server names then the task names).
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from env.server import Server
+from env.task import Task
+from env.task_stage import TaskStage
+
+if TYPE_CHECKING:
+    from env.env_state import EnvState
+    from typing import Dict, Iterator, List, Sequence, Tuple
+
+# The bytes at the start of every snapshot file
+SNAPSHOT_MAGIC: bytes = b'OFRA-SNP'
+# The struct format of the json header length
+_HEADER_LENGTH = struct.Struct('<I')
+# The alignment of the arrays within the file
+_ALIGNMENT: int = 64
+
+_SERVER_DTYPE = np.dtype([('storage_cap', '<f8'), ('computational_cap', '<f8'), ('bandwidth_cap', '<f8')])
+# The fields are in the same order as the Task fields (without the name) followed by the server index (-1 for
+#   unallocated tasks)
+_TASK_DTYPE = np.dtype([('required_storage', '<f8'), ('required_computation', '<f8'), ('required_results_data', '<f8'),
+                        ('auction_time', '<i8'), ('deadline', '<i8'), ('stage', '<i1'), ('loading_progress', '<f8'),
+                        ('compute_progress', '<f8'), ('sending_progress', '<f8'), ('price', '<f8'),
+                        ('server', '<i8')])
+_NAME_OFFSETS_DTYPE = np.dtype('<i8')
+_NAME_DATA_DTYPE = np.dtype('<u1')
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _array_offsets(header_length: int, array_sizes: Sequence[int]) -> List[int]:
+    """
+    The offsets of the arrays within the file, each array is aligned
+
+    Args:
+        header_length: The length of the json header
+        array_sizes: The size of each array in bytes
+
+    Returns: The offset of each array
+
+    """
+    offsets, offset = [], len(SNAPSHOT_MAGIC) + _HEADER_LENGTH.size + header_length
+    for array_size in array_sizes:
+        offsets.append(_align(offset))
+        offset = offsets[-1] + array_size
+    return offsets
+
+
+def is_snapshot(filename: str) -> bool:
+    """
+    Checks if a file is a binary snapshot
+
+    Args:
+        filename: The filename
+
+    Returns: If the file starts with the snapshot magic bytes
+
+    """
+    with open(filename, 'rb') as file:
+        return file.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC
+
+
+def save_snapshot(filename: str, env_name: str, state: EnvState, unallocated_tasks: List[Task],
+                  total_time_steps: int):
+    """
+    Saves an environment to a binary snapshot file
+
+    Args:
+        filename: The filename to save the snapshot to
+        env_name: The environment name
+        state: The environment state
+        unallocated_tasks: The unallocated tasks in auction time order with the auction task first (if there is one)
+        total_time_steps: The environment total time steps
+    """
+    servers = list(state.server_tasks.keys())
+    tasks = [(server_num, task) for server_num, server_tasks in enumerate(state.server_tasks.values())
+             for task in server_tasks] + [(-1, task) for task in unallocated_tasks]
+
+    server_array = np.array([(server.storage_cap, server.computational_cap, server.bandwidth_cap)
+                             for server in servers], dtype=_SERVER_DTYPE)
+    task_array = np.array([(task.required_storage, task.required_computation, task.required_results_data,
+                            task.auction_time, task.deadline, task.stage.value, task.loading_progress,
+                            task.compute_progress, task.sending_progress, task.price, server_num)
+                           for server_num, task in tasks], dtype=_TASK_DTYPE)
+    encoded_names = [server.name.encode() for server in servers] + [task.name.encode() for _, task in tasks]
+    name_offsets = np.concatenate(([0], np.cumsum([len(name) for name in encoded_names], dtype=np.int64)))
+    arrays = (server_array, task_array, name_offsets.astype(_NAME_OFFSETS_DTYPE),
+              np.frombuffer(b''.join(encoded_names), dtype=_NAME_DATA_DTYPE))
+
+    header_data = json.dumps({
+        'env name': env_name, 'time step': state.time_step, 'total time steps': total_time_steps,
+        'num servers': len(server_array), 'num tasks': len(task_array),
+        'num allocated tasks': len(task_array) - len(unallocated_tasks), 'name data size': len(arrays[3])
+    }).encode()
+
+    with open(filename, 'wb') as file:
+        file.write(SNAPSHOT_MAGIC)
+        file.write(_HEADER_LENGTH.pack(len(header_data)))
+        file.write(header_data)
+        for array, offset in zip(arrays, _array_offsets(len(header_data), [array.nbytes for array in arrays])):
+            file.seek(offset)
+            file.write(array.tobytes())
+
+
+class Snapshot:
+    """
+    A lazily read environment snapshot, only the header is read when the snapshot is loaded, the server and task
+        arrays are read (or memory mapped) when they are first accessed
+    """
+
+    def __init__(self, filename: str, mmap: bool = False):
+        """
+        Constructor of the snapshot that reads the header of the snapshot file
+
+        Args:
+            filename: The snapshot filename
+            mmap: If to memory map the server and task arrays rather than reading them
+        """
+        self.filename = filename
+        self.mmap = mmap
+
+        with open(filename, 'rb') as file:
+            assert file.read(len(SNAPSHOT_MAGIC)) == SNAPSHOT_MAGIC, f'{filename} is not an environment snapshot'
+            header_length, = _HEADER_LENGTH.unpack(file.read(_HEADER_LENGTH.size))
+            self.header: Dict = json.loads(file.read(header_length))
+
+        self.env_name: str = self.header['env name']
+        self.time_step: int = self.header['time step']
+        self.total_time_steps: int = self.header['total time steps']
+        self.num_servers: int = self.header['num servers']
+        self.num_tasks: int = self.header['num tasks']
+        self.num_allocated_tasks: int = self.header['num allocated tasks']
+
+        # The dtype, number of rows and offset of each array
+        array_rows = ((_SERVER_DTYPE, self.num_servers), (_TASK_DTYPE, self.num_tasks),
+                      (_NAME_OFFSETS_DTYPE, self.num_servers + self.num_tasks + 1),
+                      (_NAME_DATA_DTYPE, self.header['name data size']))
+        self._arrays: Dict[str, Tuple[np.dtype, int, int]] = {
+            array: (dtype, count, offset) for array, (dtype, count), offset in zip(
+                ('servers', 'tasks', 'name_offsets', 'name_data'), array_rows,
+                _array_offsets(header_length, [dtype.itemsize * count for dtype, count in array_rows]))
+        }
+        self._read_arrays: Dict[str, np.ndarray] = {}
+
+    def _array(self, array: str) -> np.ndarray:
+        """
+        Reads (or memory maps) an array when first accessed
+
+        Args:
+            array: The array name
+
+        Returns: The array
+
+        """
+        if array not in self._read_arrays:
+            dtype, count, offset = self._arrays[array]
+            if count == 0:
+                self._read_arrays[array] = np.empty(0, dtype=dtype)
+            elif self.mmap:
+                self._read_arrays[array] = np.memmap(self.filename, dtype=dtype, mode='r', offset=offset,
+                                                     shape=(count,))
+            else:
+                self._read_arrays[array] = np.fromfile(self.filename, dtype=dtype, count=count, offset=offset)
+        return self._read_arrays[array]
+
+    @property
+    def servers(self) -> np.ndarray:
+        """
+        Returns: The structured array of servers (without the server names, see names)
+
+        """
+        return self._array('servers')
+
+    @property
+    def tasks(self) -> np.ndarray:
+        """
+        Returns: The structured array of tasks (without the task names, see names), with the server index of each task
+            (-1 for unallocated tasks)
+
+        """
+        return self._array('tasks')
+
+    def names(self, start: int, end: int) -> List[str]:
+        """
+        Decodes the names of a range of the servers then tasks
+
+        Args:
+            start: The position of the first name (the servers are before the tasks)
+            end: The position after the last name
+
+        Returns: List of the names
+
+        """
+        name_offsets = self._array('name_offsets')[start:end + 1].tolist()
+        name_data = self._array('name_data')[name_offsets[0]:name_offsets[-1]].tobytes()
+        return [name_data[start_offset - name_offsets[0]:end_offset - name_offsets[0]].decode()
+                for start_offset, end_offset in zip(name_offsets, name_offsets[1:])]
+
+    def _tasks(self, start: int, end: int) -> List[Tuple[int, Task]]:
+        """
+        Builds a range of the tasks
+
+        Args:
+            start: The position of the first task
+            end: The position after the last task
+
+        Returns: List of the server index and task of each task
+
+        """
+        stages = {stage.value: stage for stage in TaskStage}
+        return [(task_data[10], Task(name, *task_data[:5], stages[task_data[5]], *task_data[6:10]))
+                for name, task_data in zip(self.names(self.num_servers + start, self.num_servers + end),
+                                           self.tasks[start:end].tolist())]
+
+    def server_tasks(self) -> Dict[Server, List[Task]]:
+        """
+        Builds the servers and allocated tasks of the snapshot
+
+        Returns: Dictionary of server to allocated tasks
+
+        """
+        servers = [Server(name, *server_data) for name, server_data in zip(self.names(0, self.num_servers),
+                                                                          self.servers.tolist())]
+        server_tasks: Dict[Server, List[Task]] = {server: [] for server in servers}
+        for server_num, task in self._tasks(0, self.num_allocated_tasks):
+            server_tasks[servers[server_num]].append(task)
+        return server_tasks
+
+    def unallocated_tasks(self, chunk_size: int = 4096) -> SnapshotTasks:
+        """
+        Args:
+            chunk_size: The number of tasks built at a time
+
+        Returns: The unallocated tasks of the snapshot (in auction time order) that are built as they are read
+
+        """
+        return SnapshotTasks(self, chunk_size)
+
+
+class SnapshotTasks:
+    """
+    The unallocated tasks of a snapshot as a task source (see ArrivalQueue), the tasks are built a chunk at a time as
+        they are iterated. The number of tasks is known so the source is bounded.
+    """
+
+    def __init__(self, snapshot: Snapshot, chunk_size: int = 4096):
+        """
+        Constructor of the snapshot tasks
+
+        Args:
+            snapshot: The snapshot
+            chunk_size: The number of tasks built at a time
+        """
+        assert 0 < chunk_size
+
+        self.snapshot = snapshot
+        self.chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        return self.snapshot.num_tasks - self.snapshot.num_allocated_tasks
+
+    def __iter__(self) -> Iterator[Task]:
+        for chunk_start in range(self.snapshot.num_allocated_tasks, self.snapshot.num_tasks, self.chunk_size):
+            chunk_end = min(chunk_start + self.chunk_size, self.snapshot.num_tasks)
+            yield from (task for _, task in self.snapshot._tasks(chunk_start, chunk_end))
@@ -0,0 +1,75 @@
+"""
+Delta-encoded server task updates between environment states, the tasks added to, progressed on and finished by each
+    server so that the agent observations of a server can be updated rather than rebuilt from the full state
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, NamedTuple
+
+if TYPE_CHECKING:
+    from env.server import Server
+    from env.task import Task
+    from typing import Dict, List, Optional, Sequence, Tuple
+
+
+class ServerDelta(NamedTuple):
+    """
+    The changes to a server's tasks in a step
+    """
+    added: Tuple[Task, ...] = ()  # The tasks won by the server (in the order added to the server's tasks)
+    progressed: Tuple[Task, ...] = ()  # The updated tasks whose stage or progress changed (and are not finished)
+    finished: Tuple[Task, ...] = ()  # The completed or failed tasks that are no longer allocated to the server
+
+
+def state_deltas(server_tasks: Dict[Server, List[Task]], next_server_tasks: Dict[Server, List[Task]],
+                 finished_server_tasks: Optional[Dict[Server, List[Task]]] = None) -> Dict[Server, ServerDelta]:
+    """
+    Finds the changes to each server's tasks between two states, as the server task lists are copy-on-write the
+        servers whose task list is unchanged are skipped without checking the tasks
+
+    Args:
+        server_tasks: Dictionary of server to allocated tasks of the state
+        next_server_tasks: Dictionary of server to allocated tasks of the next state
+        finished_server_tasks: Dictionary of server to the finished tasks of the step
+
+    Returns: Dictionary of server to the server's changes, only the servers whose tasks changed are included
+
+    """
+    deltas: Dict[Server, ServerDelta] = {}
+    for server, next_tasks in next_server_tasks.items():
+        tasks = server_tasks[server]
+        finished = tuple(finished_server_tasks.get(server, ())) if finished_server_tasks else ()
+        if next_tasks is tasks and not finished:
+            continue
+
+        progress = {task.uid: (task.stage, task.loading_progress, task.compute_progress, task.sending_progress)
+                    for task in tasks}
+        added, progressed = [], []
+        for task in next_tasks:
+            previous = progress.get(task.uid)
+            if previous is None:
+                added.append(task)
+            elif previous != (task.stage, task.loading_progress, task.compute_progress, task.sending_progress):
+                progressed.append(task)
+
+        if added or progressed or finished:
+            deltas[server] = ServerDelta(tuple(added), tuple(progressed), finished)
+    return deltas
+
+
+def apply_delta(tasks: Sequence[Task], delta: ServerDelta) -> List[Task]:
+    """
+    Updates a server's cached task list with the server's changes
+
+    Args:
+        tasks: The server's allocated tasks of the state
+        delta: The server's changes of the step
+
+    Returns: The server's allocated tasks of the next state in the same order as the next state, as resource
+        allocation keeps the order of the unfinished tasks and the won tasks are added last
+
+    """
+    finished = {task.uid for task in delta.finished}
+    progressed = {task.uid: task for task in delta.progressed}
+    return [progressed.get(task.uid, task) for task in tasks if task.uid not in finished] + list(delta.added)
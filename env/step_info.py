@@ -0,0 +1,99 @@
+"""
+Information of an environment step that holds the raw values of the step and only formats the string values when read
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from env.server import Server
+    from env.state_delta import ServerDelta
+    from typing import Dict, Iterable, Iterator, List, Optional
+
+
+class StepInfo(Mapping):
+    """
+    The step information, a mapping with the same string keys and values as the previous information dictionary
+        ('step type', 'min price servers', 'min price', 'second min price', 'winning server' or 'min servers')
+        however the values are only formatted when read. The raw values are available as attributes.
+    """
+
+    def __init__(self, step_type: str, servers: Iterable[Server] = (), min_price_servers: Optional[List[Server]] = None,
+                 min_price: Optional[float] = None, second_min_price: Optional[float] = None,
+                 winning_server: Optional[Server] = None):
+        """
+        Constructor of the step information
+
+        Args:
+            step_type: The step type, either auction or resource allocation
+            servers: The servers of the environment in order (used for the server indexes)
+            min_price_servers: The servers with the minimum auction price
+            min_price: The minimum auction price
+            second_min_price: The second minimum auction price
+            winning_server: The server that won the auction
+        """
+        self.step_type = step_type
+        self.servers = servers
+        self.min_price_servers = min_price_servers
+        self.min_price = min_price
+        self.second_min_price = second_min_price
+        self.winning_server = winning_server
+
+        # The changes to each server's tasks of the step, set by the environment if using delta updates
+        #   (see env/state_delta.py)
+        self.deltas: Optional[Dict[Server, ServerDelta]] = None
+
+    def _keys(self) -> List[str]:
+        if self.step_type != 'auction':
+            return ['step type']
+        elif self.winning_server is None:
+            return ['step type', 'min servers']
+        else:
+            return ['step type', 'min price servers', 'min price', 'second min price', 'winning server']
+
+    def __getitem__(self, key: str) -> str:
+        if key not in self._keys():
+            raise KeyError(key)
+
+        if key == 'step type':
+            return self.step_type
+        elif key == 'min servers':
+            return 'failed, no server won'
+        elif key == 'min price servers':
+            return f"[{', '.join(server.name for server in self.min_price_servers)}]"
+        elif key == 'min price':
+            return str(self.min_price)
+        elif key == 'second min price':
+            return str(self.second_min_price)
+        else:
+            return self.winning_server.name
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._keys())
+
+    def __len__(self) -> int:
+        return len(self._keys())
+
+    def __repr__(self) -> str:
+        return f'StepInfo({dict(self)})'
+
+    def _server_index(self, server: Server) -> int:
+        return next(index for index, _server in enumerate(self.servers) if _server == server)
+
+    @property
+    def min_price_server_indexes(self) -> List[int]:
+        """
+        Returns: The indexes of the servers with the minimum auction price
+
+        """
+        return [self._server_index(server) for server in self.min_price_servers or []]
+
+    @property
+    def winning_server_index(self) -> Optional[int]:
+        """
+        Returns: The index of the server that won the auction (None if no server won)
+
+        """
+        return None if self.winning_server is None else self._server_index(self.winning_server)
@@ -0,0 +1,272 @@
+"""
+Vector environment that runs a number of online flexible resource allocation environments in worker processes, the
+    observations, actions and rewards are exchanged through shared memory arrays
+"""
+
+from __future__ import annotations
+
+import multiprocessing as mp
+import random as rnd
+import traceback
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, NamedTuple
+
+import numpy as np
+
+from env.environment import OnlineFlexibleResourceAllocationEnv
+from env.observation import TASK_FEATURES, array_actions, array_rewards, write_observation
+
+if TYPE_CHECKING:
+    from multiprocessing.connection import Connection
+    from typing import Dict, List, Optional, Tuple, Union
+
+
+class VectorObservation(NamedTuple):
+    """
+    The observation arrays of every environment
+    """
+    # The task features of each server, shape (envs, servers, tasks, features)
+    task_obs: np.ndarray
+    # If the task slot of the server contains a task, shape (envs, servers, tasks)
+    task_mask: np.ndarray
+    # The auction task features for each server, shape (envs, servers, features)
+    auction_obs: np.ndarray
+    # If the server slot contains a server, shape (envs, servers)
+    server_mask: np.ndarray
+    # If the environment is at an auction step, shape (envs,)
+    auction: np.ndarray
+    # The environment time step, shape (envs,)
+    time_step: np.ndarray
+
+
+class VectorRewards(NamedTuple):
+    """
+    The rewards of a vector environment step
+    """
+    # The price that each server won the auction task at, shape (envs, servers)
+    auction: np.ndarray
+    # The stage (TaskStage value) of the tasks that finished in the task slots before the step (zero for tasks that
+    #   haven't finished), shape (envs, servers, tasks)
+    finished_tasks: np.ndarray
+
+
+def _buffer_specs(num_envs: int, max_servers: int, max_tasks: int) -> Dict[str, Tuple[tuple, type]]:
+    """
+    The shape and data type of each shared memory buffer
+
+    Args:
+        num_envs: The number of environments
+        max_servers: The maximum number of servers in an environment
+        max_tasks: The maximum number of tasks on a server
+
+    Returns: Dictionary of buffer name to shape and data type
+
+    """
+    return {
+        'task obs': ((num_envs, max_servers, max_tasks, TASK_FEATURES), np.float32),
+        'task mask': ((num_envs, max_servers, max_tasks), np.bool_),
+        'auction obs': ((num_envs, max_servers, TASK_FEATURES), np.float32),
+        'server mask': ((num_envs, max_servers), np.bool_),
+        'auction': ((num_envs,), np.bool_),
+        'time step': ((num_envs,), np.int64),
+        'done': ((num_envs,), np.bool_),
+        'auction rewards': ((num_envs, max_servers), np.float64),
+        'finished tasks': ((num_envs, max_servers, max_tasks), np.int8),
+        'auction prices': ((num_envs, max_servers), np.float64),
+        'resource weights': ((num_envs, max_servers, max_tasks), np.float64),
+    }
+
+
+def _attach_buffers(specs: Dict[str, Tuple[tuple, type]],
+                    memory: Dict[str, SharedMemory]) -> Dict[str, np.ndarray]:
+    """
+    Creates the arrays of each shared memory buffer
+
+    Args:
+        specs: Dictionary of buffer name to shape and data type
+        memory: Dictionary of buffer name to shared memory
+
+    Returns: Dictionary of buffer name to array
+
+    """
+    return {name: np.ndarray(shape, dtype=dtype, buffer=memory[name].buf) for name, (shape, dtype) in specs.items()}
+
+
+def _worker(connection: Connection, env_num: int, env_settings: List[str], seed: Optional[int],
+            specs: Dict[str, Tuple[tuple, type]], memory_names: Dict[str, str]):
+    """
+    The worker process that runs a single environment, writing the observations and rewards to the shared memory
+
+    Args:
+        connection: The connection to the vector environment
+        env_num: The environment number of the worker
+        env_settings: The environment settings
+        seed: The random seed of the environment
+        specs: Dictionary of buffer name to shape and data type
+        memory_names: Dictionary of buffer name to shared memory name
+    """
+    if seed is not None:
+        rnd.seed(seed + env_num)
+    memory = {name: SharedMemory(name=memory_name) for name, memory_name in memory_names.items()}
+    # The ellipsis keeps the per-environment scalar buffers as (writable) zero dimensional views
+    buffers = {name: array[env_num, ...] for name, array in _attach_buffers(specs, memory).items()}
+    env = OnlineFlexibleResourceAllocationEnv(env_settings)
+
+    def write_state(state):
+        write_observation(state, buffers['task obs'], buffers['task mask'],
+                          buffers['auction obs'], buffers['server mask'])
+        buffers['auction'][...] = state.auction_task is not None
+        buffers['time step'][...] = state.time_step
+
+    max_servers, max_tasks, _ = buffers['task obs'].shape
+    try:
+        while True:
+            command = connection.recv()
+            if command == 'close':
+                break
+
+            # Any error of the environment is sent to the vector environment to be raised rather than stopping the
+            #   worker, so every worker always replies to each command
+            try:
+                if command == 'reset':
+                    write_state(env.reset())
+                elif command == 'step':
+                    # noinspection PyProtectedMember
+                    state = env._state
+                    # The bids of servers with max tasks tasks are ignored so the server tasks fit in the task slots
+                    actions = array_actions(state, {'auction_prices': buffers['auction prices'],
+                                                    'resource_weights': buffers['resource weights']}, max_tasks)
+                    next_state, rewards, done, _ = env.step(actions)
+
+                    step_rewards = array_rewards(state, rewards, max_servers, max_tasks)
+                    buffers['auction rewards'][...] = step_rewards['auction']
+                    buffers['finished tasks'][...] = step_rewards['finished_tasks']
+
+                    # The environment is reset once done so the observation is the start of the next episode
+                    buffers['done'][...] = done
+                    write_state(env.reset() if done else next_state)
+                connection.send(None)
+            except Exception:
+                connection.send(traceback.format_exc())
+    finally:
+        for shared_memory in memory.values():
+            shared_memory.close()
+
+
+class SubprocessVectorEnv:
+    """
+    Runs a number of environments in worker processes, each step sends a batch of actions to every environment
+        through shared memory and returns the observation arrays rather than the environment states.
+        Environments are automatically reset once done.
+    """
+
+    def __init__(self, env_settings: Union[str, List[str]], num_envs: int, max_servers: int, max_tasks: int,
+                 seed: Optional[int] = None, start_method: Optional[str] = None):
+        """
+        Constructor of the vector environment
+
+        Args:
+            env_settings: The environment setting files
+            num_envs: The number of environments (and worker processes)
+            max_servers: The maximum number of servers in an environment
+            max_tasks: The maximum number of tasks on a server
+            seed: The random seed of the environments
+            start_method: The multiprocessing start method
+        """
+        assert 0 < num_envs and 0 < max_servers and 0 < max_tasks
+
+        self.num_envs = num_envs
+        specs = _buffer_specs(num_envs, max_servers, max_tasks)
+        self._memory: Dict[str, SharedMemory] = {
+            name: SharedMemory(create=True, size=max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1))
+            for name, (shape, dtype) in specs.items()
+        }
+        self._buffers = _attach_buffers(specs, self._memory)
+        for array in self._buffers.values():
+            array.fill(0)
+
+        context = mp.get_context(start_method)
+        env_settings = [env_settings] if type(env_settings) is str else env_settings
+        memory_names = {name: shared_memory.name for name, shared_memory in self._memory.items()}
+        self._connections: List[Connection] = []
+        self._processes: List[mp.Process] = []
+        for env_num in range(num_envs):
+            connection, worker_connection = context.Pipe()
+            process = context.Process(target=_worker, daemon=True,
+                                      args=(worker_connection, env_num, env_settings, seed, specs, memory_names))
+            process.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._processes.append(process)
+        self.closed = False
+
+    def _send(self, command: str):
+        """
+        Sends a command to every worker and waits for all of the workers to finish
+
+        Args:
+            command: The worker command
+        """
+        for connection in self._connections:
+            connection.send(command)
+        # Every worker replies (with the traceback of the error if the command failed) before any error is raised
+        errors = [(env_num, connection.recv()) for env_num, connection in enumerate(self._connections)]
+        for env_num, error in errors:
+            if error is not None:
+                raise Exception(f'Environment worker {env_num} failed to {command}:\n{error}')
+
+    def _observation(self) -> VectorObservation:
+        """
+        Returns: A copy of the observation arrays
+
+        """
+        return VectorObservation(self._buffers['task obs'].copy(), self._buffers['task mask'].copy(),
+                                 self._buffers['auction obs'].copy(), self._buffers['server mask'].copy(),
+                                 self._buffers['auction'].copy(), self._buffers['time step'].copy())
+
+    def reset(self) -> VectorObservation:
+        """
+        Resets every environment
+
+        Returns: The observation of every environment
+
+        """
+        self._send('reset')
+        return self._observation()
+
+    def step(self, auction_prices: np.ndarray,
+             resource_weights: np.ndarray) -> Tuple[VectorObservation, VectorRewards, np.ndarray]:
+        """
+        Steps every environment, environments at an auction step use the auction prices while the other environments
+            use the resource weights
+
+        Args:
+            auction_prices: The price of each server for the auction task, shape (envs, servers)
+            resource_weights: The weighting of each server's tasks, shape (envs, servers, tasks)
+
+        Returns: A tuple of the observation, rewards and if each environment was done
+
+        """
+        self._buffers['auction prices'][...] = auction_prices
+        self._buffers['resource weights'][...] = resource_weights
+        self._send('step')
+
+        rewards = VectorRewards(self._buffers['auction rewards'].copy(), self._buffers['finished tasks'].copy())
+        return self._observation(), rewards, self._buffers['done'].copy()
+
+    def close(self):
+        """
+        Stops the worker processes and releases the shared memory
+        """
+        if self.closed:
+            return
+        for connection in self._connections:
+            connection.send('close')
+        for process in self._processes:
+            process.join()
+        self._buffers = {}
+        for shared_memory in self._memory.values():
+            shared_memory.close()
+            shared_memory.unlink()
+        self.closed = True
+
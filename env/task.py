@@ -2,15 +2,19 @@
 
 from __future__ import annotations
 
+from itertools import count
 from typing import NamedTuple
 
 from env.server import round_float
 from env.task_stage import TaskStage
 
+# The integer ids of the tasks, assigned when the task is created
+_task_ids = count()
 
-class Task(NamedTuple):
+
+class _TaskAttributes(NamedTuple):
     """
-    Task class that has a named, price, required resources, auction and deadline time step and the progress of resources
+    The task attributes, the task id is the last attribute so that tasks can be created without an id
     """
 
     name: str
@@ -29,6 +33,24 @@ class Task(NamedTuple):
 
     price: float = -1
 
+    uid: int = -1
+
+
+class Task(_TaskAttributes):
+    """
+    Task class that has a named, price, required resources, auction and deadline time step and the progress of resources
+
+    Each task is assigned an integer id when created that is kept by the updated tasks (through _replace), tasks are
+        hashed and compared by the id so the hash doesn't change as the task stage and progress changes
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, *args, **kwargs):
+        if len(args) < len(cls._fields) and 'uid' not in kwargs:
+            kwargs['uid'] = next(_task_ids)
+        return super().__new__(cls, *args, **kwargs)
+
     def assign_server(self, price: float, time_step: int) -> Task:
         """
         The process of assigning the task to the server
@@ -177,5 +199,17 @@ class Task(NamedTuple):
                    f'Auction time: {self.auction_time}, Deadline: {self.deadline}'
 
     def __eq__(self, o: object) -> bool:
-        # noinspection PyUnresolvedReferences
-        return type(o) is Task and o.name == self.name
+        if type(o) is Task:
+            # noinspection PyUnresolvedReferences
+            return o.uid == self.uid
+        elif isinstance(o, tuple):
+            return False
+        # Other task types (the task table views, see env/task_table.py) compare themselves with tasks by task id
+        return NotImplemented
+
+    def __ne__(self, o: object) -> bool:
+        equal = self.__eq__(o)
+        return equal if equal is NotImplemented else not equal
+
+    def __hash__(self) -> int:
+        return self.uid
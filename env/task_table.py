@@ -0,0 +1,361 @@
+"""
+Mutable array-backed table of the allocated tasks, the task attributes are stored in preallocated columns with a row
+    for each task so that resource allocation updates the columns in place rather than creating new tasks
+"""
+
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from env.fixed_point import SCALE, to_fixed
+from env.task import Task
+from env.task_stage import TaskStage
+
+if TYPE_CHECKING:
+    from typing import Dict, List, Optional, Sequence, Tuple
+
+# The task stages of the stage column codes
+_STAGES: Dict[int, TaskStage] = {stage.value: stage for stage in TaskStage}
+# The names of the table columns
+_COLUMNS: Tuple[str, ...] = ('uid', 'required_storage', 'required_computation', 'required_results_data',
+                             'auction_time', 'deadline', 'stage', 'loading_progress', 'compute_progress',
+                             'sending_progress', 'price')
+
+
+class TaskTable:
+    """
+    Table of tasks with a column for each task attribute, the row of a task is found with the task id. Each task has a
+        single row that is updated in place, the rows of finished tasks are reused by the tasks added later so the
+        number of rows is the maximum number of allocated tasks.
+
+    The views of the table belong to a generation, when resource allocation updates the rows the values of the
+        current generation's rows are first copied (see next_generation) so the views of the previous states keep
+        their values.
+    """
+
+    def __init__(self, capacity: int = 64, fixed_point: bool = False):
+        """
+        Constructor of the task table
+
+        Args:
+            capacity: The initial number of rows of the columns, the columns double in size when full
+            fixed_point: If the resource columns (required resources and progress) are fixed-point values
+                (see env/fixed_point.py)
+        """
+        assert 0 < capacity
+
+        self.fixed_point = fixed_point
+        resource_dtype = np.int64 if fixed_point else np.float64
+
+        # The task name of each row (the number of rows used) with the rows of the finished tasks to reuse
+        self.names: List[str] = []
+        self._rows: Dict[int, int] = {}
+        self._free_rows: List[int] = []
+        self.generation = TaskGeneration(self)
+
+        self.uid = np.zeros(capacity, dtype=np.int64)
+        self.required_storage = np.zeros(capacity, dtype=resource_dtype)
+        self.required_computation = np.zeros(capacity, dtype=resource_dtype)
+        self.required_results_data = np.zeros(capacity, dtype=resource_dtype)
+        self.auction_time = np.zeros(capacity, dtype=np.int64)
+        self.deadline = np.zeros(capacity, dtype=np.int64)
+        self.stage = np.zeros(capacity, dtype=np.int8)
+        self.loading_progress = np.zeros(capacity, dtype=resource_dtype)
+        self.compute_progress = np.zeros(capacity, dtype=resource_dtype)
+        self.sending_progress = np.zeros(capacity, dtype=resource_dtype)
+        self.price = np.zeros(capacity, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, uid: int) -> bool:
+        return uid in self._rows
+
+    def _grow(self):
+        """
+        Doubles the number of rows of every column
+        """
+        for column in _COLUMNS:
+            array = getattr(self, column)
+            setattr(self, column, np.concatenate((array, np.zeros_like(array))))
+
+    def copy(self) -> TaskTable:
+        """
+        Copies the task table, the columns are copied so the copy is updated independently of this table
+
+        Returns: The copy of the task table
+
+        """
+        table = TaskTable(1, self.fixed_point)
+        table.names, table._rows, table._free_rows = list(self.names), dict(self._rows), list(self._free_rows)
+        for column in _COLUMNS:
+            setattr(table, column, getattr(self, column).copy())
+        return table
+
+    def resource(self, column: np.ndarray, row: int) -> float:
+        """
+        The resource value of a resource column row
+
+        Args:
+            column: The resource column
+            row: The task row
+
+        Returns: The resource value (converted from the fixed-point value if using fixed-point values)
+
+        """
+        return int(column[row]) / SCALE if self.fixed_point else float(column[row])
+
+    def add(self, task: Task) -> TaskView:
+        """
+        Adds a task to the table
+
+        Args:
+            task: The task to add, the task id must not already be in the table
+
+        Returns: The view of the task row
+
+        """
+        assert task.uid not in self._rows, f'{task.name} is already in the task table'
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self.names[row] = task.name
+        else:
+            row = len(self.names)
+            if row == len(self.uid):
+                self._grow()
+            self.names.append(task.name)
+
+        self._rows[task.uid] = row
+        self.uid[row] = task.uid
+        self.auction_time[row] = task.auction_time
+        self.deadline[row] = task.deadline
+        self.stage[row] = task.stage.value
+        self.price[row] = task.price
+
+        resources = (task.required_storage, task.required_computation, task.required_results_data,
+                     task.loading_progress, task.compute_progress, task.sending_progress)
+        (self.required_storage[row], self.required_computation[row], self.required_results_data[row],
+         self.loading_progress[row], self.compute_progress[row], self.sending_progress[row]) = \
+            to_fixed(resources) if self.fixed_point else resources
+        return TaskView(self.generation, row, task.uid)
+
+    def remove(self, rows: Sequence[int]):
+        """
+        Removes the tasks of the rows (the finished tasks), the rows are reused by the tasks added later
+
+        Args:
+            rows: The rows of the tasks to remove, the views of the rows must be of a previous generation
+        """
+        for row in rows:
+            del self._rows[int(self.uid[row])]
+        self._free_rows.extend(rows)
+
+    def next_generation(self, rows: np.ndarray) -> TaskGeneration:
+        """
+        Starts a new generation of views before the rows are updated, the values of the current generation's rows
+            are copied so that the current generation's views keep their values
+
+        Args:
+            rows: The rows of the current generation's views
+
+        Returns: The new generation
+
+        """
+        self.generation.freeze(rows)
+        self.generation = TaskGeneration(self)
+        return self.generation
+
+    def row(self, uid: int) -> int:
+        """
+        Args:
+            uid: The task id
+
+        Returns: The row of the task
+
+        """
+        return self._rows[uid]
+
+    def view(self, uid: int) -> TaskView:
+        """
+        Args:
+            uid: The task id
+
+        Returns: The view of the task row
+
+        """
+        return TaskView(self.generation, self._rows[uid], uid)
+
+    def task(self, row: int) -> Task:
+        """
+        Creates an immutable task of the current values of a row
+
+        Args:
+            row: The task row
+
+        Returns: The task
+
+        """
+        return Task(name=self.names[row], required_storage=self.resource(self.required_storage, row),
+                    required_computation=self.resource(self.required_computation, row),
+                    required_results_data=self.resource(self.required_results_data, row),
+                    auction_time=int(self.auction_time[row]), deadline=int(self.deadline[row]),
+                    stage=_STAGES[int(self.stage[row])], loading_progress=self.resource(self.loading_progress, row),
+                    compute_progress=self.resource(self.compute_progress, row),
+                    sending_progress=self.resource(self.sending_progress, row), price=float(self.price[row]),
+                    uid=int(self.uid[row]))
+
+
+class TaskGeneration:
+    """
+    A generation of the task views, the views of the current generation read the table rows while the views of a
+        previous generation read the copy of their rows made when the generation was frozen
+    """
+
+    __slots__ = ('table', 'rows', 'names')
+
+    def __init__(self, table: TaskTable):
+        """
+        Constructor of the task generation
+
+        Args:
+            table: The task table
+        """
+        self.table: TaskTable = table
+        # The sorted rows of the generation with the frozen table (None while the generation is current)
+        self.rows: Optional[np.ndarray] = None
+        self.names: List[str] = []
+
+    def freeze(self, rows: np.ndarray):
+        """
+        Copies the values of the rows so that the generation's views no longer read the table rows
+
+        Args:
+            rows: The rows of the generation's views
+        """
+        table = TaskTable(1, self.table.fixed_point)
+        self.rows = np.sort(rows)
+        self.names = [self.table.names[row] for row in self.rows.tolist()]
+        for column in _COLUMNS:
+            setattr(table, column, getattr(self.table, column)[self.rows])
+        self.table = table
+
+    def position(self, row: int) -> int:
+        """
+        Args:
+            row: The table row
+
+        Returns: The position of the row in the columns of the generation
+
+        """
+        return row if self.rows is None else int(np.searchsorted(self.rows, row))
+
+
+class TaskView:
+    """
+    Read-only view of a task table row with the same attributes as a Task, the values of a view don't change as the
+        views of a generation are frozen before resource allocation updates the rows (see TaskTable). Views are hashed
+        and compared by the task id.
+    """
+
+    __slots__ = ('_generation', 'row', 'uid')
+
+    def __init__(self, generation: TaskGeneration, row: int, uid: int):
+        """
+        Constructor of the task view
+
+        Args:
+            generation: The generation of the view
+            row: The task row
+            uid: The task id of the row, the task id is used to hash the views so isn't read from the table
+        """
+        self._generation = generation
+        self.row = row
+        self.uid = uid
+
+    def _resource(self, column: str) -> float:
+        table = self._generation.table
+        return table.resource(getattr(table, column), self._generation.position(self.row))
+
+    def _value(self, column: str):
+        return getattr(self._generation.table, column)[self._generation.position(self.row)]
+
+    @property
+    def name(self) -> str:
+        generation = self._generation
+        return (generation.table.names if generation.rows is None else generation.names)[generation.position(self.row)]
+
+    @property
+    def required_storage(self) -> float:
+        return self._resource('required_storage')
+
+    @property
+    def required_computation(self) -> float:
+        return self._resource('required_computation')
+
+    @property
+    def required_results_data(self) -> float:
+        return self._resource('required_results_data')
+
+    @property
+    def auction_time(self) -> int:
+        return int(self._value('auction_time'))
+
+    @property
+    def deadline(self) -> int:
+        return int(self._value('deadline'))
+
+    @property
+    def stage(self) -> TaskStage:
+        return _STAGES[int(self._value('stage'))]
+
+    @property
+    def loading_progress(self) -> float:
+        return self._resource('loading_progress')
+
+    @property
+    def compute_progress(self) -> float:
+        return self._resource('compute_progress')
+
+    @property
+    def sending_progress(self) -> float:
+        return self._resource('sending_progress')
+
+    @property
+    def price(self) -> float:
+        return float(self._value('price'))
+
+    def to_task(self) -> Task:
+        """
+        Returns: An immutable task of the values of the view
+
+        """
+        if self._generation.rows is None:
+            return self._generation.table.task(self.row)
+        return Task(name=self.name, required_storage=self.required_storage,
+                    required_computation=self.required_computation, required_results_data=self.required_results_data,
+                    auction_time=self.auction_time, deadline=self.deadline, stage=self.stage,
+                    loading_progress=self.loading_progress, compute_progress=self.compute_progress,
+                    sending_progress=self.sending_progress, price=self.price, uid=self.uid)
+
+    def assert_valid(self):
+        """
+        Assert if the task is valid
+        """
+        self.to_task().assert_valid()
+
+    def __str__(self) -> str:
+        return str(self.to_task())
+
+    def __repr__(self) -> str:
+        return f'TaskView({self.to_task()!r})'
+
+    def __eq__(self, o: object) -> bool:
+        return (type(o) is TaskView or type(o) is Task) and o.uid == self.uid
+
+    def __ne__(self, o: object) -> bool:
+        return not self.__eq__(o)
+
+    def __hash__(self) -> int:
+        return self.uid
@@ -0,0 +1,49 @@
+"""
+Validation level of the invariant checks for the environment, servers and agents
+"""
+
+from enum import Enum, auto
+
+
+class ValidationLevel(Enum):
+    """
+    An enum to encode how often the invariant checks are run
+    """
+
+    OFF = auto()  # The invariant checks are never run
+    SAMPLED = auto()  # The invariant checks are run every k checks
+    FULL = auto()  # The invariant checks are always run
+
+
+class Validator:
+    """
+    Decides if the invariant checks are run, the checks are assert statements so are never run when python is run
+        with -O whatever the validation level
+    """
+
+    def __init__(self, level: ValidationLevel = ValidationLevel.FULL, frequency: int = 100):
+        """
+        Constructor of the validator
+
+        Args:
+            level: The validation level
+            frequency: The number of checks between each validation for the sampled validation level
+        """
+        assert 0 < frequency
+
+        self.level = level
+        self.frequency = frequency
+        self.total_checks: int = 0
+
+    def check(self) -> bool:
+        """
+        Returns: If the invariant checks should be run at this check
+
+        """
+        self.total_checks += 1
+        if self.level is ValidationLevel.FULL:
+            return True
+        elif self.level is ValidationLevel.SAMPLED:
+            return self.total_checks % self.frequency == 0
+        else:
+            return False
@@ -0,0 +1,160 @@
+"""
+Columnar binary workload trace of task arrivals, the task attributes of a trace are stored as separate memory mapped
+    columns ordered by auction time so that the tasks are read in chunks as an environment task source
+    (see OnlineFlexibleResourceAllocationEnv task_source) without loading the trace into memory
+
+The file is the magic bytes, the length of the json header, the json header then the aligned columns. The task names
+    are stored as a column of utf-8 bytes with a column of the offsets of each name.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from typing import TYPE_CHECKING
+
+import numpy as np
+
+from env.task import Task
+
+if TYPE_CHECKING:
+    from typing import Dict, Iterator, Sequence
+
+# The bytes at the start of every workload trace file
+WORKLOAD_TRACE_MAGIC: bytes = b'OFRA-WLT'
+# The struct format of the json header length
+_HEADER_LENGTH = struct.Struct('<I')
+# The alignment of the columns within the file
+_ALIGNMENT: int = 64
+
+# The columns with the column dtype, the name offsets has a row for each task plus one and the name data a row for
+#   each byte of the task names
+_COLUMNS: Dict[str, str] = {
+    'name_offsets': '<i8', 'name_data': '<u1', 'required_storage': '<f8', 'required_computation': '<f8',
+    'required_results_data': '<f8', 'auction_time': '<i8', 'deadline': '<i8'
+}
+
+
+def _align(offset: int) -> int:
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def save_workload_trace(filename: str, names: Sequence[str], required_storage: Sequence[float],
+                        required_computation: Sequence[float], required_results_data: Sequence[float],
+                        auction_time: Sequence[int], deadline: Sequence[int]):
+    """
+    Saves the task arrivals to a workload trace file, the tasks are sorted by auction time (keeping the order of
+        tasks with the same auction time)
+
+    Args:
+        filename: The filename to save the workload trace to
+        names: The task names
+        required_storage: The required storage of each task
+        required_computation: The required computation of each task
+        required_results_data: The required results data of each task
+        auction_time: The auction (arrival) time of each task
+        deadline: The deadline of each task
+    """
+    columns = {
+        'required_storage': np.asarray(required_storage, dtype=_COLUMNS['required_storage']),
+        'required_computation': np.asarray(required_computation, dtype=_COLUMNS['required_computation']),
+        'required_results_data': np.asarray(required_results_data, dtype=_COLUMNS['required_results_data']),
+        'auction_time': np.asarray(auction_time, dtype=_COLUMNS['auction_time']),
+        'deadline': np.asarray(deadline, dtype=_COLUMNS['deadline'])
+    }
+    assert all(len(column) == len(names) for column in columns.values())
+
+    order = np.argsort(columns['auction_time'], kind='stable')
+    columns = {column: array[order] for column, array in columns.items()}
+    encoded_names = [names[pos].encode() for pos in order.tolist()]
+    columns['name_offsets'] = np.concatenate(([0], np.cumsum([len(name) for name in encoded_names],
+                                                             dtype=np.int64))).astype(_COLUMNS['name_offsets'])
+    columns['name_data'] = np.frombuffer(b''.join(encoded_names), dtype=_COLUMNS['name_data'])
+
+    header_data = json.dumps({'num tasks': len(names), 'name data size': len(columns['name_data'])}).encode()
+    with open(filename, 'wb') as file:
+        file.write(WORKLOAD_TRACE_MAGIC)
+        file.write(_HEADER_LENGTH.pack(len(header_data)))
+        file.write(header_data)
+        for column in _COLUMNS.keys():
+            file.seek(_align(file.tell()))
+            file.write(columns[column].tobytes())
+
+
+class WorkloadTrace:
+    """
+    A memory mapped workload trace, the columns are memory mapped when the trace is loaded so only the pages of the
+        tasks that are read are loaded into memory
+    """
+
+    def __init__(self, filename: str):
+        """
+        Constructor of the workload trace that reads the header and memory maps the columns of the trace file
+
+        Args:
+            filename: The workload trace filename
+        """
+        self.filename = filename
+
+        with open(filename, 'rb') as file:
+            assert file.read(len(WORKLOAD_TRACE_MAGIC)) == WORKLOAD_TRACE_MAGIC, \
+                f'{filename} is not a workload trace'
+            header_length, = _HEADER_LENGTH.unpack(file.read(_HEADER_LENGTH.size))
+            self.header: Dict = json.loads(file.read(header_length))
+        self.num_tasks: int = self.header['num tasks']
+
+        offset = len(WORKLOAD_TRACE_MAGIC) + _HEADER_LENGTH.size + header_length
+        for column, dtype in _COLUMNS.items():
+            if column == 'name_offsets':
+                count = self.num_tasks + 1
+            elif column == 'name_data':
+                count = self.header['name data size']
+            else:
+                count = self.num_tasks
+
+            offset = _align(offset)
+            if count == 0:
+                setattr(self, column, np.empty(0, dtype=dtype))
+            else:
+                setattr(self, column, np.memmap(filename, dtype=dtype, mode='r', offset=offset, shape=(count,)))
+            offset += np.dtype(dtype).itemsize * count
+
+    def __len__(self) -> int:
+        return self.num_tasks
+
+    def tasks(self, start_time: int = 0, chunk_size: int = 4096) -> Iterator[Task]:
+        """
+        Reads the tasks of the trace in arrival order, the columns are read a chunk of tasks at a time
+
+        Args:
+            start_time: The time step of the first task to read (tasks with an earlier auction time are skipped)
+            chunk_size: The number of tasks read at a time
+
+        Returns: Iterator of the tasks from the start time
+
+        """
+        assert 0 < chunk_size
+        start = int(np.searchsorted(self.auction_time, start_time, side='left'))
+        for chunk_start in range(start, self.num_tasks, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, self.num_tasks)
+
+            name_offsets = self.name_offsets[chunk_start:chunk_end + 1].tolist()
+            name_data = self.name_data[name_offsets[0]:name_offsets[-1]].tobytes()
+            names = [name_data[start_offset - name_offsets[0]:end_offset - name_offsets[0]].decode()
+                     for start_offset, end_offset in zip(name_offsets, name_offsets[1:])]
+
+            yield from (Task(name, required_storage, required_computation, required_results_data, auction_time,
+                             deadline)
+                        for name, required_storage, required_computation, required_results_data, auction_time,
+                        deadline in zip(names, self.required_storage[chunk_start:chunk_end].tolist(),
+                                        self.required_computation[chunk_start:chunk_end].tolist(),
+                                        self.required_results_data[chunk_start:chunk_end].tolist(),
+                                        self.auction_time[chunk_start:chunk_end].tolist(),
+                                        self.deadline[chunk_start:chunk_end].tolist()))
+
+    def total_time_steps(self) -> int:
+        """
+        Returns: The last deadline of the trace tasks, so that every task can be completed (0 for an empty trace)
+
+        """
+        return int(self.deadline.max()) if self.num_tasks else 0
@@ -6,11 +6,12 @@ Abstract resource weighting with the abstract method _get_action function to cho
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import List, Dict
+from typing import List, Dict, Optional
 
 from env.server import Server
 from env.task import Task
 from env.task_stage import TaskStage
+from env.validation import Validator
 
 
 class ResourceWeightingAgent(ABC):
@@ -18,9 +19,14 @@ class ResourceWeightingAgent(ABC):
     Resource Weighting agent used in Online Flexible Resource Allocation Env in order to weight tasks
     """
 
-    def __init__(self, name):
+    def __init__(self, name, validator: Optional[Validator] = None):
         self.name = name
 
+        # The validator of the weighting checks, the agent has its own validator with the validation level and
+        #   frequency of the validator given (the environment's validator) so the checks of the agent don't count
+        #   towards the checks of the environment's sampled validation
+        self.validator = Validator() if validator is None else Validator(validator.level, validator.frequency)
+
     def weight(self, allocated_tasks: List[Task], server: Server, time_step: int,
                training: bool = False) -> Dict[Task, float]:
         """
@@ -35,24 +41,77 @@ class ResourceWeightingAgent(ABC):
         Returns: A dictionary of tasks to weights
 
         """
-        assert all(task.stage is TaskStage.LOADING or task.stage is TaskStage.COMPUTING or
-                   task.stage is TaskStage.SENDING for task in allocated_tasks), \
-            ', '.join([f'{task.name}: {task.stage}' for task in allocated_tasks])
-        assert all(task.auction_time <= time_step <= task.deadline for task in allocated_tasks), \
-            str(time_step) + ''.join([f'\n{task.name} {task.auction_time} {task.deadline}' for task in allocated_tasks])
-
+        validate = self._check_tasks(allocated_tasks, time_step)
         if len(allocated_tasks) <= 1:
             return {task: 1.0 for task in allocated_tasks}
         else:
             actions = self._get_actions(allocated_tasks, server, time_step, training)
-            assert len(allocated_tasks) == len(actions)
-            assert all(task in allocated_tasks for task in actions.keys())
-            assert all(0 <= action for action in actions.values())
-            assert all(type(action) is float for action in actions.values()), \
-                ', '.join([str(type(action)) for action in actions.values()])
+            if validate:
+                self._check_actions(allocated_tasks, actions)
+
+            return actions
+
+    async def aweight(self, allocated_tasks: List[Task], server: Server, time_step: int,
+                      training: bool = False) -> Dict[Task, float]:
+        """
+        Asynchronous version of weight, so that the weights of every server can be gathered at the same time by
+            agents whose actions are slow or remote (see _aget_actions)
+
+        Args:
+            allocated_tasks: List of the allocated tasks on the server
+            server: The server that the allocated tasks are running on
+            time_step: The time step of the environment
+            training: If to use training actions
+
+        Returns: A dictionary of tasks to weights
+
+        """
+        validate = self._check_tasks(allocated_tasks, time_step)
+        if len(allocated_tasks) <= 1:
+            return {task: 1.0 for task in allocated_tasks}
+        else:
+            actions = await self._aget_actions(allocated_tasks, server, time_step, training)
+            if validate:
+                self._check_actions(allocated_tasks, actions)
 
             return actions
 
+    def _check_tasks(self, allocated_tasks: List[Task], time_step: int) -> bool:
+        """
+        Checks that the allocated tasks are valid (if the validator checks this weighting)
+
+        Args:
+            allocated_tasks: List of the allocated tasks on the server
+            time_step: The time step of the environment
+
+        Returns: If the weighting is validated
+
+        """
+        validate = self.validator.check()
+        if validate:
+            assert all(task.stage is TaskStage.LOADING or task.stage is TaskStage.COMPUTING or
+                       task.stage is TaskStage.SENDING for task in allocated_tasks), \
+                ', '.join([f'{task.name}: {task.stage}' for task in allocated_tasks])
+            assert all(task.auction_time <= time_step <= task.deadline for task in allocated_tasks), \
+                str(time_step) + ''.join([f'\n{task.name} {task.auction_time} {task.deadline}'
+                                          for task in allocated_tasks])
+        return validate
+
+    @staticmethod
+    def _check_actions(allocated_tasks: List[Task], actions: Dict[Task, float]):
+        """
+        Checks that the weighting actions are valid
+
+        Args:
+            allocated_tasks: List of the allocated tasks on the server
+            actions: The weight of each task
+        """
+        assert len(allocated_tasks) == len(actions)
+        assert all(task in allocated_tasks for task in actions.keys())
+        assert all(0 <= action for action in actions.values())
+        assert all(type(action) is float for action in actions.values()), \
+            ', '.join([str(type(action)) for action in actions.values()])
+
     @abstractmethod
     def _get_actions(self, tasks: List[Task], server: Server, time_step: int,
                      training: bool = False) -> Dict[Task, float]:
@@ -69,3 +128,19 @@ class ResourceWeightingAgent(ABC):
         Returns: A dictionary of tasks to weights
         """
         pass
+
+    async def _aget_actions(self, tasks: List[Task], server: Server, time_step: int,
+                            training: bool = False) -> Dict[Task, float]:
+        """
+        The asynchronous task weights, by default the same as _get_actions. Agents whose policy is remote (or slow)
+            should override this to await the policy so that the other servers' weights are found in the meantime
+
+        Args:
+            tasks: All of the allocated tasks to the server
+            server: The server running the tasks
+            time_step: The time step of the environment
+            training: If to use training actions
+
+        Returns: A dictionary of tasks to weights
+        """
+        return self._get_actions(tasks, server, time_step, training)
@@ -7,6 +7,7 @@ import tensorflow as tf
 from env.server import Server
 from env.task import Task
 from env.task_stage import TaskStage
+from env.validation import Validator
 from resource_weighting_agent import ResourceWeightingAgent
 from task_pricing_agent import TaskPricingAgent
 
@@ -251,7 +252,7 @@ class ResourceWeightingRLAgent(ResourceWeightingAgent, ReinforcementLearningAgen
     network_obs_width: int = 16
 
     def __init__(self, name: str, other_task_discount: float = 0.4, success_reward: float = 1,
-                 failed_reward: float = -1.5, **kwargs):
+                 failed_reward: float = -1.5, validator: Optional[Validator] = None, **kwargs):
         """
         Constructor of the resource weighting reinforcement learning agent
 
@@ -260,9 +261,11 @@ class ResourceWeightingRLAgent(ResourceWeightingAgent, ReinforcementLearningAgen
             other_task_discount: The discount for when other tasks are completed
             success_reward: The reward for when tasks have completed successful
             failed_reward: The reward for when tasks have failed
+            validator: The validator with the validation level and frequency of the weighting checks (such as the
+                environment's validator)
             **kwargs: Additional arguments for the reinforcement learning agent base class
         """
-        ResourceWeightingAgent.__init__(self, name)
+        ResourceWeightingAgent.__init__(self, name, validator)
         ReinforcementLearningAgent.__init__(self, **kwargs)
 
         # Agent reward variables
@@ -4,8 +4,9 @@ Abstract task pricing agent with the abstract method _get_action function to cho
 
 from __future__ import annotations
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import List, Optional, Sequence
 
 from env.server import Server
 from env.task import Task
@@ -37,16 +38,8 @@ class TaskPricingAgent(ABC):
         Returns: The bid value for the task
 
         """
-        # Assert that the task input variables are valid
-        assert auction_task.stage is TaskStage.UNASSIGNED
-        assert auction_task.auction_time == time_step
-        assert all(allocated_task.stage is not TaskStage.UNASSIGNED or allocated_task.stage is not TaskStage.FAILED or
-                   allocated_task.stage is not TaskStage.COMPLETED for allocated_task in allocated_tasks)
-        assert all(allocated_task.auction_time <= time_step <= allocated_task.deadline
-                   for allocated_task in allocated_tasks)
-
         # Check that if the tasks should be limited
-        if self.limit_parallel_tasks is None or len(allocated_tasks) < self.limit_parallel_tasks:
+        if self._can_bid(auction_task, allocated_tasks, time_step):
             # Get the auction action
             action = float(self._get_action(auction_task, allocated_tasks, server, time_step, training))
             # Assert that the resulting action is valid
@@ -56,6 +49,87 @@ class TaskPricingAgent(ABC):
         else:
             return 0.0
 
+    async def abid(self, auction_task: Task, allocated_tasks: List[Task], server: Server, time_step: int,
+                   training: bool = False) -> float:
+        """
+        Asynchronous version of bid, so that the bids of every server can be gathered at the same time by agents
+            whose actions are slow or remote (see _aget_action)
+
+        Args:
+            auction_task: The task being auctioned
+            allocated_tasks: The already allocated tasks to the server
+            server: The server bidding on the task
+            time_step: The time step of the environment
+            training: If to use training actions
+
+        Returns: The bid value for the task
+
+        """
+        if self._can_bid(auction_task, allocated_tasks, time_step):
+            action = float(await self._aget_action(auction_task, allocated_tasks, server, time_step, training))
+            assert 0 <= action
+
+            return action
+        else:
+            return 0.0
+
+    def _can_bid(self, auction_task: Task, allocated_tasks: List[Task], time_step: int) -> bool:
+        """
+        Checks that the bid arguments are valid and if the server can bid with the limit of parallel tasks
+
+        Args:
+            auction_task: The task being auctioned
+            allocated_tasks: The already allocated tasks to the server
+            time_step: The time step of the environment
+
+        Returns: If the server can bid on the task
+
+        """
+        # Assert that the task input variables are valid
+        assert auction_task.stage is TaskStage.UNASSIGNED
+        assert auction_task.auction_time == time_step
+        assert all(allocated_task.stage is not TaskStage.UNASSIGNED or allocated_task.stage is not TaskStage.FAILED or
+                   allocated_task.stage is not TaskStage.COMPLETED for allocated_task in allocated_tasks)
+        assert all(allocated_task.auction_time <= time_step <= allocated_task.deadline
+                   for allocated_task in allocated_tasks)
+
+        return self.limit_parallel_tasks is None or len(allocated_tasks) < self.limit_parallel_tasks
+
+    def bids(self, auction_tasks: Sequence[Task], allocated_tasks: List[Task], server: Server, time_step: int,
+             training: bool = False) -> List[float]:
+        """
+        Auctions of every task being auctioned at the time step for a server (with batched auctions)
+
+        Args:
+            auction_tasks: The tasks being auctioned
+            allocated_tasks: The already allocated tasks to the server
+            server: The server bidding on the tasks
+            time_step: The time step of the environment
+            training: If to use training actions
+
+        Returns: The bid value for each task
+
+        """
+        return [self.bid(auction_task, allocated_tasks, server, time_step, training) for auction_task in auction_tasks]
+
+    async def abids(self, auction_tasks: Sequence[Task], allocated_tasks: List[Task], server: Server, time_step: int,
+                    training: bool = False) -> List[float]:
+        """
+        Asynchronous version of bids, the bids of every task are gathered at the same time
+
+        Args:
+            auction_tasks: The tasks being auctioned
+            allocated_tasks: The already allocated tasks to the server
+            server: The server bidding on the tasks
+            time_step: The time step of the environment
+            training: If to use training actions
+
+        Returns: The bid value for each task
+
+        """
+        return list(await asyncio.gather(*(self.abid(auction_task, allocated_tasks, server, time_step, training)
+                                            for auction_task in auction_tasks)))
+
     @abstractmethod
     def _get_action(self, auction_task: Task, allocated_tasks: List[Task], server: Server, time_step: int,
                     training: bool = False):
@@ -74,3 +148,21 @@ class TaskPricingAgent(ABC):
 
         """
         pass
+
+    async def _aget_action(self, auction_task: Task, allocated_tasks: List[Task], server: Server, time_step: int,
+                           training: bool = False):
+        """
+        The asynchronous bid price, by default the same as _get_action. Agents whose policy is remote (or slow) should
+            override this to await the policy so that the other servers' bids are found in the meantime
+
+        Args:
+            auction_task: The task being auctioned
+            allocated_tasks: The already allocated tasks to the server
+            server: The server bidding on the task
+            time_step: The time step of the environment
+            training: If to use training actions
+
+        Returns: The bid value for the task
+
+        """
+        return self._get_action(auction_task, allocated_tasks, server, time_step, training)
@@ -0,0 +1,63 @@
+"""
+Shared fixtures of the tests
+"""
+
+from __future__ import annotations
+
+import json
+import random as rnd
+from typing import TYPE_CHECKING
+
+import pytest
+
+if TYPE_CHECKING:
+    from typing import Callable
+
+
+@pytest.fixture
+def env_settings(tmp_path) -> Callable[..., str]:
+    """
+    Writes an environment setting file (see settings/format.env) with a single server and task setting
+
+    Returns: Function of the number of servers, tasks and time steps to the setting filename
+
+    """
+    def write_setting(num_servers: int = 5, num_tasks: int = 60, total_time_steps: int = 50) -> str:
+        setting = {
+            'name': 'test', 'min total time steps': total_time_steps, 'max total time steps': total_time_steps,
+            'min total servers': num_servers, 'max total servers': num_servers,
+            'server settings': [{
+                'name': 'Basic', 'min storage capacity': 300, 'max storage capacity': 600,
+                'min computational capacity': 30, 'max computational capacity': 60,
+                'min bandwidth capacity': 20, 'max bandwidth capacity': 40
+            }],
+            'min total tasks': num_tasks, 'max total tasks': num_tasks,
+            'task settings': [{
+                'name': 'Basic', 'min deadline': 4, 'max deadline': 12, 'min required storage': 50,
+                'max required storage': 100, 'min required computation': 50, 'max required computation': 150,
+                'min required results data': 20, 'max required results data': 50
+            }]
+        }
+        filename = str(tmp_path / f'test_{num_servers}_{num_tasks}_{total_time_steps}.env')
+        with open(filename, 'w') as file:
+            json.dump(setting, file)
+        return filename
+
+    return write_setting
+
+
+def random_actions(state, rng: rnd.Random):
+    """
+    Random auction prices or resource weights of an environment state
+
+    Args:
+        state: The environment state
+        rng: The random number generator of the actions
+
+    Returns: The auction prices of each server if a task is being auctioned otherwise the resource weights of each
+        server's tasks
+
+    """
+    if state.auction_task is not None:
+        return {server: float(rng.randint(1, 10)) for server in state.server_tasks.keys()}
+    return {server: {task: float(rng.randint(1, 5)) for task in tasks} for server, tasks in state.server_tasks.items()}
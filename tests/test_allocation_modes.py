@@ -0,0 +1,70 @@
+"""
+Tests of the batched resource allocation (env/batched_allocation.py), the task table (env/task_table.py) and the
+    fixed-point resource values (env/fixed_point.py) against the per-server resource allocation
+"""
+
+from __future__ import annotations
+
+import random as rnd
+from typing import TYPE_CHECKING
+
+import pytest
+
+from conftest import random_actions
+from env.environment import OnlineFlexibleResourceAllocationEnv
+
+if TYPE_CHECKING:
+    from typing import Dict, List, Tuple
+
+
+def _run_episode(setting: str, seed: int, **env_options) -> List[Dict[str, List[Tuple]]]:
+    """
+    Runs an episode with random actions
+
+    Args:
+        setting: The environment setting filename
+        seed: The seed of the environment generation (and auction tie-breaks) and of the actions
+        **env_options: The allocation options of the environment
+
+    Returns: List of each state's server tasks (the task name, stage and progress sorted by the task name) by the
+        server name
+
+    """
+    rnd.seed(seed)
+    rng = rnd.Random(seed)
+    env = OnlineFlexibleResourceAllocationEnv([setting], **env_options)
+    state, done, states = env.reset(), False, []
+    while not done:
+        state, _, done, _ = env.step(random_actions(state, rng))
+        states.append({server.name: sorted((task.name, task.stage, task.loading_progress, task.compute_progress,
+                                            task.sending_progress) for task in tasks)
+                       for server, tasks in state.server_tasks.items()})
+    env.close()
+    return states
+
+
+@pytest.mark.parametrize('env_options', [
+    {'batched_allocation': True},
+    {'task_table': True},
+    {'batched_allocation': True, 'fixed_point': True},
+    {'task_table': True, 'fixed_point': True},
+], ids=['batched', 'task_table', 'batched_fixed_point', 'task_table_fixed_point'])
+@pytest.mark.parametrize('seed', range(10))
+def test_allocation_equivalence(env_settings, env_options: Dict[str, bool], seed: int):
+    """
+    The allocation modes give the same task stages as the per-server allocation with the progress within 0.001
+    """
+    setting = env_settings(num_servers=4, num_tasks=50, total_time_steps=40)
+    reference_states = _run_episode(setting, seed)
+    states = _run_episode(setting, seed, **env_options)
+
+    assert len(states) == len(reference_states)
+    for state, reference_state in zip(states, reference_states):
+        assert state.keys() == reference_state.keys()
+        for server_name, reference_tasks in reference_state.items():
+            tasks = state[server_name]
+            assert [(name, stage) for name, stage, *_ in tasks] == \
+                   [(name, stage) for name, stage, *_ in reference_tasks]
+            for (*_, loading, compute, sending), (*_, ref_loading, ref_compute, ref_sending) in \
+                    zip(tasks, reference_tasks):
+                assert (loading, compute, sending) == pytest.approx((ref_loading, ref_compute, ref_sending), abs=1e-3)
@@ -0,0 +1,109 @@
+"""
+Tests of the episode trace format (env/episode_trace.py)
+"""
+
+import os
+import random as rnd
+
+from conftest import random_actions
+from env.environment import OnlineFlexibleResourceAllocationEnv
+from env.episode_trace import EpisodeTraceRecorder, read_trace
+
+
+def _task(task):
+    return tuple(task)
+
+
+def _state(state):
+    return ({server.name: [_task(task) for task in tasks] for server, tasks in state.server_tasks.items()},
+            None if state.auction_task is None else _task(state.auction_task), state.time_step)
+
+
+def _record_episode(env, recorder, rng):
+    """
+    Runs and records an episode
+
+    Returns: The states, actions and rewards of each step
+
+    """
+    state = env.reset()
+    recorder.start_episode(state.server_tasks.keys())
+    steps, done = [], False
+    while not done:
+        actions = random_actions(state, rng)
+        next_state, rewards, done, _ = env.step(actions)
+        if state.auction_task is not None:
+            recorder.auction(state, actions, rewards)
+            steps.append((_state(state), {server.name: price for server, price in actions.items()},
+                          {server.name: price for server, price in rewards.items()}, _state(next_state)))
+        else:
+            recorder.resource_allocation(state, actions, rewards)
+            steps.append((_state(state),
+                          {server.name: {_task(task): weight for task, weight in weights.items()}
+                           for server, weights in actions.items()},
+                          {server.name: [_task(task) for task in tasks] for server, tasks in rewards.items() if tasks},
+                          _state(next_state)))
+        state = next_state
+    recorder.end_episode(state)
+    return steps
+
+
+def _traced_steps(steps):
+    return [(_state(step.state),
+             {server.name: action if type(action) is float else {_task(task): weight for task, weight in action.items()}
+              for server, action in step.actions.items()},
+             {server.name: reward if type(reward) is float else [_task(task) for task in reward]
+              for server, reward in step.rewards.items() if reward != []}, _state(step.next_state))
+            for step in steps]
+
+
+def test_episode_trace_round_trip(env_settings, tmp_path):
+    """
+    The steps read from the trace are the recorded steps, with non-ascii and multi-line names
+    """
+    rnd.seed(0)
+    rng = rnd.Random(0)
+    env = OnlineFlexibleResourceAllocationEnv([env_settings(num_tasks=40, total_time_steps=30)])
+    filename = str(tmp_path / 'episodes.trc')
+    with EpisodeTraceRecorder(filename) as recorder:
+        episodes = [_record_episode(env, recorder, rng) for _ in range(2)]
+
+        env.reset()
+        env._state = env._state._replace(server_tasks={
+            server._replace(name=f'服务器\n{server_num}'): tasks
+            for server_num, (server, tasks) in enumerate(env._state.server_tasks.items())
+        })
+        env._unallocated_tasks = type(env._unallocated_tasks)(
+            [task._replace(name=f'任务 ✓\n{task.name}') for task in env._unallocated_tasks])
+        env.reset = lambda: env._state
+        episodes.append(_record_episode(env, recorder, rng))
+
+    traced_episodes = list(read_trace(filename))
+    assert len(traced_episodes) == 3
+    for steps, (servers, traced_steps) in zip(episodes, traced_episodes):
+        assert _traced_steps(traced_steps) == steps
+    assert [server.name for server in traced_episodes[2][0]][:2] == ['服务器\n0', '服务器\n1']
+
+
+def test_episode_trace_truncated(env_settings, tmp_path):
+    """
+    Reading a trace with an incomplete final record (a trace being written) stops at the last complete record
+    """
+    rnd.seed(1)
+    rng = rnd.Random(1)
+    env = OnlineFlexibleResourceAllocationEnv([env_settings(num_tasks=20, total_time_steps=20)])
+    filename = str(tmp_path / 'episodes.trc')
+    with EpisodeTraceRecorder(filename) as recorder:
+        _record_episode(env, recorder, rng)
+    first_episode_size = os.path.getsize(filename)
+    with EpisodeTraceRecorder(filename) as recorder:
+        _record_episode(env, recorder, rng)
+
+    with open(filename, 'rb') as file:
+        data = file.read()
+    truncated_filename = str(tmp_path / 'truncated.trc')
+    for size in [0, 3, first_episode_size - 1, first_episode_size, first_episode_size + 5, len(data) - 1] + \
+            list(range(first_episode_size + 1, len(data), 97)):
+        with open(truncated_filename, 'wb') as file:
+            file.write(data[:size])
+        assert len(list(read_trace(truncated_filename))) == (size >= first_episode_size) + (size == len(data))
@@ -0,0 +1,31 @@
+"""
+Tests of the evaluation environment pool (env/eval_pool.py)
+"""
+
+import random as rnd
+
+from env.environment import OnlineFlexibleResourceAllocationEnv
+from env.eval_pool import EvalEnvPool
+from env.validation import ValidationLevel
+
+
+def test_eval_pool_options(env_settings, tmp_path):
+    """
+    The evaluation environments are built with the environment constructor options of the pool
+    """
+    rnd.seed(0)
+    env = OnlineFlexibleResourceAllocationEnv([env_settings()])
+    env.reset()
+    filenames = [str(tmp_path / 'eval.env'), str(tmp_path / 'eval.snp')]
+    env.save_env(filenames[0])
+    env.save_env(filenames[1], binary=True)
+
+    eval_pool = EvalEnvPool(filenames, options={'validation_level': ValidationLevel.OFF, 'skip_idle': True,
+                                                'batched_allocation': True})
+    for eval_env, state in eval_pool:
+        assert eval_env.validator.level is ValidationLevel.OFF
+        assert eval_env.skip_idle and eval_env.batched_allocation
+
+    eval_env, _ = EvalEnvPool(filenames[:1]).env(0)
+    assert eval_env.validator.level is ValidationLevel.FULL
+    assert not eval_env.skip_idle and not eval_env.batched_allocation
@@ -0,0 +1,33 @@
+"""
+Tests of the scenario bank (env/scenario_bank.py)
+"""
+
+from env.scenario_bank import ScenarioBank
+from env.task import Task
+
+
+def _scenario_values(scenario):
+    return (scenario.env_name, [tuple(server)[:-1] for server in scenario.servers],
+            [tuple(task)[:-1] for task in scenario.tasks], scenario.total_time_steps)
+
+
+def test_scenario_bank_producer(env_settings):
+    """
+    The producer process generates the same scenarios as generating them in advance, with the ids of this process
+    """
+    setting = env_settings()
+    bank = ScenarioBank(setting, pool_size=2, seed=3)
+    try:
+        scenarios = [bank.next() for _ in range(4)]
+    finally:
+        bank.close()
+
+    prefilled_bank = ScenarioBank(setting, pool_size=4, background=False, seed=3)
+    prefilled_bank.fill()
+    assert [_scenario_values(scenario) for scenario in scenarios] == \
+        [_scenario_values(prefilled_bank.next()) for _ in range(4)]
+
+    # The task ids of the scenarios are counted by this process so are different from the ids of new tasks
+    task_ids = [task.uid for scenario in scenarios for task in scenario.tasks]
+    assert len(set(task_ids)) == len(task_ids)
+    assert Task('new task', 1, 1, 1, 0, 1).uid > max(task_ids)
@@ -0,0 +1,184 @@
+"""
+Tests of the server resource allocation (env/server.py) against the iterative resource allocation that the server used
+    before the water-filling allocation
+"""
+
+from __future__ import annotations
+
+import random as rnd
+from typing import TYPE_CHECKING
+
+import pytest
+
+from env.server import Server, round_float
+from env.task import Task
+from env.task_stage import TaskStage
+
+if TYPE_CHECKING:
+    from typing import Dict, List, Tuple
+
+
+def _reference_compute_allocation(compute_weights: Dict[Task, float], available_computation: float,
+                                  time_step: int) -> Dict[Task, Tuple[float, float, float]]:
+    """
+    The iterative compute resource allocation, the tasks that can finish computing with their share of the
+        computational resources are allocated till no more tasks can finish then the remaining resources are shared
+    """
+    task_resource_usage: Dict[Task, Tuple[float, float, float]] = {}
+    task_been_updated = True
+    while task_been_updated and compute_weights:
+        compute_unit = round_float(available_computation / sum(compute_weights.values()))
+        task_been_updated = False
+        for task, weight in compute_weights.items():
+            if task.required_computation - task.compute_progress <= weight * compute_unit:
+                compute_resources = round_float(task.required_computation - task.compute_progress)
+                updated_task = task.allocate_compute_resources(compute_resources, time_step)
+                task_resource_usage[updated_task] = (task.required_storage, compute_resources, 0)
+                available_computation = round_float(available_computation - compute_resources)
+                task_been_updated = True
+        compute_weights = {task: weight for task, weight in compute_weights.items()
+                           if task not in task_resource_usage}
+
+    if compute_weights:
+        compute_unit = round_float(available_computation / sum(compute_weights.values()))
+        for task, weight in compute_weights.items():
+            compute_resources = round_float(compute_unit * weight)
+            updated_task = task.allocate_compute_resources(compute_resources, time_step)
+            task_resource_usage[updated_task] = (task.required_storage, compute_resources, 0)
+    return task_resource_usage
+
+
+def _reference_bandwidth_allocation(loading_weights: Dict[Task, float], sending_weights: Dict[Task, float],
+                                    available_storage: float, available_bandwidth: float,
+                                    time_step: int) -> Dict[Task, Tuple[float, float, float]]:
+    """
+    The iterative bandwidth resource allocation, the sending and loading tasks that can finish their stage are
+        allocated till no more tasks can finish, then the loading tasks are allocated their share of the bandwidth,
+        then the sending tasks that can finish and then the remaining bandwidth is shared by the sending tasks
+    """
+    task_resource_usage: Dict[Task, Tuple[float, float, float]] = {}
+    tasks_been_updated: List[Task] = [None]
+    while tasks_been_updated and (loading_weights or sending_weights):
+        bandwidth_unit = round_float(
+            available_bandwidth / (sum(loading_weights.values()) + sum(sending_weights.values())))
+        tasks_been_updated = []
+        for task, weight in sending_weights.items():
+            if task.required_results_data - task.sending_progress <= weight * bandwidth_unit:
+                sending_resources = round_float(task.required_results_data - task.sending_progress)
+                updated_task = task.allocate_sending_resources(sending_resources, time_step)
+                task_resource_usage[updated_task] = (task.required_storage, 0, sending_resources)
+                tasks_been_updated.append(updated_task)
+                available_bandwidth = round_float(available_bandwidth - sending_resources)
+        sending_weights = {task: weight for task, weight in sending_weights.items() if task not in tasks_been_updated}
+
+        for task, weight in loading_weights.items():
+            if task.required_storage - task.loading_progress <= min(weight * bandwidth_unit, available_storage,
+                                                                    available_bandwidth):
+                loading_resources = round_float(task.required_storage - task.loading_progress)
+                updated_task = task.allocate_loading_resources(loading_resources, time_step)
+                task_resource_usage[updated_task] = (task.required_storage, 0, loading_resources)
+                tasks_been_updated.append(updated_task)
+                available_storage = round_float(available_storage - loading_resources)
+                available_bandwidth = round_float(available_bandwidth - loading_resources)
+        loading_weights = {task: weight for task, weight in loading_weights.items() if task not in tasks_been_updated}
+
+    if loading_weights or sending_weights:
+        bandwidth_total_weights = sum(loading_weights.values()) + sum(sending_weights.values())
+        for task, weight in loading_weights.items():
+            loading_resources = round_float(min(available_bandwidth / bandwidth_total_weights * weight,
+                                                available_storage))
+            updated_task = task.allocate_loading_resources(loading_resources, time_step)
+            task_resource_usage[updated_task] = (updated_task.loading_progress, 0, loading_resources)
+            available_storage = round_float(available_storage - loading_resources)
+            available_bandwidth = round_float(available_bandwidth - loading_resources)
+            bandwidth_total_weights -= weight
+
+        tasks_been_updated = [None]
+        while tasks_been_updated and sending_weights:
+            bandwidth_unit = available_bandwidth / bandwidth_total_weights
+            tasks_been_updated = []
+            for task, weight in sending_weights.items():
+                if task.required_results_data - task.sending_progress <= weight * bandwidth_unit:
+                    sending_resources = round_float(task.required_results_data - task.sending_progress)
+                    updated_task = task.allocate_sending_resources(sending_resources, time_step)
+                    task_resource_usage[updated_task] = (task.required_storage, 0, sending_resources)
+                    tasks_been_updated.append(updated_task)
+                    available_bandwidth = round_float(available_bandwidth - sending_resources)
+                    bandwidth_total_weights -= weight
+            sending_weights = {task: weight for task, weight in sending_weights.items()
+                               if task not in tasks_been_updated}
+
+        if sending_weights:
+            bandwidth_unit = round_float(available_bandwidth / bandwidth_total_weights)
+            for task, weight in sending_weights.items():
+                sending_resources = round_float(bandwidth_unit * weight)
+                updated_task = task.allocate_sending_resources(sending_resources, time_step)
+                task_resource_usage[updated_task] = (task.required_storage, 0, sending_resources)
+    return task_resource_usage
+
+
+def _random_task(stage: TaskStage, rng: rnd.Random) -> Task:
+    """
+    A random task at a stage with random progress of the stage
+    """
+    storage, computation, results_data = (float(rng.choice([rng.randint(1, 80), round(rng.uniform(1, 80), 4)]))
+                                          for _ in range(3))
+    task = Task('task', storage, computation, results_data, 0, 100, stage=stage)
+    if stage is TaskStage.LOADING:
+        return task._replace(loading_progress=round(rng.uniform(0, storage - 0.01), 4))
+    elif stage is TaskStage.COMPUTING:
+        return task._replace(loading_progress=storage, compute_progress=round(rng.uniform(0, computation - 0.01), 4))
+    else:
+        return task._replace(loading_progress=storage, compute_progress=computation,
+                             sending_progress=round(rng.uniform(0, results_data - 0.01), 4))
+
+
+def _random_weights(stage: TaskStage, num_tasks: int, rng: rnd.Random) -> Dict[Task, float]:
+    return {_random_task(stage, rng): float(rng.choice([rng.randint(1, 10), round(rng.uniform(0.1, 5), 3)]))
+            for _ in range(num_tasks)}
+
+
+def _assert_equivalent(reference_usage: Dict[Task, Tuple[float, float, float]],
+                       task_usage: Dict[Task, Tuple[float, float, float]]):
+    """
+    Asserts that the same tasks are allocated with the same stage and the progress and resource usage within 0.001
+    """
+    assert sorted(task.uid for task in reference_usage) == sorted(task.uid for task in task_usage)
+    updated_tasks = {task.uid: (task, usage) for task, usage in task_usage.items()}
+    for reference_task, reference_resources in reference_usage.items():
+        task, resources = updated_tasks[reference_task.uid]
+        assert task.stage is reference_task.stage
+        assert task.loading_progress == pytest.approx(reference_task.loading_progress, abs=1e-3)
+        assert task.compute_progress == pytest.approx(reference_task.compute_progress, abs=1e-3)
+        assert task.sending_progress == pytest.approx(reference_task.sending_progress, abs=1e-3)
+        assert resources == pytest.approx(reference_resources, abs=1e-3)
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_compute_allocation_equivalence(seed: int):
+    """
+    The water-filling compute allocation gives the same task stages and progress as the iterative allocation
+    """
+    rng = rnd.Random(seed)
+    for _ in range(25):
+        compute_weights = _random_weights(TaskStage.COMPUTING, rng.randint(1, 40), rng)
+        available_computation = rng.uniform(10, 400)
+        _assert_equivalent(_reference_compute_allocation(compute_weights, available_computation, 5),
+                           Server.allocate_compute_resources(compute_weights, available_computation, 5))
+
+
+@pytest.mark.parametrize('seed', range(40))
+def test_bandwidth_allocation_equivalence(seed: int):
+    """
+    The water-filling bandwidth allocation gives the same task stages and progress as the iterative allocation
+    """
+    rng = rnd.Random(seed)
+    for _ in range(25):
+        loading_weights = _random_weights(TaskStage.LOADING, rng.randint(0, 40), rng)
+        sending_weights = _random_weights(TaskStage.SENDING, rng.randint(0, 40), rng)
+        available_bandwidth = rng.uniform(10, 400)
+        _assert_equivalent(
+            _reference_bandwidth_allocation(loading_weights, sending_weights, available_bandwidth * 2,
+                                            available_bandwidth, 5),
+            Server.allocate_bandwidth_resources(loading_weights, sending_weights, available_bandwidth * 2,
+                                                available_bandwidth, 5))
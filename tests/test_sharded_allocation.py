@@ -0,0 +1,75 @@
+"""
+Tests of the sharded resource allocation (env/sharded_allocation.py)
+"""
+
+import random as rnd
+
+from conftest import random_actions
+from env.environment import OnlineFlexibleResourceAllocationEnv
+
+
+def test_fork_outlives_environment(env_settings):
+    """
+    The forks share the shard worker processes that are only stopped once every environment using them is closed
+    """
+    rnd.seed(0)
+    rng = rnd.Random(0)
+    env = OnlineFlexibleResourceAllocationEnv([env_settings()], num_shards=2)
+    state = env.reset()
+    for _ in range(20):
+        state, _, _, _ = env.step(random_actions(state, rng))
+
+    fork = env.fork()
+    shard_pool = fork._shard_pool
+    env.close()
+    del env
+    assert not shard_pool.closed
+
+    done = False
+    while not done:
+        state, _, done, _ = fork.step(random_actions(state, rng))
+    fork.close()
+    assert shard_pool.closed
+
+
+def _rollout(env, state, rng: rnd.Random, num_steps: int):
+    """
+    Steps the environment with random actions
+
+    Returns: The server tasks (the task names, stages and progress) of each state
+
+    """
+    states = []
+    for _ in range(num_steps):
+        state, _, done, _ = env.step(random_actions(state, rng))
+        states.append({server.name: [(task.name, task.stage, task.loading_progress, task.compute_progress,
+                                      task.sending_progress) for task in tasks]
+                       for server, tasks in state.server_tasks.items()})
+        if done:
+            break
+    return state, states
+
+
+def test_sharded_allocation_equivalence(env_settings):
+    """
+    The sharded resource allocation gives the same states as the per-server allocation, including when a fork and its
+        environment are stepped in turn so the workers' tasks are resent
+    """
+    setting = env_settings(num_servers=7, num_tasks=120)
+    rollouts = []
+    for num_shards in (0, 3):
+        rnd.seed(0)
+        rng = rnd.Random(0)
+        env = OnlineFlexibleResourceAllocationEnv([setting], num_shards=num_shards)
+        state, states = _rollout(env, env.reset(), rng, 60)
+        fork, fork_state = env.fork(), state
+        for _ in range(5):
+            fork_state, fork_states = _rollout(fork, fork_state, rng, 3)
+            state, env_states = _rollout(env, state, rng, 3)
+            states += fork_states + env_states
+        state, env_states = _rollout(env, state, rng, 1000)
+        rollouts.append(states + env_states)
+        env.close()
+        fork.close()
+
+    assert rollouts[0] == rollouts[1]
@@ -0,0 +1,72 @@
+"""
+Tests of the binary snapshot format (env/snapshot.py)
+"""
+
+import os
+import random as rnd
+
+import pytest
+
+from conftest import random_actions
+from env.environment import OnlineFlexibleResourceAllocationEnv
+from env.server import Server
+from env.snapshot import Snapshot
+
+
+def _env_tasks(env):
+    """
+    Returns: The servers and tasks of an environment, the server tasks, auction tasks and unallocated tasks
+
+    """
+    state = env._state
+    return ({(server.name, server.storage_cap, server.computational_cap, server.bandwidth_cap):
+             [tuple(task)[:-1] for task in tasks] for server, tasks in state.server_tasks.items()},
+            state.time_step, [tuple(task)[:-1] for task in state.auction_tasks or [state.auction_task] if task],
+            [tuple(task)[:-1] for task in env._unallocated_tasks], env._total_time_steps, env.env_name)
+
+
+@pytest.mark.parametrize('mmap', [False, True])
+def test_snapshot_round_trip(env_settings, tmp_path, mmap):
+    """
+    Saving then loading a binary snapshot gives the same environment as the json format, with non-ascii names
+    """
+    rnd.seed(0)
+    rng = rnd.Random(0)
+    env = OnlineFlexibleResourceAllocationEnv([env_settings()])
+    state = env.reset()
+    for _ in range(40):
+        state, _, _, _ = env.step(random_actions(state, rng))
+    env.env_name = 'snapshot ✓ 环境'
+    env.add_task(env._unallocated_tasks.peek()._replace(name='任务 ✓', auction_time=state.time_step + 1))
+
+    snapshot_filename, json_filename = str(tmp_path / 'env.snp'), str(tmp_path / 'env.json')
+    env.save_env(snapshot_filename, binary=True)
+    env.save_env(json_filename)
+
+    loaded_env, loaded_state = OnlineFlexibleResourceAllocationEnv.load_env(snapshot_filename, mmap)
+    assert loaded_env._unallocated_tasks.unread_source
+    assert _env_tasks(loaded_env) == _env_tasks(env)
+    assert _env_tasks(loaded_env) == _env_tasks(OnlineFlexibleResourceAllocationEnv.load_env(json_filename)[0])
+
+    # The loaded environment can be saved before its tasks are read and the names are stored as utf-8
+    resaved_filename = str(tmp_path / 'resaved.snp')
+    loaded_env.save_env(resaved_filename, binary=True)
+    assert os.path.getsize(resaved_filename) == os.path.getsize(snapshot_filename)
+    snapshot = Snapshot(resaved_filename)
+    assert snapshot.header['name data size'] == \
+        sum(len(task[0].encode()) for tasks in _env_tasks(env)[0].values() for task in tasks) + \
+        sum(len(task[0].encode()) for task in _env_tasks(env)[2] + _env_tasks(env)[3]) + \
+        sum(len(server[0].encode()) for server in _env_tasks(env)[0].keys())
+
+
+def test_snapshot_without_tasks(tmp_path):
+    """
+    A snapshot of an environment without any tasks
+    """
+    env, _ = OnlineFlexibleResourceAllocationEnv.custom_env('empty', 10, {Server('server', 400, 40, 30): []}, [])
+    filename = str(tmp_path / 'empty.snp')
+    env.save_env(filename, binary=True)
+
+    loaded_env, loaded_state = OnlineFlexibleResourceAllocationEnv.load_env(filename)
+    assert _env_tasks(loaded_env) == _env_tasks(env)
+    assert loaded_state.auction_task is None and not loaded_env._unallocated_tasks
@@ -0,0 +1,43 @@
+"""
+Tests of the task table (env/task_table.py)
+"""
+
+import random as rnd
+
+from conftest import random_actions
+from env.environment import OnlineFlexibleResourceAllocationEnv
+
+
+def test_task_table_rows_bounded(env_settings):
+    """
+    The rows of the finished tasks are reused so the number of table rows is the maximum number of allocated tasks
+    """
+    rnd.seed(0)
+    rng = rnd.Random(0)
+    env = OnlineFlexibleResourceAllocationEnv([env_settings(num_servers=5, num_tasks=400, total_time_steps=100)],
+                                              task_table=True)
+    state, done, max_tasks = env.reset(), False, 0
+    while not done:
+        max_tasks = max(max_tasks, sum(len(tasks) for tasks in state.server_tasks.values()))
+        state, _, done, _ = env.step(random_actions(state, rng))
+
+    assert len(env._task_table.names) == max_tasks
+    assert len(env._task_table.uid) <= 2 * len(env._task_table.names)
+
+
+def test_task_table_previous_states(env_settings):
+    """
+    The task views of the previous states keep their values after the rows are updated in place
+    """
+    rnd.seed(1)
+    rng = rnd.Random(1)
+    env = OnlineFlexibleResourceAllocationEnv([env_settings()], task_table=True)
+    state, done, states = env.reset(), False, []
+    while not done:
+        states.append((state, {server: [task.to_task() for task in tasks]
+                               for server, tasks in state.server_tasks.items()}))
+        state, _, done, _ = env.step(random_actions(state, rng))
+
+    for previous_state, server_tasks in states:
+        for server, tasks in previous_state.server_tasks.items():
+            assert [tuple(task.to_task()) for task in tasks] == [tuple(task) for task in server_tasks[server]]
@@ -0,0 +1,41 @@
+"""
+Tests of the validation level of the invariant checks (env/validation.py)
+"""
+
+import random as rnd
+
+from conftest import random_actions
+from env.environment import OnlineFlexibleResourceAllocationEnv
+from env.validation import ValidationLevel
+from resource_weighting_agent import ResourceWeightingAgent
+
+
+class _EqualWeightingAgent(ResourceWeightingAgent):
+    """
+    Weights every task equally
+    """
+
+    def _get_actions(self, allocated_tasks, server, time_step, training=False):
+        return {task: 1.0 for task in allocated_tasks}
+
+
+def test_agent_validator_independent(env_settings):
+    """
+    The weighting agents given the environment's validator don't advance the environment's sampled validation checks
+    """
+    rnd.seed(0)
+    rng = rnd.Random(0)
+    env = OnlineFlexibleResourceAllocationEnv([env_settings()], validation_level=ValidationLevel.SAMPLED,
+                                              validation_frequency=3)
+    agent = _EqualWeightingAgent('equal', env.validator)
+    assert agent.validator is not env.validator
+    assert agent.validator.level is ValidationLevel.SAMPLED and agent.validator.frequency == 3
+
+    state, done, num_steps = env.reset(), False, 0
+    while not done:
+        if state.auction_task is None:
+            for server, tasks in state.server_tasks.items():
+                agent.weight(tasks, server, state.time_step)
+        state, _, done, _ = env.step(random_actions(state, rng))
+        num_steps += 1
+    assert env.validator.total_checks == num_steps
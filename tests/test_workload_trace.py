@@ -0,0 +1,86 @@
+"""
+Tests of the workload trace format (env/workload_trace.py)
+"""
+
+import random as rnd
+
+from conftest import random_actions
+from env.environment import OnlineFlexibleResourceAllocationEnv
+from env.server import Server
+from env.task_stage import TaskStage
+from env.workload_trace import WorkloadTrace, save_workload_trace
+
+
+def _save_random_trace(filename: str, num_tasks: int, rng: rnd.Random):
+    """
+    Saves a workload trace of random tasks with unsorted auction times and non-ascii names, the resources required
+        are rounded to four decimal places like the resources of the environment
+
+    Returns: List of the task attributes of each task (in the order saved)
+
+    """
+    tasks = []
+    for task_num in range(num_tasks):
+        auction_time = rng.randint(0, 30)
+        tasks.append((rng.choice(['task', 'tâche', '任务', 'task\nname']) + f' {task_num}',
+                      float(rng.randint(50, 100)), round(rng.uniform(50, 150), 4), round(rng.uniform(20, 50), 4),
+                      auction_time, auction_time + rng.randint(4, 12)))
+    save_workload_trace(filename, *zip(*tasks))
+    return tasks
+
+
+def _task(task):
+    return (task.name, task.required_storage, task.required_computation, task.required_results_data,
+            task.auction_time, task.deadline)
+
+
+def test_workload_trace_round_trip(tmp_path):
+    """
+    The tasks read from a workload trace are the saved tasks sorted by auction time (the tasks with the same auction
+        time in the saved order), for any chunk size and start time
+    """
+    filename = str(tmp_path / 'test.wlt')
+    tasks = _save_random_trace(filename, 200, rnd.Random(0))
+    sorted_tasks = sorted(tasks, key=lambda task: task[4])
+
+    trace = WorkloadTrace(filename)
+    assert len(trace) == len(tasks)
+    assert trace.total_time_steps() == max(task[5] for task in tasks)
+    for chunk_size in (1, 7, 4096):
+        assert [_task(task) for task in trace.tasks(chunk_size=chunk_size)] == sorted_tasks
+    for start_time in (0, 10, 30, 31):
+        assert [_task(task) for task in trace.tasks(start_time, chunk_size=16)] == \
+               [task for task in sorted_tasks if start_time <= task[4]]
+    assert all(task.stage is TaskStage.UNASSIGNED for task in trace.tasks())
+
+
+def test_empty_workload_trace(tmp_path):
+    """
+    An empty workload trace has no tasks
+    """
+    filename = str(tmp_path / 'empty.wlt')
+    save_workload_trace(filename, [], [], [], [], [], [])
+
+    trace = WorkloadTrace(filename)
+    assert len(trace) == 0
+    assert trace.total_time_steps() == 0
+    assert list(trace.tasks()) == []
+
+
+def test_load_workload_trace(tmp_path):
+    """
+    Every task of a workload trace is auctioned at its auction time by an environment loaded from the trace
+    """
+    filename = str(tmp_path / 'test.wlt')
+    tasks = _save_random_trace(filename, 60, rnd.Random(1))
+
+    rng = rnd.Random(1)
+    env, state = OnlineFlexibleResourceAllocationEnv.load_workload_trace(
+        filename, [Server(f'server {server_num}', 400, 40, 30) for server_num in range(3)], chunk_size=8)
+    auctioned_tasks, done = [], False
+    while not done:
+        if state.auction_task is not None:
+            assert state.auction_task.auction_time == state.time_step
+            auctioned_tasks.append(_task(state.auction_task))
+        state, _, done, _ = env.step(random_actions(state, rng))
+    assert auctioned_tasks == sorted(tasks, key=lambda task: task[4])
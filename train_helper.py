@@ -1,6 +1,7 @@
+import asyncio
 import os
-from random import random
-from typing import List, Dict, Tuple, Optional, TYPE_CHECKING
+import random
+from typing import Any, List, Dict, Tuple, Optional, Union, TYPE_CHECKING
 import datetime as dt
 
 from tensorflow_core.python.ops.summary_ops_v2 import ResourceSummaryWriter
@@ -8,6 +9,8 @@ import tensorflow as tf
 
 from env.env_state import EnvState
 from env.environment import OnlineFlexibleResourceAllocationEnv
+from env.episode_trace import EpisodeTraceRecorder, read_trace, split_batched_auction
+from env.eval_pool import EvalEnvPool
 from env.server import Server
 from env.task import Task
 from eval_results import EvalResults
@@ -30,7 +33,7 @@ def setup_tensorboard(folder: str, training_name: str) -> Tuple[ResourceSummaryW
 
 
 def generate_eval_envs(eval_env: OnlineFlexibleResourceAllocationEnv, num_evals: int, folder: str,
-                       overwrite: bool = False) -> List[str]:
+                       overwrite: bool = False, binary: bool = False) -> List[str]:
     """
     生成并保存用于评估智能体训练的评估环境
 
@@ -39,6 +42,8 @@ def generate_eval_envs(eval_env: OnlineFlexibleResourceAllocationEnv, num_evals:
         num_evals: 生成环境数量
         folder: 生成环境的文件夹
         overwrite: 如果要覆盖以前保存的环境
+        binary: If to save the environments as binary snapshots rather than json, an existing json environment is
+            still used (unless overwriting) so that the evaluation environments don't change
 
     Returns: 环境文件路径列表
     """
@@ -47,42 +52,141 @@ def generate_eval_envs(eval_env: OnlineFlexibleResourceAllocationEnv, num_evals:
 
     eval_files = []
     for eval_num in range(num_evals):
-        eval_file = f'{folder}/eval_{eval_num}.env'
+        eval_file = f'{folder}/eval_{eval_num}.{"snap" if binary else "env"}'
+        json_eval_file = f'{folder}/eval_{eval_num}.env'
+        if binary and not overwrite and not os.path.exists(eval_file) and os.path.exists(json_eval_file):
+            eval_file = json_eval_file
         eval_files.append(eval_file)
         if overwrite or not os.path.exists(eval_file):
             eval_env.reset()
-            eval_env.save_env(eval_file)
+            eval_env.save_env(eval_file, binary=binary)
 
     return eval_files
 
 
-def run_training(training_env: OnlineFlexibleResourceAllocationEnv, eval_envs: List[str], total_episodes: int,
-                 task_pricing_agents: List[TaskPricingRLAgent],
-                 resource_weighting_agents: List[ResourceWeightingRLAgent], eval_frequency: int):
+class EpisodeObservations:
     """
-    Runs the training of the agents for a fixed number of episodes
-
-    Args:
-        training_env: The training environments
-        eval_envs: The evaluation environment filenames
-        total_episodes: The total number of episodes
-        task_pricing_agents: List of training task pricing agents
-        resource_weighting_agents: List of training resource weighting agents
-        eval_frequency: The agent evaluation frequency
+    Adds the observations of an episode's steps to the agents of each server
     """
-    # Loop over the episodes
-    for episode in range(total_episodes):
-        if episode % 5 == 0:
-            print(f'Episode: {episode} at {dt.datetime.now().strftime("%H:%M:%S")}')
-        train_agent(training_env, task_pricing_agents, resource_weighting_agents)
 
-        # Every eval_frequency episodes, the agents are evaluated
-        if episode % eval_frequency == 0:
-            eval_agent(eval_envs, episode, task_pricing_agents, resource_weighting_agents)
+    def __init__(self, server_pricing_agents: Dict[Server, TaskPricingRLAgent],
+                 server_weighting_agents: Dict[Server, ResourceWeightingRLAgent]):
+        """
+        Constructor of the episode observations
+
+        Args:
+            server_pricing_agents: The task pricing agent of each server
+            server_weighting_agents: The resource weighting agent of each server
+        """
+        self.server_pricing_agents = server_pricing_agents
+        self.server_weighting_agents = server_weighting_agents
+
+        # Store each server's auction observations with it being (None for first auction because no observation was
+        # seen previously) the agent state for the auction (auction task, server tasks, server, time), the action
+        # taken and if the auction task was won
+        self.server_auction_states: Dict[Server, Optional[Tuple[TaskPricingState, float, bool]]] = {
+            server: None for server in server_pricing_agents.keys()
+        }
+
+        # For successful auctions, then the agent state of the winning bid, the action taken and the following
+        #   observation are all stored in order to be added as an agent observation after the task finishes in order
+        #   to know if the task was completed or not
+        self.successful_auction_states: List[Tuple[TaskPricingState, float, TaskPricingState]] = []
+
+    def auction(self, state: EnvState, auction_prices: Dict[Server, float], rewards: Dict[Server, float]):
+        """
+        Adds the observations of an auction step
+
+        Args:
+            state: The environment state of the auction
+            auction_prices: The auction price of each server
+            rewards: The auction rewards, the price paid by the winning server
+        """
+        # Update the server_auction_observations and auction_trajectories variables with the new next_state info
+        for server, tasks in state.server_tasks.items():
+            # Generate the current agent's state
+            current_state = TaskPricingState(state.auction_task, tasks, server, state.time_step)
+
+            if self.server_auction_states[server]:  # If a server auction observation exists
+                # Get the last time steps agent state, action and if the server won the auction
+                previous_state, previous_action, is_previous_auction_win = self.server_auction_states[server]
+
+                # If the server won the auction in the last time step then add the info to the auction trajectories
+                if is_previous_auction_win:
+                    self.successful_auction_states.append((previous_state, previous_action, current_state))
+                else:
+                    # Else add the agent state to the agent's replay buffer as a failed auction bid
+                    # Else add the observation as a failure to the task pricing rl_agents
+                    self.server_pricing_agents[server].failed_auction_bid(previous_state, previous_action,
+                                                                          current_state)
+
+            # Update the server auction agent states with the current agent state
+            self.server_auction_states[server] = (current_state, auction_prices[server], server in rewards)
+
+    def batched_auction(self, state: EnvState, auction_prices: Dict[Server, Dict[Task, float]],
+                        rewards: Dict[Server, Dict[Task, float]]):
+        """
+        Adds the observations of a batched auction step as the auctions of each task (see split_batched_auction)
+
+        Args:
+            state: The environment state of the batched auction
+            auction_prices: The price of each auction task for each server
+            rewards: The price paid for each task won by each server
+        """
+        for auction_state, task_prices, task_rewards in split_batched_auction(state, auction_prices, rewards):
+            self.auction(auction_state, task_prices, task_rewards)
+
+    def resource_allocation(self, state: EnvState, weighting_actions: Dict[Server, Dict[Task, float]],
+                            next_state: EnvState, finished_server_tasks: Dict[Server, List[Task]]):
+        """
+        Adds the observations of a resource allocation step
+
+        Args:
+            state: The environment state of the resource allocation
+            weighting_actions: The resource weighting of each server's tasks
+            next_state: The next environment state
+            finished_server_tasks: The finished tasks of each server
+        """
+        # For each server, there are may be finished tasks due to the resource allocation
+        #    therefore add the task pricing auction agent states with the finished tasks
+        for server, finished_tasks in finished_server_tasks.items():
+            for finished_task in finished_tasks:
+                # Get the successful auction agent state from the list of successful auction agent states
+                successful_auction = next((auction_agent_state
+                                           for auction_agent_state in self.successful_auction_states
+                                           if auction_agent_state[0].auction_task == finished_task), None)
+                if successful_auction is None:
+                    print(f'Number of successful auction agent states: {len(self.successful_auction_states)}')
+                    print(
+                        f'Number of server tasks: {sum(len(tasks) for tasks in next_state.server_tasks.values())}')
+                    print(f'Finished task: {str(finished_task)}\n\n')
+                    print(f'State: {str(state)}\n')
+                    print(f'Next state: {str(next_state)}')
+                    break
+
+                # Remove the successful auction agent state
+                self.successful_auction_states.remove(successful_auction)
+
+                # Unwrap the successful auction agent state tuple
+                auction_state, action, next_auction_state = successful_auction
+
+                # Add the winning auction bid info to the agent
+                self.server_pricing_agents[server].winning_auction_bid(auction_state, action, finished_task,
+                                                                       next_auction_state)
+
+        # Add the agent states for resource allocation
+        for server, tasks in state.server_tasks.items():
+            agent_state = ResourceAllocationState(tasks, server, state.time_step)
+            next_agent_state = ResourceAllocationState(next_state.server_tasks[server], server,
+                                                       next_state.time_step)
+
+            self.server_weighting_agents[server].resource_allocation_obs(agent_state, weighting_actions[server],
+                                                                         next_agent_state,
+                                                                         finished_server_tasks[server])
 
 
 def train_agent(training_env: OnlineFlexibleResourceAllocationEnv, pricing_agents: List[TaskPricingRLAgent],
-                weighting_agents: List[ResourceWeightingRLAgent]):
+                weighting_agents: List[ResourceWeightingRLAgent], recorder: Optional[EpisodeTraceRecorder] = None):
     """
     Trains reinforcement learning agents through the provided environment
 
@@ -90,112 +194,242 @@ def train_agent(training_env: OnlineFlexibleResourceAllocationEnv, pricing_agent
         training_env: Training environment used
         pricing_agents: A list of reinforcement learning task pricing agents
         weighting_agents: A list of reinforcement learning resource weighting agents
+        recorder: Optional episode trace recorder that the episode steps are recorded to
+    """
+    state, server_pricing_agents, server_weighting_agents, observations = \
+        _start_training_episode(training_env, pricing_agents, weighting_agents, recorder)
+
+    # The environment is looped over till the environment is done (the current time step > environment total time steps)
+    done = False
+    while not done:
+        # If the state has a task (or batched tasks) to be auctioned then find the pricing of each server as the action
+        #   else the environment is at resource allocation stage so find the weighting of each server's tasks
+        if state.auction_task:
+            actions = collect_bids(state, server_pricing_agents, True)
+        else:
+            actions = collect_weights(state, server_weighting_agents, True)
+        state, done = _training_step(training_env, state, actions, observations, recorder)
+
+    if recorder:
+        recorder.end_episode(state)
+
+
+async def async_train_agent(training_env: OnlineFlexibleResourceAllocationEnv,
+                            pricing_agents: List[TaskPricingRLAgent], weighting_agents: List[ResourceWeightingRLAgent],
+                            recorder: Optional[EpisodeTraceRecorder] = None):
+    """
+    Trains reinforcement learning agents through the provided environment the same as train_agent, except that the
+        actions of every server are gathered at the same time (see gather_bids and gather_weights)
+
+    Args:
+        training_env: Training environment used
+        pricing_agents: A list of reinforcement learning task pricing agents
+        weighting_agents: A list of reinforcement learning resource weighting agents
+        recorder: Optional episode trace recorder that the episode steps are recorded to
+    """
+    state, server_pricing_agents, server_weighting_agents, observations = \
+        _start_training_episode(training_env, pricing_agents, weighting_agents, recorder)
+
+    done = False
+    while not done:
+        if state.auction_task:
+            actions = await gather_bids(state, server_pricing_agents, True)
+        else:
+            actions = await gather_weights(state, server_weighting_agents, True)
+        state, done = _training_step(training_env, state, actions, observations, recorder)
+
+    if recorder:
+        recorder.end_episode(state)
+
+
+def _start_training_episode(training_env: OnlineFlexibleResourceAllocationEnv,
+                            pricing_agents: List[TaskPricingRLAgent], weighting_agents: List[ResourceWeightingRLAgent],
+                            recorder: Optional[EpisodeTraceRecorder]) \
+        -> Tuple[EnvState, Dict[Server, TaskPricingRLAgent], Dict[Server, ResourceWeightingRLAgent],
+                 EpisodeObservations]:
+    """
+    Starts a training episode of train_agent and async_train_agent
+
+    Args:
+        training_env: Training environment used
+        pricing_agents: A list of reinforcement learning task pricing agents
+        weighting_agents: A list of reinforcement learning resource weighting agents
+        recorder: Optional episode trace recorder that the episode steps are recorded to
+
+    Returns: Tuple of the initial state, the task pricing and resource weighting agent of each server and the episode
+        observations
+
     """
     # Reset the environment getting a new training environment for this episode
     state = training_env.reset()
+    if recorder:
+        recorder.start_episode(state.server_tasks.keys())
 
     # Allocate the servers with their random task pricing and resource weighting agents
-    server_pricing_agents: Dict[Server, TaskPricingRLAgent] = {
-        server: random.choice(pricing_agents) for server in state.server_tasks.keys()
-    }
-    server_weighting_agents: Dict[Server, ResourceWeightingRLAgent] = {
-        server: random.choice(weighting_agents) for server in state.server_tasks.keys()
+    server_pricing_agents, server_weighting_agents = allocate_agents(state, pricing_agents, weighting_agents)
+    return state, server_pricing_agents, server_weighting_agents, \
+        EpisodeObservations(server_pricing_agents, server_weighting_agents)
+
+
+def _training_step(training_env: OnlineFlexibleResourceAllocationEnv, state: EnvState,
+                   actions: Union[Dict[Server, float], Dict[Server, Dict[Task, float]]],
+                   observations: EpisodeObservations,
+                   recorder: Optional[EpisodeTraceRecorder]) -> Tuple[EnvState, bool]:
+    """
+    A training step of train_agent and async_train_agent, steps the environment with the servers' actions then
+        records and observes the step
+
+    Args:
+        training_env: Training environment used
+        state: The environment state
+        actions: The auction bids or the resource weights of every server
+        observations: The episode observations of the agents
+        recorder: Optional episode trace recorder that the episode steps are recorded to
+
+    Returns: Tuple of the next state and if the environment is done
+
+    """
+    # With batched auctions, every server prices all of the tasks being auctioned
+    if state.auction_tasks:
+        next_state, rewards, done, info = training_env.step(actions)
+        if recorder:
+            recorder.batched_auction(state, actions, rewards)
+
+        observations.batched_auction(state, actions, rewards)
+    elif state.auction_task:
+        # Environment step using the pricing actions to get the next state, rewards, done and info
+        next_state, rewards, done, info = training_env.step(actions)
+        if recorder:
+            recorder.auction(state, actions, rewards)
+
+        observations.auction(state, actions, rewards)
+    else:
+        # Environment step using the resource weighting actions to get the next state, rewards, done and info
+        next_state, finished_server_tasks, done, info = training_env.step(actions)
+        if recorder:
+            recorder.resource_allocation(state, actions, finished_server_tasks)
+
+        observations.resource_allocation(state, actions, next_state, finished_server_tasks)
+    assert all(task.auction_time <= next_state.time_step <= task.deadline
+               for _, tasks in next_state.server_tasks.items() for task in tasks)
+    return next_state, done
+
+
+def collect_bids(state: EnvState, server_pricing_agents: Dict[Server, TaskPricingAgent],
+                 training: bool = False) -> Union[Dict[Server, float], Dict[Server, Dict[Task, float]]]:
+    """
+    Collects the auction bids of every server one after another with the agents' bid (the synchronous equivalent of
+        gather_bids)
+
+    Args:
+        state: The environment state with an auction task (or batched auction tasks)
+        server_pricing_agents: The task pricing agent of each server
+        training: If to use training actions
+
+    Returns: The bid of each server, or with batched auction tasks, the bid of each server for each task
+
+    """
+    if state.auction_tasks:
+        return {
+            server: dict(zip(state.auction_tasks, server_pricing_agents[server].bids(
+                state.auction_tasks, tasks, server, state.time_step, training=training)))
+            for server, tasks in state.server_tasks.items()
+        }
+    return {
+        server: server_pricing_agents[server].bid(state.auction_task, tasks, server, state.time_step, training=training)
+        for server, tasks in state.server_tasks.items()
     }
 
-    # Store each server's auction observations with it being (None for first auction because no observation was seen
-    # previously) the agent state for the auction (auction task, server tasks, server, time), the action taken and if
-    # the auction task was won
-    server_auction_states: Dict[Server, Optional[Tuple[TaskPricingState, float, bool]]] = {
-        server: None for server in state.server_tasks.keys()
+
+def collect_weights(state: EnvState, server_weighting_agents: Dict[Server, ResourceWeightingAgent],
+                    training: bool = False) -> Dict[Server, Dict[Task, float]]:
+    """
+    Collects the resource weights of every server one after another with the agents' weight (the synchronous
+        equivalent of gather_weights)
+
+    Args:
+        state: The environment state
+        server_weighting_agents: The resource weighting agent of each server
+        training: If to use training actions
+
+    Returns: The task weights of each server
+
+    """
+    return {
+        server: server_weighting_agents[server].weight(tasks, server, state.time_step, training=training)
+        for server, tasks in state.server_tasks.items()
     }
 
-    # For successful auctions, then the agent state of the winning bid, the action taken and the following observation are
-    #   all stored in order to be added as an agent observation after the task finishes in order to know if the task was completed or not
-    successful_auction_states: List[Tuple[TaskPricingState, float, TaskPricingState]] = []
 
-    # The environment is looped over till the environment is done (the current time step > environment total time steps)
-    done = False
-    while not done:
-        # If the state has a task to be auctioned then find the pricing of each server as the action
-        if state.auction_task:
-            # Get the bids for each server
-            auction_prices = {
-                server: server_pricing_agents[server].bid(state.auction_task, tasks, server, state.time_step,
-                                                          training=True)
-                for server, tasks in state.server_tasks.items()
-            }
-
-            # Environment step using the pricing actions to get the next state, rewards, done and info
-            next_state, rewards, done, info = training_env.step(auction_prices)
-
-            # Update the server_auction_observations and auction_trajectories variables with the new next_state info
-            for server, tasks in state.server_tasks.items():
-                # Generate the current agent's state
-                current_state = TaskPricingState(state.auction_task, tasks, server, state.time_step)
-
-                if server_auction_states[server]:  # If a server auction observation exists
-                    # Get the last time steps agent state, action and if the server won the auction
-                    previous_state, previous_action, is_previous_auction_win = server_auction_states[server]
-
-                    # If the server won the auction in the last time step then add the info to the auction trajectories
-                    if is_previous_auction_win:
-                        successful_auction_states.append((previous_state, previous_action, current_state))
-                    else:
-                        # Else add the agent state to the agent's replay buffer as a failed auction bid
-                        # Else add the observation as a failure to the task pricing rl_agents
-                        server_pricing_agents[server].failed_auction_bid(previous_state, previous_action, current_state)
-
-                # Update the server auction agent states with the current agent state
-                server_auction_states[server] = (current_state, auction_prices[server], server in rewards)
-        else:  # Else the environment is at resource allocation stage
-            # For each server and each server task calculate its relative weighting
-            weighting_actions: Dict[Server, Dict[Task, float]] = {
-                server: server_weighting_agents[server].weight(tasks, server, state.time_step, training=True)
-                for server, tasks in state.server_tasks.items()
-            }
-
-            # Environment step using the resource weighting actions to get the next state, rewards, done and info
-            next_state, finished_server_tasks, done, info = training_env.step(weighting_actions)
-
-            # For each server, there are may be finished tasks due to the resource allocation
-            #    therefore add the task pricing auction agent states with the finished tasks
-            for server, finished_tasks in finished_server_tasks.items():
-                for finished_task in finished_tasks:
-                    # Get the successful auction agent state from the list of successful auction agent states
-                    successful_auction = next((auction_agent_state
-                                               for auction_agent_state in successful_auction_states
-                                               if auction_agent_state[0].auction_task == finished_task), None)
-                    if successful_auction is None:
-                        print(f'Number of successful auction agent states: {len(successful_auction_states)}')
-                        print(
-                            f'Number of server tasks: {sum(len(tasks) for tasks in next_state.server_tasks.values())}')
-                        print(f'Finished task: {str(finished_task)}\n\n')
-                        print(f'State: {str(state)}\n')
-                        print(f'Next state: {str(next_state)}')
-                        break
-
-                    # Remove the successful auction agent state
-                    successful_auction_states.remove(successful_auction)
-
-                    # Unwrap the successful auction agent state tuple
-                    auction_state, action, next_auction_state = successful_auction
-
-                    # Add the winning auction bid info to the agent
-                    server_pricing_agents[server].winning_auction_bid(auction_state, action, finished_task,
-                                                                      next_auction_state)
-
-            # Add the agent states for resource allocation
-            for server, tasks in state.server_tasks.items():
-                agent_state = ResourceAllocationState(tasks, server, state.time_step)
-                next_agent_state = ResourceAllocationState(next_state.server_tasks[server], server,
-                                                           next_state.time_step)
-
-                server_weighting_agents[server].resource_allocation_obs(agent_state, weighting_actions[server],
-                                                                        next_agent_state, finished_server_tasks[server])
-        assert all(task.auction_time <= next_state.time_step <= task.deadline
-                   for _, tasks in next_state.server_tasks.items() for task in tasks)
-        # Update the state with the next state
-        state = next_state
+async def gather_bids(state: EnvState, server_pricing_agents: Dict[Server, TaskPricingAgent],
+                      training: bool = False) -> Union[Dict[Server, float], Dict[Server, Dict[Task, float]]]:
+    """
+    Gathers the auction bids of every server at the same time with the agents' abid (or abids)
+
+    Args:
+        state: The environment state with an auction task (or batched auction tasks)
+        server_pricing_agents: The task pricing agent of each server
+        training: If to use training actions
+
+    Returns: The bid of each server, or with batched auction tasks, the bid of each server for each task
+
+    """
+    if state.auction_tasks:
+        bids = await asyncio.gather(*(
+            server_pricing_agents[server].abids(state.auction_tasks, tasks, server, state.time_step, training=training)
+            for server, tasks in state.server_tasks.items()
+        ))
+        return {server: dict(zip(state.auction_tasks, server_bids))
+                for server, server_bids in zip(state.server_tasks.keys(), bids)}
+
+    bids = await asyncio.gather(*(
+        server_pricing_agents[server].abid(state.auction_task, tasks, server, state.time_step, training=training)
+        for server, tasks in state.server_tasks.items()
+    ))
+    return dict(zip(state.server_tasks.keys(), bids))
+
+
+async def gather_weights(state: EnvState, server_weighting_agents: Dict[Server, ResourceWeightingAgent],
+                         training: bool = False) -> Dict[Server, Dict[Task, float]]:
+    """
+    Gathers the resource weights of every server at the same time with the agents' aweight
+
+    Args:
+        state: The environment state
+        server_weighting_agents: The resource weighting agent of each server
+        training: If to use training actions
+
+    Returns: The task weights of each server
+
+    """
+    weights = await asyncio.gather(*(
+        server_weighting_agents[server].aweight(tasks, server, state.time_step, training=training)
+        for server, tasks in state.server_tasks.items()
+    ))
+    return dict(zip(state.server_tasks.keys(), weights))
+
+
+def replay_trace(filename: str, pricing_agents: List[TaskPricingRLAgent],
+                 weighting_agents: List[ResourceWeightingRLAgent]):
+    """
+    Replays the episodes of an episode trace into the agents' replay buffers without running the environment or
+        the agents policies, each episode's servers are randomly allocated an agent as in training
+
+    Args:
+        filename: The episode trace filename (see env/episode_trace.py)
+        pricing_agents: A list of reinforcement learning task pricing agents
+        weighting_agents: A list of reinforcement learning resource weighting agents
+    """
+    for servers, steps in read_trace(filename):
+        observations = EpisodeObservations({server: random.choice(pricing_agents) for server in servers},
+                                           {server: random.choice(weighting_agents) for server in servers})
+        for state, actions, rewards, next_state in steps:
+            if state.auction_task:
+                observations.auction(state, actions, rewards)
+            else:
+                observations.resource_allocation(state, actions, next_state, rewards)
+
+
 def allocate_agents(state: EnvState, task_pricing_agents: List[TaskPricingAgent],
                     resource_weighting_agents: List[ResourceWeightingAgent]) \
         -> Tuple[Dict[Server, TaskPricingAgent], Dict[Server, ResourceWeightingAgent]]:
@@ -221,7 +455,8 @@ def allocate_agents(state: EnvState, task_pricing_agents: List[TaskPricingAgent]
 
 def run_training(training_env: OnlineFlexibleResourceAllocationEnv, eval_envs: List[str], total_episodes: int,
                  task_pricing_agents: List[TaskPricingRLAgent],
-                 resource_weighting_agents: List[ResourceWeightingRLAgent], eval_frequency: int):
+                 resource_weighting_agents: List[ResourceWeightingRLAgent], eval_frequency: int,
+                 eval_options: Optional[Dict[str, Any]] = None):
     """
     Runs the training of the agents for a fixed number of episodes
 
@@ -232,7 +467,12 @@ def run_training(training_env: OnlineFlexibleResourceAllocationEnv, eval_envs: L
         task_pricing_agents: List of training task pricing agents
         resource_weighting_agents: List of training resource weighting agents
         eval_frequency: The agent evaluation frequency
+        eval_options: Optional keyword arguments of the environment constructor of the evaluation environments
+            (see EvalEnvPool)
     """
+    # The evaluation environments are only loaded once
+    eval_pool = EvalEnvPool(eval_envs, options=eval_options)
+
     # Loop over the episodes
     for episode in range(total_episodes):
         if episode % 5 == 0:
@@ -241,17 +481,16 @@ def run_training(training_env: OnlineFlexibleResourceAllocationEnv, eval_envs: L
 
         # Every eval_frequency episodes, the agents are evaluated
         if episode % eval_frequency == 0:
-            eval_agent(eval_envs, episode, task_pricing_agents, resource_weighting_agents)
+            eval_agent(eval_pool, episode, task_pricing_agents, resource_weighting_agents)
 
 
-
-def eval_agent(env_filenames: List[str], episode: int, pricing_agents: List[TaskPricingAgent],
+def eval_agent(eval_envs: Union[List[str], EvalEnvPool], episode: int, pricing_agents: List[TaskPricingAgent],
                weighting_agents: List[ResourceWeightingAgent]) -> EvalResults:
     """
     Evaluation of agents using a list of preset environments
 
     Args:
-        env_filenames: Evaluation environment filenames
+        eval_envs: Evaluation environment filenames or a pool of the loaded evaluation environments
         episode: The episode of evaluation
         pricing_agents: List of task pricing agents
         weighting_agents: List of resource weighting agents
@@ -260,28 +499,82 @@ def eval_agent(env_filenames: List[str], episode: int, pricing_agents: List[Task
     """
     results = EvalResults()
 
-    for env_filename in env_filenames:
-        eval_env, state = OnlineFlexibleResourceAllocationEnv.load_env(env_filename)
+    eval_pool = eval_envs if isinstance(eval_envs, EvalEnvPool) else EvalEnvPool(eval_envs)
+    for eval_env, state in eval_pool:
         server_pricing_agents, server_weighting_agents = allocate_agents(state, pricing_agents, weighting_agents)
 
         done = False
         while not done:
             if state.auction_task:
-                bidding_actions = {
-                    server: server_pricing_agents[server].bid(state.auction_task, tasks, server, state.time_step)
-                    for server, tasks in state.server_tasks.items()
-                }
-                state, rewards, done, info = eval_env.step(bidding_actions)
-                results.auction(bidding_actions, rewards)
+                actions = collect_bids(state, server_pricing_agents, False)
             else:
-                weighting_actions = {
-                    server: server_weighting_agents[server].weight(tasks, server, state.time_step)
-                    for server, tasks in state.server_tasks.items()
-                }
-                state, rewards, done, info = eval_env.step(weighting_actions)
-                results.resource_allocation(weighting_actions, rewards)
+                actions = collect_weights(state, server_weighting_agents, False)
+            state, done = _eval_step(eval_env, state, actions, results)
 
         results.finished_env()
 
     results.save(episode)
     return results
+
+
+async def async_eval_agent(eval_envs: Union[List[str], EvalEnvPool], episode: int,
+                           pricing_agents: List[TaskPricingAgent],
+                           weighting_agents: List[ResourceWeightingAgent]) -> EvalResults:
+    """
+    Evaluation of agents using a list of preset environments the same as eval_agent, except that the actions of
+        every server are gathered at the same time (see gather_bids and gather_weights)
+
+    Args:
+        eval_envs: Evaluation environment filenames or a pool of the loaded evaluation environments
+        episode: The episode of evaluation
+        pricing_agents: List of task pricing agents
+        weighting_agents: List of resource weighting agents
+
+    Returns: The evaluation results
+    """
+    results = EvalResults()
+
+    eval_pool = eval_envs if isinstance(eval_envs, EvalEnvPool) else EvalEnvPool(eval_envs)
+    for eval_env, state in eval_pool:
+        server_pricing_agents, server_weighting_agents = allocate_agents(state, pricing_agents, weighting_agents)
+
+        done = False
+        while not done:
+            if state.auction_task:
+                actions = await gather_bids(state, server_pricing_agents, False)
+            else:
+                actions = await gather_weights(state, server_weighting_agents, False)
+            state, done = _eval_step(eval_env, state, actions, results)
+
+        results.finished_env()
+
+    results.save(episode)
+    return results
+
+
+def _eval_step(eval_env: OnlineFlexibleResourceAllocationEnv, state: EnvState,
+               actions: Union[Dict[Server, float], Dict[Server, Dict[Task, float]]],
+               results: EvalResults) -> Tuple[EnvState, bool]:
+    """
+    An evaluation step of eval_agent and async_eval_agent, steps the environment with the servers' actions then adds
+        the step to the evaluation results
+
+    Args:
+        eval_env: The evaluation environment
+        state: The environment state
+        actions: The auction bids or the resource weights of every server
+        results: The evaluation results
+
+    Returns: Tuple of the next state and if the environment is done
+
+    """
+    next_state, rewards, done, info = eval_env.step(actions)
+    if state.auction_tasks:
+        # The results of each auction task (see split_batched_auction)
+        for _, task_actions, task_rewards in split_batched_auction(state, actions, rewards):
+            results.auction(task_actions, task_rewards)
+    elif state.auction_task:
+        results.auction(actions, rewards)
+    else:
+        results.resource_allocation(actions, rewards)
+    return next_state, done